@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# scripts/benchmark_compiled_model.py
+"""
+Compare a model's compiled export (scripts/export_model.py) with its pickle:
+cold load time in a fresh interpreter (imports included), single-row
+latency, batch throughput, and score parity on the feature store. Exits
+non-zero if the scores disagree beyond the tolerance.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC))
+
+from config import FEATURE_STORE_DIR, MODEL_DIR
+from model.compiled import COMPILED_DIR, load_compiled
+from model.utils import load_config
+from preprocessing.filter_feature_data import filter_feature_data
+
+COLD_LOAD = {
+    "pickle": "import joblib; m = joblib.load({path!r})",
+    "compiled": "from model.compiled import load_compiled; m = load_compiled({path!r})",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark compiled vs pickled model scoring")
+    parser.add_argument("model_id", help="Exported model under --model-dir")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    parser.add_argument("--feature-dir", type=Path, default=FEATURE_STORE_DIR, help="Feature store to score")
+    parser.add_argument("--split", default="test", help="Feature split to score (default: test)")
+    parser.add_argument("--repeat", type=int, default=200, help="Single-row predictions to time")
+    parser.add_argument("--loads", type=int, default=3, help="Cold loads to time (best is reported)")
+    parser.add_argument("--atol", type=float, default=1e-5, help="Absolute parity tolerance")
+    return parser.parse_args()
+
+
+def cold_load_s(kind: str, path: Path) -> float:
+    """Seconds to import and load the model in a fresh interpreter."""
+    code = (
+        f"import sys, time; sys.path.insert(0, {str(SRC)!r}); t = time.perf_counter(); "
+        + COLD_LOAD[kind].format(path=str(path))
+        + "; print(time.perf_counter() - t)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    output_dir = args.model_dir / args.model_id
+    config = load_config(output_dir / "config.yaml")
+    regression = config.get("regression_model", False)
+
+    # 1) Cold load, imports included
+    paths = {"pickle": output_dir / "model.pkl", "compiled": output_dir / COMPILED_DIR}
+    for kind, path in paths.items():
+        best = min(cold_load_s(kind, path) for _ in range(args.loads))
+        print(f"[INFO] {kind:>8} cold load: {best * 1000:8.1f} ms")
+
+    model = joblib.load(paths["pickle"])
+    compiled = load_compiled(paths["compiled"])
+    predict = model.predict if regression else (lambda X: model.predict_proba(X)[:, 1])
+
+    # 2) Feature rows as run_backtest scores them
+    tickers = [t.strip() for t in Path(config["tickers_file"]).read_text().splitlines() if t.strip()]
+    df = filter_feature_data(args.feature_dir, tickers, features=compiled.features, split=args.split)
+    df = df.dropna(subset=compiled.features)
+    X_df = df[compiled.features]
+    X = X_df.to_numpy(dtype=np.float32)
+    print(f"[INFO] {len(X):,} rows from split '{args.split}'")
+
+    # 3) Single-row latency (the pickle path takes a one-row frame, like load_scored_data)
+    row_df, row = X_df.iloc[:1], X[:1]
+    for kind, fn, arg in (("pickle", predict, row_df), ("compiled", compiled.predict, row)):
+        fn(arg)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(arg)
+        print(f"[INFO] {kind:>8} 1-row: {(time.perf_counter() - start) / args.repeat * 1e3:8.3f} ms")
+
+    # 4) Batch throughput and parity
+    scores = {}
+    for kind, fn, arg in (("pickle", predict, X_df), ("compiled", compiled.predict, X)):
+        start = time.perf_counter()
+        scores[kind] = np.asarray(fn(arg), dtype=np.float64)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] {kind:>8} batch: {elapsed:8.3f} s ({len(X) / elapsed:,.0f} rows/s)")
+
+    diff = float(np.abs(scores["pickle"] - scores["compiled"]).max()) if len(X) else 0.0
+    if diff > args.atol:
+        print(f"[ERROR] Compiled scores differ from the pickle by up to {diff:.3g}")
+        sys.exit(1)
+    print(f"[INFO] Scores match (max abs diff {diff:.2g})")
+
+
+if __name__ == "__main__":
+    main()
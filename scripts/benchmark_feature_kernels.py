@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# scripts/benchmark_feature_kernels.py
+"""
+Time and cross-check the feature backends (pandas / numpy / numba) on
+synthetic random-walk bars. Exits non-zero if a kernel backend disagrees
+with the pandas features beyond the tolerance.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bench.synthetic import synthetic_bars
+from config import FEATURE_SETS
+from preprocessing.kernels import BACKENDS, njit
+from preprocessing.process_features import compute_features
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark and parity-check the feature kernels")
+    parser.add_argument("--tickers", type=int, default=200, help="Synthetic tickers")
+    parser.add_argument("--bars", type=int, default=3500, help="Hourly bars per ticker")
+    parser.add_argument("--features", default="all", choices=list(FEATURE_SETS), help="Feature set")
+    parser.add_argument("--rtol", type=float, default=1e-9, help="Relative parity tolerance")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Absolute parity tolerance")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    feature_columns = FEATURE_SETS[args.features]
+    universe = [synthetic_bars(args.bars, seed) for seed in range(args.tickers)]
+    backends = [b for b in BACKENDS if b != "numba" or njit is not None]
+    if "numba" not in backends:
+        print("[WARNING] numba is not installed, skipping the numba backend")
+
+    # 1) Warm up (numba compiles on first call)
+    for backend in backends:
+        compute_features(universe[0].iloc[:100], feature_columns, backend=backend)
+
+    # 2) Time each backend over the whole universe
+    results = {}
+    for backend in backends:
+        start = time.perf_counter()
+        results[backend] = [compute_features(df, feature_columns, backend=backend) for df in universe]
+        elapsed = time.perf_counter() - start
+        rows = args.tickers * args.bars
+        print(f"[INFO] {backend:>6}: {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s)")
+
+    # 3) Parity against pandas
+    failed = False
+    for backend in backends[1:]:
+        for feature in feature_columns:
+            expected = np.concatenate([df[feature].to_numpy(dtype=np.float64) for df in results["pandas"]])
+            actual = np.concatenate([df[feature].to_numpy(dtype=np.float64) for df in results[backend]])
+            same_nan = np.array_equal(np.isnan(expected), np.isnan(actual))
+            close = np.allclose(actual, expected, rtol=args.rtol, atol=args.atol, equal_nan=True)
+            if not (same_nan and close):
+                diff = np.nanmax(np.abs(actual - expected))
+                print(f"[ERROR] {backend}/{feature}: max abs diff {diff:.3g}, NaN pattern match: {same_nan}")
+                failed = True
+    if failed:
+        sys.exit(1)
+    print(f"[INFO] {', '.join(backends[1:])} match pandas on {len(feature_columns)} features")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@
 import argparse
 from pathlib import Path
 import pandas as pd
-import yfinance as yf
 import pandas_market_calendars as mcal # type: ignore
 import sys
 
@@ -11,6 +10,7 @@ SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
 sys.path.insert(0, str(SRC_ROOT))
 
 from config import TRAIN_START, TRAIN_END  # Use dates from project config
+from preprocessing.data_fetch import fetch_many
 
 INPUT_CSV = Path("data/dev/sp500_ticker_start_end.csv")
 OUTPUT_FILE = Path("data/tickers/proto_universe.txt")
@@ -38,9 +38,10 @@ def check_data_coverage(tickers, start_date, end_date, min_coverage=0.9):
 
     print(f"Total expected trading days: {total_expected}")
 
+    bars = fetch_many(tickers, interval="1d", start=start_date, end=end_date)
     for ticker in tickers:
-        df = yf.download(ticker, start=start_date, end=end_date, interval="1d", progress=False, auto_adjust=True)
-        available = df.dropna().shape[0]
+        df = bars.get(ticker)
+        available = df.dropna().shape[0] if df is not None else 0
 
         coverage = available / total_expected if total_expected else 0
         if coverage >= min_coverage:
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# scripts/build_shared_panel.py
+"""
+Materialize feature rows (or a sim config's scored rows) once as a shared
+panel directory (src/preprocessing/shared_panel.py). Put it under /dev/shm
+and point parallel jobs at it: as their feature_dir (filter_feature_data
+memory-maps it instead of decoding Parquet) or, for scored rows, as a sim
+config's scores_file. Every process then reads the same pages.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Ensure src/ is on PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import FEATURE_SETS, FEATURE_STORE_DIR, MODEL_DIR
+from preprocessing.filter_feature_data import filter_feature_data
+from preprocessing.shared_panel import build_panel
+from sim.scoring import load_scored_data
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build a shared (memory-mapped) feature or score panel")
+    parser.add_argument("output", type=Path, help="Panel directory to write, e.g. /dev/shm/panel_all")
+    parser.add_argument("--tickers-file", type=Path, default=None, help="Tickers to include (feature panels)")
+    parser.add_argument("--feature-dir", type=Path, default=FEATURE_STORE_DIR, help="Feature store to read")
+    parser.add_argument(
+        "--feature-set",
+        default=None,
+        choices=list(FEATURE_SETS),
+        help="Feature set to keep (default: every column in the store)"
+    )
+    parser.add_argument("--split", default=None, help="Restrict rows to a SPLIT_BOUNDS split")
+    parser.add_argument("--start", default=None, help="First timestamp to include")
+    parser.add_argument("--end", default=None, help="Last timestamp to include")
+    parser.add_argument(
+        "--sim-config",
+        type=Path,
+        default=None,
+        help="Build the config's scored rows (features + score) instead, for its scores_file"
+    )
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    parser.add_argument(
+        "--dtype",
+        default="float32",
+        help="Panel value dtype (float64 keeps backtests bit-identical to the Parquet path)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    if args.sim_config:
+        sim_cfg = yaml.safe_load(args.sim_config.read_text())
+        try:
+            df = load_scored_data(sim_cfg, args.feature_dir, args.model_dir)
+        except (FileNotFoundError, ValueError) as e:
+            sys.exit(f"[ERROR] {e}")
+    else:
+        if args.tickers_file is None:
+            sys.exit("[ERROR] --tickers-file is required unless --sim-config is given")
+        tickers = [t.strip() for t in args.tickers_file.read_text().splitlines() if t.strip()]
+        df = filter_feature_data(
+            feature_dir=args.feature_dir,
+            tickers=tickers,
+            features=FEATURE_SETS[args.feature_set] + ["Close"] if args.feature_set else None,
+            start_time=args.start,
+            end_time=args.end,
+            split=args.split,
+            float_dtype=args.dtype
+        )
+    if df.empty:
+        sys.exit("[ERROR] No rows to build a panel from")
+
+    panel = build_panel(df, path=args.output, dtype=args.dtype)
+    times, tickers = panel.present.shape
+    features = len(panel.features)
+    print(f"[INFO] Built panel of {times:,} timestamps x {tickers} tickers x {features} features "
+          f"({panel.nbytes / 1024**2:,.1f} MB, {len(df):,} rows) in {time.perf_counter() - start:.2f}s")
+    print(f"[INFO] Saved to {args.output}; use it as a feature_dir"
+          + (" or as the sim config's scores_file" if args.sim_config else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# scripts/check_online_features.py
+"""
+Check the online features (src/preprocessing/online_features.py) against
+the pandas features on synthetic random-walk bars, and time them. The
+online state steps through the bars one timestamp at a time, updating every
+ticker at once as the live pipeline does. Exits non-zero if a feature
+disagrees beyond the tolerance or its state grows with the history.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bench.synthetic import synthetic_bars
+from config import FEATURE_SETS
+from live.engine import OnlineFeatureEngine
+from preprocessing.panel_features import RAW_FIELDS
+from preprocessing.process_features import compute_features
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parity-check and time the online features")
+    parser.add_argument("--tickers", type=int, default=500, help="Synthetic tickers")
+    parser.add_argument("--bars", type=int, default=2000, help="Hourly bars per ticker")
+    parser.add_argument("--features", default="all", choices=list(FEATURE_SETS), help="Feature set")
+    parser.add_argument("--rtol", type=float, default=1e-9, help="Relative parity tolerance")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Absolute parity tolerance")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    feature_columns = FEATURE_SETS[args.features]
+    universe = [synthetic_bars(args.bars, seed) for seed in range(args.tickers)]
+
+    # 1) Batch features per ticker, (bars × tickers × features)
+    start = time.perf_counter()
+    expected = np.stack([
+        compute_features(df, feature_columns).to_numpy(dtype=np.float64) for df in universe
+    ], axis=1)
+    batch_s = time.perf_counter() - start
+
+    # 2) Online features, one timestamp of every ticker per update
+    bars = np.stack([df[list(RAW_FIELDS)].to_numpy(dtype=np.float64) for df in universe], axis=1)
+    engine = OnlineFeatureEngine(feature_columns)
+    ids = np.arange(args.tickers)
+    actual = np.empty_like(expected)
+    state_bytes = []
+    start = time.perf_counter()
+    for t in range(args.bars):
+        actual[t] = engine.update(ids, bars[t])
+        if t in (args.bars // 2, args.bars - 1):
+            state_bytes.append(engine.ops.nbytes())
+    online_s = time.perf_counter() - start
+    print(f"[INFO] pandas: {batch_s:.3f}s for {args.tickers} x {args.bars} bars (full recompute)")
+    print(f"[INFO] online: {online_s / args.bars * 1e6:,.0f} us per timestamp of {args.tickers} tickers "
+          f"({online_s / (args.bars * args.tickers) * 1e6:.2f} us per ticker-bar)")
+    print(f"[INFO] online state: {state_bytes[-1] / args.tickers:,.0f} bytes per ticker")
+
+    # 3) Parity and constant state
+    failed = state_bytes[0] != state_bytes[-1]
+    if failed:
+        print(f"[ERROR] Online state grew from {state_bytes[0]} to {state_bytes[-1]} bytes")
+    for j, feature in enumerate(feature_columns):
+        same_nan = np.array_equal(np.isnan(expected[..., j]), np.isnan(actual[..., j]))
+        close = np.allclose(actual[..., j], expected[..., j], rtol=args.rtol, atol=args.atol, equal_nan=True)
+        if not (same_nan and close):
+            diff = np.nanmax(np.abs(actual[..., j] - expected[..., j]))
+            print(f"[ERROR] online/{feature}: max abs diff {diff:.3g}, NaN pattern match: {same_nan}")
+            failed = True
+    if failed:
+        sys.exit(1)
+    print(f"[INFO] online features match pandas on {len(feature_columns)} features")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# scripts/export_model.py
+"""
+Export trained XGBoost / random forest models to the compiled format
+(model_dir/<model_id>/compiled), checking each against its pickle.
+New models can export at training time instead with `export: true` in
+their config.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import MODEL_DIR
+from model.export import export_saved_model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export saved tree models for low-latency scoring")
+    parser.add_argument("model_ids", nargs="+", help="Models under --model-dir to export")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    failed = False
+    for model_id in args.model_ids:
+        try:
+            export_saved_model(args.model_dir, model_id)
+        except Exception as e:
+            print(f"[ERROR] Export failed for '{model_id}': {e}", file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
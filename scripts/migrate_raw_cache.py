@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# scripts/migrate_raw_cache.py
+"""
+Convert legacy {ticker}.parquet entries of the raw bar cache to the
+memory-mapped columnar format (src/preprocessing/raw_cache.py). Readers use
+legacy entries as they are, so this is an optional one-off step; it is safe
+to run while other processes read or write the cache.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure src/ is on PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import RAW_DIR
+from preprocessing.raw_cache import RawBarCache
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert legacy parquet raw bars to the columnar cache")
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR, help="Raw bar cache root")
+    parser.add_argument("--interval", nargs="+", default=["1h"], help="Bar intervals to convert")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    for interval in args.interval:
+        converted = RawBarCache(args.raw_dir, interval).migrate()
+        print(f"[INFO] Converted {converted} legacy {interval} entries in {args.raw_dir / interval}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# scripts/run_benchmarks.py
+"""
+Offline benchmark suite over synthetic hourly OHLCV.
+
+    python scripts/run_benchmarks.py --tickers 50 500 2000 -o bench.json
+    python scripts/run_benchmarks.py --tickers 50 --baseline bench.json
+
+Writes wall time, peak RSS and rows/sec per (benchmark, universe size) as
+JSON. With --baseline, exits non-zero if any benchmark got slower than the
+baseline run by more than --tolerance.
+"""
+
+import sys
+import json
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from bench.benchmarks import BENCHMARK_REGISTRY, Workspace, run_benchmark
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[50, 500, 2000],
+                        help="Universe sizes to benchmark")
+    parser.add_argument("--bars", type=int, default=2000,
+                        help="Hourly bars per ticker (2000 covers all splits)")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARK_REGISTRY),
+                        default=list(BENCHMARK_REGISTRY), help="Benchmarks to run")
+    parser.add_argument("--output", "-o", type=Path, default=None,
+                        help="JSON file for the results (default: print only)")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="Earlier results JSON to compare wall times against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    parser.add_argument("--workdir", type=Path, default=None,
+                        help="Keep the synthetic workspaces here instead of a temp dir")
+    parser.add_argument("--verbose", action="store_true", help="Show the benchmarked code's output")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline_path: Path, tolerance: float) -> bool:
+    """Print wall-time ratios against a baseline; True if none regressed."""
+    baseline = {
+        (r["benchmark"], r["tickers"], r["bars"]): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    ok = True
+    print(f"\n[RESULT] vs baseline {baseline_path}:")
+    for r in results:
+        base = baseline.get((r["benchmark"], r["tickers"], r["bars"]))
+        if not base:
+            continue
+        ratio = r["wall_s"] / base["wall_s"] if base["wall_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- REGRESSION"
+            ok = False
+        print(f"  {r['benchmark']:<20} {r['tickers']:>5} tickers: {ratio:6.2f}x wall time{flag}")
+    return ok
+
+
+def main():
+    args = parse_args()
+    tmp = None
+    if args.workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="bench_")
+        workdir = Path(tmp.name)
+    else:
+        workdir = args.workdir
+
+    results = []
+    try:
+        for n_tickers in args.tickers:
+            ws = Workspace(workdir / f"t{n_tickers}_b{args.bars}", n_tickers, args.bars)
+            for name in args.benchmarks:
+                result = run_benchmark(name, ws, quiet=not args.verbose)
+                results.append(result)
+                print(f"[INFO] {name:<20} {n_tickers:>5} tickers: {result['wall_s']:8.3f}s "
+                      f"{result['rows_per_s']:>12,.0f} rows/s  peak {result['peak_rss_mb']:,.0f} MB")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bars": args.bars,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"[INFO] Benchmark results saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline and not compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
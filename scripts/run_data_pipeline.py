@@ -1,34 +1,61 @@
 # scripts/run_data_pipeline.py
 import sys
+import argparse
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
-from preprocessing.data_fetch import fetch_stock_data
+from preprocessing.data_fetch import fetch_many
 from preprocessing.process_features import process_features
-from config import SPLIT_BOUNDS, FEATURE_DIR, FEATURE_SETS, PERIOD
+from preprocessing.panel_features import stack_raw, compute_panel_features
+from preprocessing.feature_store import write_feature_store
+from preprocessing.kernels import BACKENDS
+from config import FEATURE_STORE_DIR, FEATURE_SETS, PERIOD
 
-def run_pipeline(tickers_file: Path, debug: bool=False):
+def run_pipeline(tickers_file: Path, debug: bool=False, incremental: bool=False, backend: str="pandas"):
     tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
 
-    for ticker in tickers:
-        raw_df = fetch_stock_data(ticker, PERIOD)  # full-range OHLCV
+    # Full-range OHLCV; only bars missing from the local raw cache are downloaded
+    raw_by_ticker = fetch_many(tickers, period=PERIOD, debug=debug)
+    if not raw_by_ticker:
+        print(f"[ERROR] No bars fetched for the {len(tickers)} tickers in {tickers_file}")
+        return
 
-        for split_name, (start, end) in SPLIT_BOUNDS.items():
-            process_features(
-                ticker=ticker,
-                raw_df=raw_df,
-                feature_columns=FEATURE_SETS["all"],
-                start_time=start,
-                end_time=end,
-                split_name=split_name,
-                feature_dir=FEATURE_DIR,
-                save=True,
-                debug=debug
-            )
+    # Features are computed over each ticker's full history and written to the
+    # feature store; train/validate/test are time ranges applied when reading.
+    if not incremental:
+        # Compute every ticker at once with the panel engine
+        features = compute_panel_features(
+            stack_raw(raw_by_ticker),
+            feature_columns=FEATURE_SETS["all"],
+            debug=debug
+        )
+        write_feature_store(features, FEATURE_STORE_DIR, debug=debug)
+        return
+
+    for ticker, raw_df in raw_by_ticker.items():
+        process_features(
+            ticker=ticker,
+            raw_df=raw_df,
+            feature_columns=FEATURE_SETS["all"],
+            start_time=None,
+            end_time=None,
+            split_name=None,
+            feature_dir=FEATURE_STORE_DIR,
+            save=True,
+            debug=debug,
+            incremental=incremental,
+            backend=backend
+        )
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python run_data_pipeline.py <tickers.txt>")
-        sys.exit(1)
-    run_pipeline(Path(sys.argv[1]), debug=True)
+    parser = argparse.ArgumentParser(description="Fetch raw bars and build the feature store")
+    parser.add_argument("tickers_file", type=Path, help="Text file with one ticker per line")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only recompute features for newly fetched bars, per ticker")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="Feature implementation for the per-ticker (incremental) path (default: pandas)")
+    args = parser.parse_args()
+    if args.backend and not args.incremental:
+        parser.error("--backend only applies with --incremental (the panel engine always uses pandas)")
+    run_pipeline(args.tickers_file, debug=True, incremental=args.incremental, backend=args.backend or "pandas")
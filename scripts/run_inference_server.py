@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# scripts/run_inference_server.py
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure src/ is on PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import FEATURE_STORE_DIR, MODEL_DIR
+from model.inference import DEFAULT_CACHE_SIZE, ModelCache
+from model.serve import make_server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Serve low-latency scoring for saved models (see src/model/serve.py for the routes)"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Serve on this Unix socket instead of TCP"
+    )
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    parser.add_argument(
+        "--feature-dir",
+        type=Path,
+        default=FEATURE_STORE_DIR,
+        help="Feature store read by /latest"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"Models kept loaded (default: {DEFAULT_CACHE_SIZE})"
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="Serve models from their compiled export when they have one (see scripts/export_model.py)"
+    )
+    parser.add_argument(
+        "--preload",
+        nargs="*",
+        default=[],
+        metavar="MODEL_ID",
+        help="Models to load before accepting requests"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    cache = ModelCache(args.model_dir, max_models=args.cache_size, compiled=args.compiled)
+    for model_id in args.preload:
+        try:
+            cache.get(model_id)
+        except FileNotFoundError as e:
+            sys.exit(f"[ERROR] {e}")
+
+    server = make_server(cache, args.feature_dir, args.host, args.port, args.socket)
+    where = args.socket if args.socket else f"http://{args.host}:{args.port}"
+    print(f"[INFO] Serving {args.model_dir} on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and args.socket.exists():
+            args.socket.unlink()
+
+
+if __name__ == "__main__":
+    main()
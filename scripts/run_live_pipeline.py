@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# scripts/run_live_pipeline.py
+"""
+Run a sim config in streaming mode: bars from its `live.source` flow through
+incremental features, the model and the buy/sell strategies as they arrive
+(see src/live/pipeline.py). Decisions are printed as they are made.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# Ensure src/ is on PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import MODEL_DIR
+from live.pipeline import build_pipeline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream bars through features, scoring and strategies")
+    parser.add_argument("sim_config", type=Path, help="Simulation config YAML with a 'live' section")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="Optional CSV path to save the trade log"
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    return parser.parse_args()
+
+
+def print_decision(ts, trades, latency):
+    for t in trades:
+        print(f"[INFO] {ts} {t['action']:>4} {t['quantity']:>5} {t['ticker']} @ {t['price']:.2f} "
+              f"(cash {t['cash']:.2f}, {latency * 1e3:.1f} ms)")
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    sim_cfg = yaml.safe_load(args.sim_config.read_text())
+
+    try:
+        pipeline, source = build_pipeline(sim_cfg, args.model_dir, None if args.quiet else print_decision)
+    except (ValueError, FileNotFoundError) as e:
+        sys.exit(f"[ERROR] {e}")
+    try:
+        trade_log, summary = asyncio.run(pipeline.run(source))
+    except KeyboardInterrupt:
+        trade_log, summary = pipeline.book.trade_log(), pipeline.summary()
+
+    print("\n[RESULT] Live Summary:")
+    for k, v in summary.items():
+        print(f"  {k}: {v}")
+    if pipeline.latencies:
+        p50, p99 = np.percentile(np.asarray(pipeline.latencies) * 1e3, [50, 99])
+        print(f"[INFO] {pipeline.bars_processed} bars over {len(pipeline.latencies)} timestamps; "
+              f"decision latency p50 {p50:.2f} ms, p99 {p99:.2f} ms; {pipeline.late_bars} late bars dropped")
+
+    if args.output:
+        args.output.parent.mkdir(exist_ok=True, parents=True)
+        trade_log.to_csv(args.output, index=False)
+        print(f"[INFO] Trade log saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# scripts/run_replay.py
+"""
+Replay a sim config from the raw bar cache through the live pipeline
+(src/live/replay.py) and report throughput, decision latency and whether
+the trades match the vectorized backtest. Exits non-zero on a mismatch.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+import yaml
+
+# Ensure src/ is on PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import FEATURE_STORE_DIR, MODEL_DIR, RAW_DIR
+from live.replay import run_replay
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay cached bars through the live pipeline")
+    parser.add_argument("sim_config", type=Path, help="Simulation config YAML")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=None,
+        help="Market seconds per wall second, e.g. 3600 = one hour of bars per second "
+             "(default: as fast as possible)"
+    )
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR, help="Raw bar cache (fetch_many layout)")
+    parser.add_argument("--feature-dir", type=Path, default=FEATURE_STORE_DIR, help="Feature store for the backtest")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Root of the trained models")
+    parser.add_argument("--no-compare", action="store_true", help="Skip the vectorized backtest comparison")
+    parser.add_argument("--output", "-o", type=Path, default=None, help="Optional CSV path for the trade log")
+    parser.add_argument("--report", type=Path, default=None, help="Optional JSON path for the report")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    sim_cfg = yaml.safe_load(args.sim_config.read_text())
+
+    try:
+        trade_log, report = run_replay(
+            sim_cfg, args.feature_dir, args.model_dir, args.raw_dir,
+            speed=args.speed, compare=not args.no_compare
+        )
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"[ERROR] {e}")
+
+    latency = report["latency_ms"]
+    print(f"\n[RESULT] Replayed {report['bars']:,} bars over {report['timestamps']:,} timestamps "
+          f"in {report['wall_s']:.2f}s ({report['bars_per_s']:,.0f} bars/s)")
+    print("  decision latency (ms): " + ", ".join(f"{k} {v}" for k, v in latency.items()))
+    for k, v in report["summary"].items():
+        print(f"  {k}: {v}")
+
+    if args.output:
+        args.output.parent.mkdir(exist_ok=True, parents=True)
+        trade_log.to_csv(args.output, index=False)
+        print(f"[INFO] Trade log saved to {args.output}")
+    if args.report:
+        args.report.parent.mkdir(exist_ok=True, parents=True)
+        args.report.write_text(json.dumps(report, indent=2, default=str))
+        print(f"[INFO] Report saved to {args.report}")
+
+    if "matches_backtest" in report:
+        if not report["matches_backtest"]:
+            print(f"[ERROR] Replay diverges from the vectorized backtest at trade {report['first_mismatch']}")
+            sys.exit(1)
+        print("[INFO] Replay matches the vectorized backtest trade for trade")
+
+
+if __name__ == "__main__":
+    main()
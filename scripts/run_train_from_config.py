@@ -7,7 +7,11 @@ from pathlib import Path
 # Ensure src/ is on PYTHONPATH
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
+from config import MODEL_DIR
 from model.train import train_from_config
+from model.batch import load_batch_configs, train_batch
+from model.search import run_search
+from model.walk_forward import WALK_FORWARD_DIR, run_walk_forward
 
 def main():
     parser = argparse.ArgumentParser(
@@ -19,17 +23,96 @@ def main():
         nargs="?",
         help="Path to a single model config YAML file"
     )
+    group.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH_OR_GLOB",
+        help="Config directories and/or glob patterns; configs sharing data are loaded once "
+             "and trained concurrently"
+    )
+    group.add_argument(
+        "--search",
+        type=Path,
+        metavar="CONFIG",
+        help="Hyperparameter search over the config's 'search' section; saves the best model "
+             "plus a leaderboard.csv"
+    )
+    group.add_argument(
+        "--walk-forward",
+        type=Path,
+        metavar="CONFIG",
+        help="Train the config on rolling walk-forward folds (its 'walk_forward' section) and "
+             "stitch their out-of-sample scores"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Concurrent training processes for --batch / --search / --walk-forward "
+             "(default: one per CPU)"
+    )
+    parser.add_argument(
+        "--threads-per-job",
+        type=int,
+        default=None,
+        help="n_jobs for XGBoost / RandomForest models in --batch (default: CPUs / workers)"
+    )
     args = parser.parse_args()
 
+    if args.batch:
+        try:
+            configs = load_batch_configs(args.batch)
+            results = train_batch(configs, max_workers=args.workers, threads_per_job=args.threads_per_job)
+        except ValueError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            sys.exit(1)
+        print("\n[RESULT] Batch training:")
+        for r in results:
+            print(f"  {r['model_id']:<30} {r['model_type']:<24} load {r['load_s']:7.2f}s  "
+                  f"train {r['wall_s']:7.2f}s  {r['status']}")
+        if any(r["status"] != "ok" for r in results):
+            sys.exit(1)
+        return
+
+    if args.search:
+        try:
+            cfg = yaml.safe_load(args.search.read_text())
+            if not cfg.get("search"):
+                raise ValueError(f"{args.search} has no 'search' section")
+            leaderboard = run_search(cfg, max_workers=args.workers)
+        except Exception as e:
+            print(f"[ERROR] Search failed for {args.search}:\n{e}", file=sys.stderr)
+            sys.exit(1)
+        print("\n[RESULT] Search leaderboard (top 10):")
+        print(leaderboard.head(10).to_string(index=False))
+        return
+
+    if args.walk_forward:
+        try:
+            cfg = yaml.safe_load(args.walk_forward.read_text())
+            folds, scores = run_walk_forward(cfg, max_workers=args.workers)
+        except Exception as e:
+            print(f"[ERROR] Walk-forward failed for {args.walk_forward}:\n{e}", file=sys.stderr)
+            sys.exit(1)
+        columns = [c for c in ("fold", "test_start", "test_end", "train_rows", "test_rows",
+                               "validate_accuracy", "test_accuracy", "wall_s") if c in folds]
+        print("\n[RESULT] Walk-forward folds:")
+        print(folds[columns].to_string(index=False))
+        print(f"[INFO] {len(scores)} out-of-sample scores; backtest them with "
+              f"scores_file: {MODEL_DIR / cfg['model_id'] / WALK_FORWARD_DIR / 'scores.parquet'}")
+        return
+
     config_file = Path(args.config)
 
     if not config_file.is_file():
         print(f"[ERROR] Config file not found: {config_file}", file=sys.stderr)
+        sys.exit(1)
     try:
         cfg = yaml.safe_load(config_file.read_text())
         train_from_config(cfg)
     except Exception as e:
         print(f"[ERROR] Training failed for {config_file}:\n{e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,374 @@
+# src/bench/benchmarks.py
+"""
+Offline benchmarks of the pipeline hot paths on synthetic data.
+
+Each benchmark runs in a freshly forked process against a Workspace (a
+temporary directory holding the synthetic universe and whatever artifacts
+earlier steps produced), and reports wall time, peak RSS and rows/sec.
+"""
+
+import contextlib
+import gc
+import io
+import logging
+import multiprocessing
+import resource
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from bench.synthetic import synthetic_universe, trading_hours
+from config import FEATURE_SETS
+
+BENCHMARK_REGISTRY: Dict[str, Callable] = {}
+BENCHMARK_REQUIRES: Dict[str, Tuple[str, ...]] = {}
+
+MODEL_ID = "bench"
+TRAIN_CONFIG = {
+    "model_id": MODEL_ID,
+    "feature_set": "all",
+    "label_method": "binary_return_3h",
+    "model_type": "xgboost",
+    "regression_model": False,
+    "model_params": {"n_estimators": 100, "max_depth": 4, "tree_method": "hist"},
+}
+SIM_CONFIG = {
+    "model_id": MODEL_ID,
+    "feature_split": "test",
+    "buy_strategy": "first_hour_equal_allocation",
+    "buy_params": {"top_k": 5, "target_hour": 13},
+    "sell_strategy": "cooldown_sell",
+    "sell_params": {"hold_hours": 3},
+}
+
+
+def register_benchmark(name: str, requires: Tuple[str, ...] = ()):
+    """
+    Decorator to register a benchmark.
+    Signature: fn(ws: Workspace) -> int (rows processed)
+
+    `requires` names Workspace artifacts ("raw", "features", "model",
+    "dataset_cache", "scored") that are prepared, untimed, before the benchmark runs.
+    """
+    def decorator(fn: Callable):
+        if name in BENCHMARK_REGISTRY:
+            raise ValueError(f"Benchmark '{name}' is already registered.")
+        BENCHMARK_REGISTRY[name] = fn
+        BENCHMARK_REQUIRES[name] = tuple(requires)
+        return fn
+    return decorator
+
+
+class Workspace:
+    """
+    Synthetic universe plus the on-disk artifacts built from it. Artifacts are
+    created on first request and reused by later benchmarks of the same size.
+    """
+
+    def __init__(self, root: Path, n_tickers: int, n_bars: int, seed: int = 0):
+        self.root = Path(root)
+        self.n_tickers = n_tickers
+        self.n_bars = n_bars
+        self.seed = seed
+        self.feature_dir = self.root / "feature_store"
+        self.model_dir = self.root / "models"
+        self.tickers_file = self.root / "tickers.txt"
+        self.scored_path = self.root / "scored.parquet"
+        self.dataset_cache_dir = self.root / "dataset_cache"
+        self.panel_dir = self.root / "panel"
+        self.raw_dir = self.root / "raw"
+        self.raw: Optional[Dict[str, pd.DataFrame]] = None
+
+    @property
+    def train_config(self) -> Dict[str, Any]:
+        return dict(TRAIN_CONFIG, tickers_file=str(self.tickers_file))
+
+    @property
+    def sim_config(self) -> Dict[str, Any]:
+        return dict(SIM_CONFIG, tickers_file=str(self.tickers_file))
+
+    def split_rows(self, *splits: str) -> int:
+        """Number of synthetic bars (all tickers) inside the given splits."""
+        from preprocessing.feature_store import split_bounds
+        index = trading_hours(self.n_bars)
+        bars = 0
+        for split in splits:
+            start, end = split_bounds(split)
+            bars += int(((index >= start) & (index < end)).sum())
+        return bars * self.n_tickers
+
+    def prepare(self, *artifacts: str) -> None:
+        for artifact in artifacts:
+            getattr(self, f"_prepare_{artifact}")()
+
+    def _prepare_raw(self) -> None:
+        if self.raw is None:
+            self.raw = synthetic_universe(self.n_tickers, self.n_bars, self.seed)
+            self.tickers_file.parent.mkdir(parents=True, exist_ok=True)
+            self.tickers_file.write_text("\n".join(self.raw) + "\n")
+
+    def _prepare_raw_cache(self) -> None:
+        from preprocessing.raw_cache import RawBarCache
+        self._prepare_raw()
+        if not self.raw_dir.exists():
+            cache = RawBarCache(self.raw_dir)
+            for ticker, df in self.raw.items():
+                cache.write(ticker, df)
+
+    def _prepare_features(self) -> None:
+        from preprocessing.feature_store import write_feature_store
+        from preprocessing.panel_features import compute_panel_features, stack_raw
+        self._prepare_raw()
+        if not self.feature_dir.exists():
+            features = compute_panel_features(stack_raw(self.raw), FEATURE_SETS["all"])
+            write_feature_store(features, self.feature_dir)
+
+    def _prepare_model(self) -> None:
+        from model.train import train_from_config
+        self._prepare_features()
+        if not (self.model_dir / MODEL_ID / "model.pkl").exists():
+            train_from_config(self.train_config, self.feature_dir, self.model_dir, cache_dir=None)
+
+    def _prepare_dataset_cache(self) -> None:
+        from model.train import load_training_data
+        self._prepare_features()
+        if not self.dataset_cache_dir.exists():
+            load_training_data(self.train_config, list(self.raw), FEATURE_SETS["all"],
+                               self.feature_dir, self.dataset_cache_dir)
+
+    def _prepare_panel(self) -> None:
+        from preprocessing.filter_feature_data import filter_feature_data
+        from preprocessing.shared_panel import build_panel
+        self._prepare_features()
+        if not self.panel_dir.exists():
+            build_panel(filter_feature_data(self.feature_dir, list(self.raw)), path=self.panel_dir)
+
+    def _prepare_scored(self) -> None:
+        from sim.scoring import load_scored_data
+        self._prepare_model()
+        if not self.scored_path.exists():
+            load_scored_data(self.sim_config, self.feature_dir, self.model_dir).to_parquet(self.scored_path)
+
+
+# ——— Benchmarks ———
+
+@register_benchmark("process_features", requires=("raw",))
+def bench_process_features(ws: Workspace) -> int:
+    """Per-ticker feature computation and store writes (incremental pipeline path)."""
+    from preprocessing.process_features import process_features
+    out_dir = ws.root / "process_features"
+    shutil.rmtree(out_dir, ignore_errors=True)
+    for ticker, raw_df in ws.raw.items():
+        process_features(ticker, raw_df, FEATURE_SETS["all"], None, None, None, out_dir)
+    return ws.n_tickers * ws.n_bars
+
+
+@register_benchmark("raw_cache_splits", requires=("raw_cache",))
+def bench_raw_cache_splits(ws: Workspace) -> int:
+    """Slice every ticker's train/validate/test bars out of the memory-mapped raw cache."""
+    from preprocessing.feature_store import split_bounds
+    from preprocessing.raw_cache import RawBarCache
+    cache = RawBarCache(ws.raw_dir)
+    bars = 0
+    for ticker in ws.raw:
+        for split in ("train", "validate", "test"):
+            bars += len(cache.read(ticker, *split_bounds(split)))
+    return bars
+
+
+@register_benchmark("panel_features", requires=("raw",))
+def bench_panel_features(ws: Workspace) -> int:
+    """Whole-universe feature computation and store writes (full pipeline path)."""
+    from preprocessing.feature_store import write_feature_store
+    from preprocessing.panel_features import compute_panel_features, stack_raw
+    out_dir = ws.root / "panel_features"
+    shutil.rmtree(out_dir, ignore_errors=True)
+    features = compute_panel_features(stack_raw(ws.raw), FEATURE_SETS["all"])
+    write_feature_store(features, out_dir)
+    return len(features)
+
+
+@register_benchmark("filter_feature_data", requires=("features",))
+def bench_filter_feature_data(ws: Workspace) -> int:
+    """Load the train split of every ticker, as training does."""
+    from preprocessing.filter_feature_data import filter_feature_data
+    df = filter_feature_data(
+        feature_dir=ws.feature_dir,
+        tickers=list(ws.raw),
+        features=FEATURE_SETS["all"],
+        split="train"
+    )
+    return len(df)
+
+
+@register_benchmark("filter_feature_data_panel", requires=("panel",))
+def bench_filter_feature_data_panel(ws: Workspace) -> int:
+    """Load the train split of every ticker from a memory-mapped shared panel."""
+    from preprocessing.filter_feature_data import filter_feature_data
+    df = filter_feature_data(
+        feature_dir=ws.panel_dir,
+        tickers=list(ws.raw),
+        features=FEATURE_SETS["all"],
+        split="train"
+    )
+    return len(df)
+
+
+@register_benchmark("train", requires=("features",))
+def bench_train(ws: Workspace) -> int:
+    """Load, label and fit train_from_config's model (xgboost) end to end."""
+    from model.train import train_from_config
+    model_dir = ws.root / "train_models"
+    shutil.rmtree(model_dir, ignore_errors=True)
+    train_from_config(ws.train_config, ws.feature_dir, model_dir, cache_dir=None)
+    return ws.split_rows("train", "validate")
+
+
+@register_benchmark("train_compact", requires=("features",))
+def bench_train_compact(ws: Workspace) -> int:
+    """As "train", with the float32 compact data path."""
+    from model.train import train_from_config
+    model_dir = ws.root / "train_models"
+    shutil.rmtree(model_dir, ignore_errors=True)
+    train_from_config(dict(ws.train_config, compact=True), ws.feature_dir, model_dir, cache_dir=None)
+    return ws.split_rows("train", "validate")
+
+
+@register_benchmark("train_cached", requires=("dataset_cache",))
+def bench_train_cached(ws: Workspace) -> int:
+    """As "train", with the labelled matrices memory-mapped from the dataset cache."""
+    from model.train import train_from_config
+    model_dir = ws.root / "train_models"
+    shutil.rmtree(model_dir, ignore_errors=True)
+    train_from_config(ws.train_config, ws.feature_dir, model_dir, cache_dir=ws.dataset_cache_dir)
+    return ws.split_rows("train", "validate")
+
+
+@register_benchmark("train_streaming", requires=("features",))
+def bench_train_streaming(ws: Workspace) -> int:
+    """As "train", out of core: external-memory XGBoost over chunks of 50 tickers."""
+    from model.train import train_from_config
+    model_dir = ws.root / "train_models"
+    shutil.rmtree(model_dir, ignore_errors=True)
+    config = dict(ws.train_config, compact=True, streaming={"chunk_tickers": 50})
+    train_from_config(config, ws.feature_dir, model_dir)
+    return ws.split_rows("train", "validate")
+
+
+@register_benchmark("score", requires=("model",))
+def bench_score(ws: Workspace) -> int:
+    """Load the test split and score it with the model (run_backtest steps 1-5)."""
+    from sim.scoring import load_scored_data
+    return len(load_scored_data(ws.sim_config, ws.feature_dir, ws.model_dir))
+
+
+@register_benchmark("score_latest", requires=("model",))
+def bench_score_latest(ws: Workspace) -> int:
+    """Score every ticker's latest bar 100 times through a warm ModelCache (the /latest route)."""
+    from model.inference import ModelCache
+    from preprocessing.filter_feature_data import read_latest_bars
+    cache, bars_cache, tickers = ModelCache(ws.model_dir), {}, ws.tickers_file.read_text().split()
+    rows = 0
+    for _ in range(100):
+        model = cache.get(MODEL_ID)
+        rows += len(model.score(read_latest_bars(ws.feature_dir, tickers, model.features, bars_cache)))
+    return rows
+
+
+@register_benchmark("evaluate")
+def bench_evaluate(ws: Workspace) -> int:
+    """Metrics, 1000 bootstrap intervals and ticker/hour breakdowns of 1M synthetic predictions."""
+    import numpy as np
+    from model.metrics import evaluate
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    groups = {"ticker": rng.integers(0, 500, n), "hour": rng.integers(13, 20, n)}
+    y = rng.integers(0, 2, n)
+    evaluate(y, np.where(rng.random(n) < 0.6, y, 1 - y), "classification", n_bootstrap=1000, groups=groups)
+    y = rng.normal(size=n)
+    evaluate(y, y + rng.normal(scale=0.5, size=n), "regression", n_bootstrap=1000, groups=groups)
+    return 2 * n
+
+
+@register_benchmark("simulate", requires=("scored",))
+def bench_simulate(ws: Workspace) -> int:
+    """Backtest the scored test split with the default strategies."""
+    from sim.sweep import SIM_COLUMNS, run_config
+    df = pd.read_parquet(ws.scored_path, columns=SIM_COLUMNS)
+    run_config(df, ws.sim_config)
+    return len(df)
+
+
+# ——— Measurement ———
+
+def _status_mb(field: str) -> Optional[float]:
+    """A memory field of /proc/self/status in MB (None where /proc is unavailable)."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> None:
+    # Linux: writing "5" to clear_refs resets the peak RSS (VmHWM) to the current RSS
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    peak = _status_mb("VmHWM")
+    if peak is None:
+        # ru_maxrss is KB on Linux, bytes on macOS; covers the process lifetime
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return peak
+
+
+def _run_case(name: str, ws: Workspace, quiet: bool) -> Dict[str, Any]:
+    """Body of one forked benchmark process."""
+    if quiet:
+        logging.disable(logging.INFO)
+    sink = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(sink):
+        ws.prepare(*BENCHMARK_REQUIRES[name])
+        gc.collect()
+        rss_before = _status_mb("VmRSS")
+        _reset_peak_rss()
+        start = time.perf_counter()
+        rows = BENCHMARK_REGISTRY[name](ws)
+        wall = time.perf_counter() - start
+    return {
+        "benchmark": name,
+        "tickers": ws.n_tickers,
+        "bars": ws.n_bars,
+        "rows": int(rows),
+        "wall_s": round(wall, 4),
+        "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+        "rss_before_mb": round(rss_before, 1) if rss_before is not None else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_benchmark(name: str, ws: Workspace, quiet: bool = True) -> Dict[str, Any]:
+    """
+    Run one registered benchmark in a fresh process, so its peak RSS is its own.
+
+    Returns:
+        Dict with benchmark, tickers, bars, rows, wall_s, rows_per_s,
+        rss_before_mb and peak_rss_mb.
+    """
+    if name not in BENCHMARK_REGISTRY:
+        raise ValueError(f"Unknown benchmark '{name}'. Valid: {list(BENCHMARK_REGISTRY)}")
+    ctx = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(_run_case, name, ws, quiet).result()
@@ -0,0 +1,37 @@
+# src/bench/synthetic.py
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Regular-session hourly bars, as yfinance returns them for US equities (UTC)
+SESSION_BAR_TIMES = ["13:30", "14:30", "15:30", "16:30", "17:30", "18:30", "19:30"]
+
+
+def trading_hours(n_bars: int, start: str = "2024-06-03") -> pd.DatetimeIndex:
+    """The first n_bars regular-session hourly timestamps from `start` (business days)."""
+    n_days = -(-n_bars // len(SESSION_BAR_TIMES))
+    days = pd.bdate_range(start, periods=n_days)
+    offsets = pd.to_timedelta([f"{t}:00" for t in SESSION_BAR_TIMES])
+    stamps = (days.values[:, None] + offsets.values[None, :]).ravel()[:n_bars]
+    return pd.DatetimeIndex(stamps)
+
+
+def synthetic_bars(n_bars: int, seed: int, start: str = "2024-06-03") -> pd.DataFrame:
+    """Hourly OHLCV random walk shaped like a yfinance download."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.005, n_bars))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, n_bars)),
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, n_bars).astype(np.int64),
+    }, index=trading_hours(n_bars, start))
+
+
+def synthetic_universe(n_tickers: int, n_bars: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Raw bars for tickers T0000, T0001, ... (ticker i uses seed + i)."""
+    return {f"T{i:04d}": synthetic_bars(n_bars, seed + i) for i in range(n_tickers)}
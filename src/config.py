@@ -7,8 +7,12 @@ LABEL_HORIZON_HOURS = 1  # how far ahead we predict
 
 # File paths
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-FEATURE_DIR = PROJECT_ROOT / "data" / "features"
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+FEATURE_DIR = PROJECT_ROOT / "data" / "features"  # legacy {split}/{ticker}.parquet layout
+FEATURE_STORE_DIR = PROJECT_ROOT / "data" / "feature_store"  # ticker=<T>/ partitions, split at query time
 MODEL_DIR = PROJECT_ROOT / "models"
+DATASET_CACHE_DIR = PROJECT_ROOT / "data" / "dataset_cache"  # labelled train/validate matrices
+DATASET_CACHE_MAX_BYTES = 20 * 1024**3  # least recently used entries are evicted beyond this
 
 # Training settings
 TEST_SIZE = 0.2  # fraction of data used for testing
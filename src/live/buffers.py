@@ -0,0 +1,71 @@
+# src/live/buffers.py
+"""
+Fixed-size per-ticker state for the live pipeline.
+
+Tickers get dense integer ids in first-seen order (TickerIndex), so every
+per-ticker buffer is a row of one NumPy array and a batch of bars (one per
+ticker at a timestamp) updates all of them with a single fancy-indexed write.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from preprocessing.online_features import grow_rows
+
+
+class TickerIndex:
+    """Dense integer ids for tickers, assigned in first-seen order."""
+
+    def __init__(self, tickers: Sequence[str] = ()):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.ids(tickers)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def ids(self, tickers: Sequence[str]) -> np.ndarray:
+        """Ids of `tickers`, registering the ones not seen before."""
+        out = np.empty(len(tickers), dtype=np.int64)
+        for i, ticker in enumerate(tickers):
+            tid = self._ids.get(ticker)
+            if tid is None:
+                tid = self._ids[ticker] = len(self.names)
+                self.names.append(ticker)
+            out[i] = tid
+        return out
+
+
+class BarRing:
+    """
+    The last `capacity` bars of every ticker, as one (tickers × capacity × fields)
+    ring. Pushing a bar overwrites the ticker's oldest slot.
+    """
+
+    def __init__(self, capacity: int, n_fields: int, n_tickers: int = 64):
+        if capacity < 1:
+            raise ValueError("Ring capacity must be at least 1")
+        self.capacity = capacity
+        self.n_fields = n_fields
+        self.values = np.full((n_tickers, capacity, n_fields), np.nan)
+        self.count = np.zeros(n_tickers, dtype=np.int64)  # bars pushed per ticker
+
+    def push(self, ids: np.ndarray, values: np.ndarray) -> None:
+        """Append one bar (a row of `values`, shape (len(ids), n_fields)) per ticker id."""
+        if len(ids) and ids.max() >= len(self.count):
+            self.values = grow_rows(self.values, int(ids.max()) + 1, np.nan)
+            self.count = grow_rows(self.count, int(ids.max()) + 1, 0)
+        self.values[ids, self.count[ids] % self.capacity] = values
+        self.count[ids] += 1
+
+    def window(self, ids: np.ndarray) -> np.ndarray:
+        """
+        The tickers' buffered bars oldest first, shape (capacity, len(ids), n_fields);
+        tickers with fewer bars are NaN-padded at the start.
+        """
+        # Slot of the k-th oldest bar: count - capacity + k (negative = not yet filled)
+        seq = self.count[ids][None, :] - self.capacity + np.arange(self.capacity)[:, None]
+        out = self.values[ids[None, :], seq % self.capacity]
+        out[seq < 0] = np.nan
+        return out
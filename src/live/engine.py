@@ -0,0 +1,116 @@
+# src/live/engine.py
+"""
+Feature engines for the live pipeline.
+
+An engine keeps per-ticker state for a fixed list of registered features and
+turns each new bar into that ticker's feature vector:
+
+    engine.push(ids, bars)           absorb bars (warm-up), no features
+    engine.update(ids, bars) -> X    absorb bars, return (len(ids) × features)
+
+`bars` holds one row of RAW_FIELDS (Open, High, Low, Close, Volume) per
+ticker id; ids come from a live.buffers.TickerIndex. `history` is the number
+of past bars a ticker needs before its features match the batch pipeline.
+"""
+
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from live.buffers import BarRing
+from preprocessing.features import (
+    FEATURE_REGISTRY, FEATURE_INPUTS, FEATURE_LOOKBACK,
+    INTERMEDIATE_REGISTRY, INTERMEDIATE_INPUTS, feature_plan
+)
+from preprocessing.online_features import ONLINE_REGISTRY, OnlineOps, missing_online
+from preprocessing.panel_features import RAW_FIELDS
+
+ENGINE_REGISTRY: Dict[str, Callable] = {}
+
+
+def register_engine(name: str):
+    """
+    Decorator to register a feature engine class.
+    Signature: cls(features: Sequence[str]) with push/update/history as above.
+    """
+    def decorator(cls):
+        if name in ENGINE_REGISTRY:
+            raise ValueError(f"Feature engine '{name}' is already registered.")
+        ENGINE_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def make_engine(name: str, features: Sequence[str]):
+    """Instantiate the registered engine `name` for `features`."""
+    if name not in ENGINE_REGISTRY:
+        raise ValueError(f"Unknown feature engine '{name}'. Valid: {list(ENGINE_REGISTRY)}")
+    return ENGINE_REGISTRY[name](features)
+
+
+@register_engine("window")
+class WindowFeatureEngine:
+    """
+    Registered batch features evaluated over a ring of each ticker's last
+    max(lookback) + 1 bars.
+
+    The ring is laid out as (bar × ticker) frames, as the panel engine does,
+    so each feature runs once per timestamp for every ticker that has a new
+    bar; the cost depends on the lookback, not on the length of history.
+    """
+
+    def __init__(self, features: Sequence[str]):
+        self.features = list(features)
+        self.plan = feature_plan(self.features)
+        self.history = max(FEATURE_LOOKBACK[f] for f in self.features) + 1 if self.features else 1
+        self.ring = BarRing(self.history, len(RAW_FIELDS))
+
+    def push(self, ids: np.ndarray, bars: np.ndarray) -> None:
+        self.ring.push(ids, bars)
+
+    def update(self, ids: np.ndarray, bars: np.ndarray) -> np.ndarray:
+        self.ring.push(ids, bars)
+        window = self.ring.window(ids)
+        fields = {name: pd.DataFrame(window[:, :, j]) for j, name in enumerate(RAW_FIELDS)}
+
+        intermediates = {}
+        for name in self.plan:
+            func = INTERMEDIATE_REGISTRY[name]
+            intermediates[name] = func(fields, **{i: intermediates[i] for i in INTERMEDIATE_INPUTS[name]})
+
+        out = np.empty((len(ids), len(self.features)))
+        for j, feature in enumerate(self.features):
+            func = FEATURE_REGISTRY[feature]
+            result = func(fields, **{i: intermediates[i] for i in FEATURE_INPUTS[feature]})
+            out[:, j] = np.asarray(result)[-1]
+        return out
+
+
+@register_engine("online")
+class OnlineFeatureEngine:
+    """
+    The features' online counterparts (preprocessing/online_features.py):
+    constant state per ticker and O(1) work per bar, vectorized across the
+    tickers of a timestamp.
+    """
+
+    def __init__(self, features: Sequence[str]):
+        missing = missing_online(features)
+        if missing:
+            raise ValueError(f"No online counterpart for features {missing}; use the 'window' engine")
+        self.features = list(features)
+        self.history = max(FEATURE_LOOKBACK[f] for f in self.features) + 1 if self.features else 1
+        self.ops = OnlineOps()
+        self._funcs = [ONLINE_REGISTRY[f] for f in self.features]
+
+    def push(self, ids: np.ndarray, bars: np.ndarray) -> None:
+        self.update(ids, bars)
+
+    def update(self, ids: np.ndarray, bars: np.ndarray) -> np.ndarray:
+        self.ops.begin(ids)
+        fields = {name: bars[:, j] for j, name in enumerate(RAW_FIELDS)}
+        out = np.empty((len(ids), len(self.features)))
+        for j, func in enumerate(self._funcs):
+            out[:, j] = func(fields, self.ops)
+        return out
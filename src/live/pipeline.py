@@ -0,0 +1,331 @@
+# src/live/pipeline.py
+"""
+Streaming mode: bars → incremental features → model scores → strategy decisions.
+
+LivePipeline consumes an async bar source (live/sources.py) and, for every
+timestamp, feeds the new bars through a feature engine (live/engine.py),
+scores them with the loaded model and calls the registered per-hour buy/sell
+strategies (sim/strategies.py) against a live portfolio book. Fills follow
+BacktestSimulator: sells first, in buy order, then buys while cash lasts.
+
+Bars of one timestamp are grouped and processed together. A group closes
+when every expected ticker has reported, when a bar of a later timestamp
+arrives, or `close_after` seconds after its first bar. Bars older than the
+last processed timestamp are dropped.
+
+A sim config drives it through a `live` section, e.g.
+
+    live:
+      source: {type: parquet_replay, start: "2025-05-02"}
+      features: online            # ENGINE_REGISTRY name (default: online)
+      warmup: true                # preload cached bars before the source's start
+                                  #   (or {raw_dir, interval, end})
+      close_after: 5.0            # seconds
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import MODEL_DIR, RAW_DIR
+from live.buffers import TickerIndex
+from live.engine import make_engine
+from live.sources import load_raw_bars, make_source
+from model.inference import LoadedModel
+from preprocessing.panel_features import RAW_FIELDS
+from sim.simulate import TRADE_LOG_COLUMNS, summarize_trades
+from sim.strategies import STRATEGY_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CLOSE = RAW_FIELDS.index("Close")
+
+
+class LiveBook:
+    """Cash, open positions (in buy order) and trade log of a live run."""
+
+    def __init__(self, initial_budget: float):
+        self.initial_budget = initial_budget
+        self.cash = float(initial_budget)
+        self.holdings: Dict[str, Dict[str, Any]] = {}
+        self.last_price: Dict[str, float] = {}
+        self.trades: List[Dict[str, Any]] = []
+
+    def sell(self, ts: pd.Timestamp, tickers: Sequence[str], prices: Sequence[float]) -> None:
+        """Close the positions of `tickers` at `prices`, in the order given."""
+        start, received = self.cash, 0.0
+        for ticker, price in zip(tickers, map(float, prices)):
+            info = self.holdings.pop(ticker)
+            value = info["quantity"] * price
+            received += value
+            self.cash = start + received
+            self._record(ts, ticker, "sell", info["quantity"], price, value,
+                         (price - info["buy_price"]) * info["quantity"])
+
+    def buy(self, ts: pd.Timestamp, tickers: Sequence[str], quantities: Sequence[int],
+            prices: Sequence[float]) -> None:
+        """
+        Open positions. Orders for tickers already held or with zero quantity
+        are dropped; the rest fill in order until one is unaffordable.
+        """
+        start, spent = self.cash, 0.0
+        for ticker, qty, price in zip(tickers, quantities, map(float, prices)):
+            qty = int(qty)
+            if ticker in self.holdings or qty <= 0:
+                continue
+            value = qty * price
+            if spent + value > start:
+                break
+            spent += value
+            self.cash = start - spent
+            self.holdings[ticker] = {"buy_time": ts, "quantity": qty, "buy_price": price}
+            self._record(ts, ticker, "buy", qty, price, value, np.nan)
+
+    def _record(self, ts, ticker, action, qty, price, value, pnl) -> None:
+        self.trades.append({
+            "timestamp": ts, "ticker": ticker, "action": action, "quantity": qty,
+            "price": price, "value": value, "pnl": pnl, "cash": self.cash,
+        })
+
+    def trade_log(self) -> pd.DataFrame:
+        return pd.DataFrame(self.trades, columns=TRADE_LOG_COLUMNS)
+
+    def summary(self) -> Dict[str, Any]:
+        holdings_value = float(sum(
+            info["quantity"] * self.last_price.get(ticker, 0.0) for ticker, info in self.holdings.items()
+        ))
+        return summarize_trades(self.trade_log(), self.initial_budget, self.cash,
+                                holdings_value, len(self.holdings))
+
+
+class LivePipeline:
+    """
+    Incremental features, scoring and strategy decisions for a stream of bars.
+
+    Args:
+        model: Scoring model; the engine computes model.features
+        engine: Feature engine built for model.features
+        buy_fn, sell_fn: Registered per-hour strategies (STRATEGY_REGISTRY)
+        tickers: Universe; a timestamp's group closes as soon as all of them report
+        close_after: Seconds after its first bar at which an incomplete group closes
+        on_decision: Optional callback(timestamp, trades, latency_s) per processed timestamp
+        queue_size: Bars buffered between ingest and processing
+    """
+
+    def __init__(
+        self,
+        model: LoadedModel,
+        engine,
+        buy_fn: Callable,
+        buy_params: Dict[str, Any],
+        sell_fn: Callable,
+        sell_params: Dict[str, Any],
+        initial_budget: float = 1000.0,
+        cooldown_hours: float = 3,
+        tickers: Optional[Sequence[str]] = None,
+        close_after: Optional[float] = None,
+        on_decision: Optional[Callable] = None,
+        queue_size: int = 10_000
+    ):
+        self.model = model
+        self.engine = engine
+        self.buy_fn, self.buy_params = buy_fn, buy_params
+        self.sell_fn, self.sell_params = sell_fn, sell_params
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.index = TickerIndex(tickers or ())
+        self.expected = len(tickers) if tickers else None
+        self.close_after = close_after
+        self.on_decision = on_decision
+        self.queue_size = queue_size
+
+        self.book = LiveBook(initial_budget)
+        self.last_time: Optional[pd.Timestamp] = None
+        self.latencies: List[float] = []
+        self.bars_processed = 0
+        self.late_bars = 0
+
+    # ——— Synchronous core ———
+
+    def warm_up(self, bars: pd.DataFrame) -> None:
+        """
+        Absorb historical bars (a long frame with 'timestamp', 'ticker' and
+        RAW_FIELDS, time-ordered) into the engine state, without scoring.
+        Only each ticker's last engine.history bars are used.
+        """
+        if bars.empty:
+            return
+        bars = bars.groupby("ticker", sort=False).tail(self.engine.history)
+        times = bars["timestamp"].to_numpy()
+        tickers = bars["ticker"].to_numpy()
+        values = bars[list(RAW_FIELDS)].to_numpy(dtype=np.float64)
+        bounds = np.flatnonzero(np.r_[True, times[1:] != times[:-1], True])
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            self.engine.push(self.index.ids(tickers[lo:hi]), values[lo:hi])
+        self.last_time = pd.Timestamp(times[-1])
+        logger.info("Warmed up on %d bars of %d tickers", len(bars), len(set(tickers)))
+
+    def on_bars(self, ts: pd.Timestamp, tickers: Sequence[str], values: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Process one timestamp: one bar (a row of RAW_FIELDS in `values`) per
+        ticker. Returns the trades it triggered.
+        """
+        ids = self.index.ids(tickers)
+        order = np.argsort(ids, kind="stable")  # universe order, as in the backtest frame
+        ids, values = ids[order], values[order]
+        scores = self.model.score(self.engine.update(ids, values))
+        self.bars_processed += len(ids)
+        self.last_time = ts
+
+        # Rows without a score (warm-up) or price are invisible to the strategies
+        ok = np.isfinite(scores) & np.isfinite(values[:, CLOSE])
+        if not ok.any():
+            return []
+        names = np.asarray(self.index.names, dtype=object)[ids[ok]]
+        prices = values[ok, CLOSE]
+        hour_df = pd.DataFrame({"timestamp": ts, "ticker": names, "Close": prices, "score": scores[ok]})
+        book = self.book
+        book.last_price.update(zip(names, prices))
+        n_trades = len(book.trades)
+
+        # Sells first (positions with a bar this hour, in buy order), then buys
+        price_of = dict(zip(names, prices))
+        to_sell = set(self.sell_fn(hour_df, book.holdings, self.sell_params, self.cooldown))
+        selling = [t for t in book.holdings if t in to_sell and t in price_of]
+        book.sell(ts, selling, [price_of[t] for t in selling])
+
+        orders = self.buy_fn(hour_df, book.cash, self.buy_params)
+        buys = np.flatnonzero((orders["action"] == "buy").to_numpy())
+        if len(buys):
+            book.buy(ts, names[buys], orders["quantity"].to_numpy(dtype=np.int64)[buys], prices[buys])
+        return book.trades[n_trades:]
+
+    def summary(self) -> Dict[str, Any]:
+        return self.book.summary()
+
+    # ——— Asynchronous driver ———
+
+    async def run(self, source) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Consume `source` until it ends.
+
+        Returns:
+            (trade_log, summary) as BacktestSimulator.run returns them.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._ingest(source, queue))
+        try:
+            await self._consume(queue)
+        finally:
+            producer.cancel()
+        return self.book.trade_log(), self.summary()
+
+    async def _ingest(self, source, queue: asyncio.Queue) -> None:
+        error = None
+        try:
+            async for bar in source:
+                await queue.put((bar, time.perf_counter()))
+        except Exception as e:  # surfaced by the consumer, after the bars before it
+            error = e
+        await queue.put((None, error))
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        ts, group, opened = None, {}, 0.0
+        while True:
+            if not queue.empty():
+                item = queue.get_nowait()
+            elif ts is not None and self.close_after is not None:
+                try:
+                    item = await asyncio.wait_for(queue.get(), opened + self.close_after - time.perf_counter())
+                except asyncio.TimeoutError:
+                    self._close(ts, group, time.perf_counter())
+                    ts, group = None, {}
+                    continue
+            else:
+                item = await queue.get()
+
+            bar, received = item
+            if bar is None:
+                if group:
+                    self._close(ts, group, time.perf_counter())
+                if received is not None:
+                    raise received
+                return
+            # Deadlines are judged by arrival time, so a backlog does not split groups
+            expired = self.close_after is not None and received > opened + self.close_after
+            if ts is not None and (bar.timestamp > ts or expired):
+                self._close(ts, group, received)
+                ts, group = None, {}
+            if (ts is None and self.last_time is not None and bar.timestamp <= self.last_time) or (
+                    ts is not None and bar.timestamp < ts):
+                self.late_bars += 1
+                logger.warning("Dropping late bar %s %s (already at %s)", bar.ticker, bar.timestamp,
+                               ts if ts is not None else self.last_time)
+                continue
+            if ts is None:
+                ts, opened = bar.timestamp, received
+            group[bar.ticker] = bar[2:]  # a revised bar replaces the earlier one
+            if self.expected is not None and len(group) >= self.expected:
+                self._close(ts, group, received)
+                ts, group = None, {}
+
+    def _close(self, ts: pd.Timestamp, group: Dict[str, tuple], trigger: float) -> None:
+        trades = self.on_bars(ts, list(group), np.array(list(group.values()), dtype=np.float64))
+        latency = time.perf_counter() - trigger
+        self.latencies.append(latency)
+        if self.on_decision is not None:
+            self.on_decision(ts, trades, latency)
+
+
+def build_pipeline(
+    sim_cfg: Dict[str, Any],
+    model_dir: Path = MODEL_DIR,
+    on_decision: Optional[Callable] = None
+) -> Tuple[LivePipeline, Any]:
+    """
+    A LivePipeline and its bar source for a sim config (model_id, tickers_file,
+    buy/sell strategies and params, initial_budget, cooldown_hours,
+    compiled_model, live). With live.warmup (default: on when the source has
+    a start), the engine is first fed the cached raw bars before that start,
+    or before warmup.end when warmup is a {raw_dir, interval, end} mapping
+    (all cached bars if neither is set).
+
+    Returns:
+        (pipeline, source)
+    """
+    live = sim_cfg.get("live") or {}
+    for name in (sim_cfg["buy_strategy"], sim_cfg["sell_strategy"]):
+        if name not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy '{name}'")
+    tickers = [t.strip() for t in Path(sim_cfg["tickers_file"]).read_text().splitlines() if t.strip()]
+
+    model = LoadedModel.load(model_dir, sim_cfg["model_id"], compiled=sim_cfg.get("compiled_model", False))
+    engine = make_engine(live.get("features", "online"), model.features)
+    sell_params = sim_cfg.get("sell_params", {})
+    pipeline = LivePipeline(
+        model, engine,
+        STRATEGY_REGISTRY[sim_cfg["buy_strategy"]], sim_cfg.get("buy_params", {}),
+        STRATEGY_REGISTRY[sim_cfg["sell_strategy"]], sell_params,
+        initial_budget=sim_cfg.get("initial_budget", 1000.0),
+        cooldown_hours=sim_cfg.get("cooldown_hours", sell_params.get("hold_hours", 3)),
+        tickers=tickers,
+        close_after=live.get("close_after"),
+        on_decision=on_decision
+    )
+
+    spec = live.get("source") or {}
+    warmup = live.get("warmup", "start" in spec)
+    if warmup:
+        opts = warmup if isinstance(warmup, dict) else {}
+        pipeline.warm_up(load_raw_bars(
+            tickers,
+            opts.get("raw_dir", spec.get("raw_dir", RAW_DIR)),
+            opts.get("interval", spec.get("interval", "1h")),
+            end=opts.get("end", spec.get("start"))
+        ))
+    return pipeline, make_source(spec, tickers)
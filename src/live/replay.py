@@ -0,0 +1,122 @@
+# src/live/replay.py
+"""
+Replay harness: backtest a sim config from the raw bar cache through the
+live code path (LivePipeline: incremental features, model, per-hour
+strategies), as fast as possible or time-scaled, and check it against the
+vectorized backtest.
+
+The replayed window is the one run_backtest would simulate: the config's
+feature_split, narrowed by start_date / end_date. The pipeline is warmed up
+on the cached bars before it. The report has throughput (bars/s), decision
+latency percentiles and, with compare=True, whether the trade log matches
+BacktestSimulator on the feature store's scores.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_STORE_DIR, MODEL_DIR, RAW_DIR
+from live.pipeline import build_pipeline
+from preprocessing.feature_store import split_bounds
+from sim.scoring import load_scored_data
+from sim.sweep import run_config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def replay_window(sim_cfg: Dict[str, Any]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """[start, end) of the bars run_backtest would simulate for sim_cfg."""
+    start, end = split_bounds(sim_cfg.get("feature_split", "test"))
+    if sim_cfg.get("start_date"):
+        start = max(start, pd.Timestamp(sim_cfg["start_date"]))
+    if sim_cfg.get("end_date"):
+        end = min(end, pd.Timestamp(sim_cfg["end_date"]) + pd.Timedelta(1, "ns"))  # end_date is inclusive
+    return start, end
+
+
+def first_mismatch(expected: pd.DataFrame, actual: pd.DataFrame, rtol: float = 1e-9) -> Optional[int]:
+    """Index of the first trade where two trade logs differ, or None if they match."""
+    n = min(len(expected), len(actual))
+    same = (
+        (expected["timestamp"].to_numpy()[:n] == actual["timestamp"].to_numpy()[:n])
+        & (expected["ticker"].to_numpy()[:n] == actual["ticker"].to_numpy()[:n])
+        & (expected["action"].to_numpy()[:n] == actual["action"].to_numpy()[:n])
+        & (expected["quantity"].to_numpy()[:n] == actual["quantity"].to_numpy()[:n])
+    )
+    for col in ("price", "cash"):
+        same &= np.isclose(expected[col].to_numpy(dtype=np.float64)[:n],
+                           actual[col].to_numpy(dtype=np.float64)[:n], rtol=rtol)
+    bad = np.flatnonzero(~same)
+    if len(bad):
+        return int(bad[0])
+    return None if len(expected) == len(actual) else n
+
+
+def run_replay(
+    sim_cfg: Dict[str, Any],
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR,
+    raw_dir: Path = RAW_DIR,
+    speed: Optional[float] = None,
+    compare: bool = True
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Replay a sim config's window bar by bar through LivePipeline.
+
+    Args:
+        sim_cfg: Simulation config; its `live` section may pick the feature
+            engine (live.features) and interval (live.source.interval)
+        speed: Market seconds per wall second (None = as fast as possible)
+        compare: Also run the vectorized backtest and compare trade logs
+
+    Returns:
+        (trade_log, report) where report has bars, timestamps, wall_s,
+        bars_per_s, latency_ms (p50/p90/p99/max), late_bars, summary and,
+        with compare, backtest_summary, matches_backtest and first_mismatch.
+    """
+    start, end = replay_window(sim_cfg)
+    cfg = copy.deepcopy(sim_cfg)
+    live = cfg.setdefault("live", {})
+    interval = (live.get("source") or {}).get("interval", "1h")
+    live["source"] = {"type": "parquet_replay", "raw_dir": str(raw_dir), "interval": interval,
+                      "start": str(start), "end": str(end), "speed": speed}
+    live.setdefault("warmup", True)
+    logger.info("Replaying %s → %s from %s (%s)", start, end, raw_dir,
+                f"{speed:g}x" if speed else "as fast as possible")
+
+    pipeline, source = build_pipeline(cfg, model_dir)
+    began = time.perf_counter()
+    trade_log, summary = asyncio.run(pipeline.run(source))
+    wall = time.perf_counter() - began
+
+    latencies = np.asarray(pipeline.latencies) * 1e3
+    report: Dict[str, Any] = {
+        "bars": pipeline.bars_processed,
+        "timestamps": len(latencies),
+        "wall_s": round(wall, 3),
+        "bars_per_s": round(pipeline.bars_processed / wall, 1) if wall else None,
+        "latency_ms": {
+            **{f"p{q}": round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+               for q in LATENCY_PERCENTILES},
+            "max": round(float(latencies.max()), 3) if len(latencies) else None,
+        },
+        "late_bars": pipeline.late_bars,
+        "summary": summary,
+    }
+
+    if compare:
+        backtest_log, backtest_summary = run_config(load_scored_data(sim_cfg, feature_dir, model_dir), sim_cfg)
+        mismatch = first_mismatch(backtest_log, trade_log)
+        report["backtest_summary"] = backtest_summary
+        report["matches_backtest"] = mismatch is None
+        report["first_mismatch"] = mismatch
+    return trade_log, report
@@ -0,0 +1,181 @@
+# src/live/sources.py
+"""
+Pluggable asynchronous bar sources for the live pipeline.
+
+A source is an async iterable of Bar, in non-decreasing timestamp order.
+Sources are registered by name and built from the `live.source` section of
+a sim config, e.g.
+
+    live:
+      source:
+        type: parquet_replay      # or file_tail
+        interval: 1h
+        start: "2025-05-02"
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import RAW_DIR
+from preprocessing.panel_features import RAW_FIELDS
+from preprocessing.raw_cache import RawBarCache
+
+SOURCE_REGISTRY: Dict[str, Callable] = {}
+
+
+class Bar(NamedTuple):
+    timestamp: pd.Timestamp
+    ticker: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def register_source(name: str):
+    """
+    Decorator to register a bar source class.
+    Signature: cls(tickers: Sequence[str], **params), async-iterable over Bar.
+    """
+    def decorator(cls):
+        if name in SOURCE_REGISTRY:
+            raise ValueError(f"Bar source '{name}' is already registered.")
+        SOURCE_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def make_source(spec: Dict, tickers: Sequence[str]):
+    """Build the source described by a `live.source` config section."""
+    params = dict(spec)
+    name = params.pop("type", "parquet_replay")
+    if name not in SOURCE_REGISTRY:
+        raise ValueError(f"Unknown bar source '{name}'. Valid: {list(SOURCE_REGISTRY)}")
+    return SOURCE_REGISTRY[name](tickers, **params)
+
+
+def load_raw_bars(
+    tickers: Sequence[str],
+    raw_dir: Path = RAW_DIR,
+    interval: str = "1h",
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Cached raw bars (the fetch_many cache, see preprocessing/raw_cache.py) in
+    [start, end), as one long frame with 'timestamp' and 'ticker' columns,
+    ordered by timestamp and then by the order of `tickers`.
+    """
+    cache = RawBarCache(raw_dir, interval)
+    frames = []
+    for ticker in tickers:
+        df = cache.read(ticker, start, end, columns=RAW_FIELDS)
+        if df is None:
+            continue
+        frames.append(df.assign(ticker=ticker))
+    if not frames:
+        return pd.DataFrame(columns=["timestamp", "ticker", *RAW_FIELDS])
+    df = pd.concat(frames)
+    df.index = pd.to_datetime(df.index)
+    df = df.rename_axis("timestamp").reset_index()
+    return df.iloc[np.argsort(df["timestamp"].to_numpy(), kind="stable")].reset_index(drop=True)
+
+
+@register_source("parquet_replay")
+class ParquetReplaySource:
+    """
+    Replay cached raw bars from the fetch_many cache, as fast as they are
+    consumed or, with `speed`, time-scaled: each timestamp is released
+    (its market time since the first one) / speed seconds after the start,
+    e.g. speed=3600 plays an hour of bars per second.
+    """
+
+    def __init__(self, tickers: Sequence[str], raw_dir: Path = RAW_DIR, interval: str = "1h",
+                 start: Optional[str] = None, end: Optional[str] = None, speed: Optional[float] = None):
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.tickers = list(tickers)
+        self.raw_dir = Path(raw_dir)
+        self.interval = interval
+        self.start = start
+        self.end = end
+        self.speed = speed
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        df = await asyncio.to_thread(
+            load_raw_bars, self.tickers, self.raw_dir, self.interval, self.start, self.end
+        )
+        times = pd.DatetimeIndex(df["timestamp"])
+        tickers = df["ticker"].to_numpy()
+        values = df[list(RAW_FIELDS)].to_numpy(dtype=np.float64)
+        bounds = np.flatnonzero(np.r_[True, times[1:] != times[:-1], True]) if len(df) else [0]
+        started = time.perf_counter()
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            ts = times[lo]
+            if self.speed:
+                # Against an absolute schedule, so sleeps and processing do not drift
+                delay = started + (ts - times[0]).total_seconds() / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            for i in range(lo, hi):
+                yield Bar(ts, tickers[i], *values[i])
+            await asyncio.sleep(0)  # one timestamp at a time: let the pipeline run
+
+
+@register_source("file_tail")
+class FileTailSource:
+    """
+    Follow a CSV file of bars as another process appends to it, one bar per
+    line: timestamp,ticker,open,high,low,close,volume (a header line is
+    skipped). Stops after `idle_timeout` seconds without new lines, or never
+    if it is None.
+    """
+
+    def __init__(self, tickers: Sequence[str], path: Path, poll_interval: float = 0.5,
+                 from_start: bool = True, idle_timeout: Optional[float] = None):
+        self.tickers = set(tickers) if tickers else None
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.idle_timeout = idle_timeout
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        while not self.path.exists():
+            await asyncio.sleep(self.poll_interval)
+        with self.path.open() as f:
+            if not self.from_start:
+                f.seek(0, 2)
+            partial = ""
+            last_data = time.monotonic()
+            while True:
+                line = f.readline()
+                if not line:
+                    if self.idle_timeout is not None and time.monotonic() - last_data > self.idle_timeout:
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                last_data = time.monotonic()
+                if not line.endswith("\n"):  # the writer is mid-line
+                    partial += line
+                    continue
+                line, partial = partial + line, ""
+                bar = self._parse(line)
+                if bar is not None:
+                    yield bar
+
+    def _parse(self, line: str) -> Optional[Bar]:
+        parts = line.strip().split(",")
+        if len(parts) != 7 or parts[0] == "timestamp":
+            return None
+        ts, ticker = pd.Timestamp(parts[0]), parts[1]
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)  # bars are naive UTC throughout
+        if self.tickers is not None and ticker not in self.tickers:
+            return None
+        return Bar(ts, ticker, *map(float, parts[2:]))
@@ -0,0 +1,162 @@
+# src/model/batch.py
+
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import DATASET_CACHE_DIR, FEATURE_SETS, FEATURE_STORE_DIR, MODEL_DIR
+from model.train import fit_model, load_training_data, save_model, train_from_config
+from model.utils import load_config
+from preprocessing.shared_panel import FramesHandle, attach_frames, share_frames
+
+logger = logging.getLogger(__name__)
+
+# Config keys that decide which rows and labels get loaded; configs agreeing
+# on all of them share one load + label pass
+DATA_KEYS = ("tickers_file", "feature_set", "label_method", "compact")
+
+# Model types whose params take an `n_jobs` thread count
+THREADED_MODELS = {"xgboost", "xgboost_regressor", "random_forest", "random_forest_regressor"}
+
+_BATCH_DATA: Optional[Dict[str, Any]] = None
+
+
+def collect_configs(patterns: Sequence[str]) -> List[Path]:
+    """
+    Resolve config directories (every *.yaml / *.yml inside) and glob
+    patterns to a sorted, de-duplicated list of config files.
+    """
+    paths = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.update(path.glob("*.yaml"))
+            paths.update(path.glob("*.yml"))
+        else:
+            paths.update(Path(p) for p in glob.glob(pattern, recursive=True))
+    return sorted(paths)
+
+
+def group_configs(configs: Sequence[Dict[str, Any]]) -> Dict[Tuple, List[Dict[str, Any]]]:
+    """Group in-memory configs by their DATA_KEYS; streaming configs form one group of their own."""
+    groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+    for config in configs:
+        if config.get("streaming"):
+            key = ("streaming",)
+        else:
+            key = tuple(config.get(k, False) if k == "compact" else config[k] for k in DATA_KEYS)
+        groups.setdefault(key, []).append(config)
+    return groups
+
+
+def _init_worker(handle: Optional[FramesHandle]) -> None:
+    global _BATCH_DATA
+    _BATCH_DATA = attach_frames(handle).data() if handle is not None else None
+
+
+def _train_job(config: Dict[str, Any], feature_dir: Path, model_dir: Path,
+               threads: Optional[int]) -> Dict[str, Any]:
+    """Train and save one config, on the worker's shared data when it has some."""
+    start = time.perf_counter()
+    try:
+        if _BATCH_DATA is None:
+            train_from_config(config, feature_dir, model_dir)
+        else:
+            params = dict(config.get("model_params", {}))
+            if threads and config["model_type"].lower() in THREADED_MODELS:
+                params.setdefault("n_jobs", threads)
+            model, y_val, y_pred = fit_model(config, _BATCH_DATA, params)
+            save_model(config, model_dir, model, y_val, y_pred, FEATURE_SETS[config["feature_set"]])
+        status = "ok"
+    except (Exception, SystemExit) as e:
+        status = f"failed: {type(e).__name__}: {e}"
+        logger.error("Training failed for '%s': %s", config["model_id"], e)
+    return {
+        "model_id": config["model_id"],
+        "model_type": config["model_type"],
+        "wall_s": round(time.perf_counter() - start, 3),
+        "status": status,
+    }
+
+
+def train_batch(
+    configs: Sequence[Dict[str, Any]],
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR,
+    max_workers: Optional[int] = None,
+    threads_per_job: Optional[int] = None,
+    cache_dir: Optional[Path] = DATASET_CACHE_DIR
+) -> List[Dict[str, Any]]:
+    """
+    Train many configs, loading and labelling each data group only once.
+
+    Configs are grouped by DATA_KEYS; each group's splits are loaded in this
+    process and copied once into shared memory (preprocessing/shared_panel.py),
+    which a pool of `max_workers` processes maps to fit the group's models
+    concurrently. XGBoost and random
+    forest models get `n_jobs = threads_per_job` unless their params set it.
+    Streaming configs are trained on their own by train_from_config.
+
+    Returns:
+        One dict per config: model_id, model_type, group, load_s, wall_s, status.
+    """
+    seen = set()
+    for config in configs:
+        if config["model_id"] in seen:
+            raise ValueError(f"Duplicate model_id '{config['model_id']}' in batch")
+        seen.add(config["model_id"])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    ctx = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+    if threads_per_job is None:
+        threads_per_job = max(1, (os.cpu_count() or 1) // max_workers)
+
+    results = []
+    for key, group in group_configs(configs).items():
+        data, load_s = None, 0.0
+        if key[0] != "streaming":
+            first = group[0]
+            tickers_file = Path(first["tickers_file"])
+            tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+            logger.info("Loading %s for %d configs", dict(zip(DATA_KEYS, key)), len(group))
+            start = time.perf_counter()
+            try:
+                data = load_training_data(first, tickers, FEATURE_SETS[first["feature_set"]],
+                                          feature_dir, cache_dir)
+            except (Exception, SystemExit) as e:
+                logger.error("Loading failed for group %s: %s", key, e)
+                results.extend({
+                    "model_id": c["model_id"], "model_type": c["model_type"], "group": str(key),
+                    "load_s": 0.0, "wall_s": 0.0, "status": f"failed: {type(e).__name__}: {e}",
+                } for c in group)
+                continue
+            load_s = round(time.perf_counter() - start, 3)
+
+        shared = share_frames(data) if data is not None else None
+        del data
+        try:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(group)), mp_context=ctx,
+                                     initializer=_init_worker,
+                                     initargs=(shared.handle if shared else None,)) as pool:
+                futures = [pool.submit(_train_job, c, feature_dir, model_dir, threads_per_job) for c in group]
+                for future in futures:
+                    results.append(dict(future.result(), group=str(key), load_s=load_s))
+        finally:
+            if shared is not None:
+                shared.close()
+                shared.unlink()
+    return results
+
+
+def load_batch_configs(patterns: Sequence[str]) -> List[Dict[str, Any]]:
+    """Load every config matched by collect_configs."""
+    paths = collect_configs(patterns)
+    if not paths:
+        raise ValueError(f"No config files match {list(patterns)}")
+    return [load_config(path) for path in paths]
@@ -0,0 +1,125 @@
+# src/model/compiled.py
+"""
+Lightweight predictor for exported tree ensembles (see model/export.py).
+
+An exported model is a directory holding forest.npz, every tree of the
+ensemble flattened into shared node arrays, and export.json (feature order,
+split rule, how tree outputs combine). Loading it reads a few arrays and
+imports nothing beyond NumPy, so scoring processes skip unpickling and the
+sklearn / xgboost import chain.
+
+Node arrays (one entry per node, all trees concatenated):
+    feature       feature column tested at the node
+    threshold     split value (float64, so sklearn's midpoints stay exact)
+    left, right   global index of the children; a leaf points at itself
+    default_left  where a NaN feature value goes
+    value         the leaf's output (unused at inner nodes)
+plus `roots`, the root node of each tree. Because leaves loop back on
+themselves, `depth` rounds of "step to a child" settle every row on its leaf
+in every tree at once, with no per-row branching.
+
+This favours cold starts and small batches (live scoring); for very large
+batches of big boosted ensembles the native library is still faster (see
+scripts/benchmark_compiled_model.py).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+COMPILED_DIR = "compiled"  # under model_dir/model_id
+FOREST_FILE = "forest.npz"
+META_FILE = "export.json"
+NODE_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "value", "roots")
+BLOCK_ROWS = 256
+
+# Ensembles combine tree outputs as a mean (random forests) or a sum plus a
+# base margin (boosting), then apply a link
+LINKS = {
+    "identity": lambda margin: margin,
+    "sigmoid": lambda margin: 1.0 / (1.0 + np.exp(-margin)),
+}
+
+
+def write_forest(path: Path, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Path:
+    """Write node arrays and metadata as an exported model directory."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    np.savez(path / FOREST_FILE, **{name: arrays[name] for name in NODE_ARRAYS})
+    (path / META_FILE).write_text(json.dumps(meta, indent=2))
+    return path
+
+
+class CompiledForest:
+    """
+    Scores a flattened tree ensemble with vectorized NumPy traversal.
+
+    predict(X) returns what the source model's scoring call would: P(class 1)
+    for classifiers, the prediction for regressors.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.meta = meta
+        self.features = list(meta["features"])
+        self.regression = bool(meta["regression"])
+        self.depth = int(meta["depth"])
+        self.aggregate = meta["aggregate"]
+        self.base_margin = float(meta.get("base_margin", 0.0))
+        self.link = LINKS[meta["link"]]
+        # "le" (sklearn): x <= threshold goes left; "lt" (XGBoost): x < threshold
+        self._goes_left = np.less_equal if meta["split"] == "le" else np.less
+
+        self.feature = arrays["feature"].astype(np.intp)
+        self.threshold = arrays["threshold"].astype(np.float64)
+        self.default_left = arrays["default_left"].astype(bool)
+        self.value = arrays["value"].astype(np.float64)
+        self.roots = arrays["roots"].astype(np.intp)
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.column_stack([arrays["left"], arrays["right"]]).astype(np.intp).ravel()
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledForest":
+        path = Path(path)
+        meta = json.loads((path / META_FILE).read_text())
+        with np.load(path / FOREST_FILE) as npz:
+            arrays = {name: npz[name] for name in NODE_ARRAYS}
+        return cls(arrays, meta)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(rows × trees) leaf node reached by each row in each tree."""
+        X = np.asarray(X, dtype=np.float32)  # both libraries split on float32 features
+        has_nan = bool(np.isnan(X).any())
+        n_features = X.shape[1]
+        X = X.ravel()
+        row_offset = (np.arange(len(X) // n_features) * n_features)[:, None]
+        node = np.broadcast_to(self.roots, (len(row_offset), self.n_trees))
+        for _ in range(self.depth):
+            x = X[row_offset + self.feature[node]]
+            go_left = self._goes_left(x, self.threshold[node])
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+            node = self.children[2 * node + ~go_left]
+        return node
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Scores for a (rows × features) matrix in `features` order."""
+        margin = np.empty(len(X))
+        # Row blocks keep the (rows × trees) node matrices cache-sized
+        for start in range(0, len(X), BLOCK_ROWS):
+            values = self.value[self.leaves(X[start:start + BLOCK_ROWS])]
+            if self.aggregate == "mean":
+                margin[start:start + BLOCK_ROWS] = values.mean(axis=1)
+            else:
+                margin[start:start + BLOCK_ROWS] = values.sum(axis=1) + self.base_margin
+        return self.link(margin)
+
+
+def load_compiled(path: Path) -> CompiledForest:
+    """Load an exported model directory (model_dir/model_id/compiled)."""
+    return CompiledForest.load(path)
@@ -0,0 +1,153 @@
+# src/model/dataset_cache.py
+"""
+On-disk cache of labelled training matrices.
+
+An entry holds, per split, X as (rows × features) .npy arrays, one per
+column dtype, y as a .npy vector and the rows' (timestamp, ticker) identity,
+plus a meta.json. Entries are keyed by a hash of everything the matrices are
+derived from (tickers, features, label method, dtype, split
+bounds and the feature files' paths, sizes and mtimes), so rewriting a
+feature file or changing SPLIT_BOUNDS simply misses. Hits are memory-mapped,
+not read. Least recently used entries are evicted beyond a size cap.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DATASET_CACHE_MAX_BYTES, SPLIT_BOUNDS
+from preprocessing.filter_feature_data import resolve_feature_files
+from preprocessing.shared_panel import PANEL_META, is_panel
+
+# Bump when labelling or cleaning changes what a given key produces
+CACHE_VERSION = 3
+
+Dataset = Dict[str, Tuple[pd.DataFrame, pd.Series]]
+
+
+def dataset_key(
+    feature_dir: Path,
+    tickers: Sequence[str],
+    feature_list: Sequence[str],
+    label_method: str,
+    compact: bool,
+    splits: Sequence[str] = ("train", "validate")
+) -> str:
+    """Content hash identifying the labelled matrices for these inputs."""
+    files = []
+    # A shared panel is rewritten as a whole, so its metadata file stands for it
+    paths = [Path(feature_dir) / PANEL_META] if is_panel(feature_dir) else resolve_feature_files(feature_dir, tickers)
+    for path in paths:
+        stat = os.stat(path)
+        files.append([Path(path).resolve().as_posix(), stat.st_size, stat.st_mtime_ns])
+    spec = {
+        "version": CACHE_VERSION,
+        "tickers": list(tickers),
+        "features": list(feature_list),
+        "label_method": label_method,
+        "compact": bool(compact),
+        "splits": {split: list(map(str, SPLIT_BOUNDS[split])) for split in splits},
+        "files": files,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:32]
+
+
+class DatasetCache:
+    """LRU-capped directory of labelled datasets, one sub-directory per key."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DATASET_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Optional[Dataset]:
+        """Memory-map a cached dataset, or None on a miss."""
+        entry = self.cache_dir / key
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        data = {}
+        for split in meta["splits"]:
+            columns = {}
+            for k, (_, names) in enumerate(meta["blocks"]):
+                block = np.load(entry / f"{split}_X{k}.npy", mmap_mode="r")
+                columns.update((name, block[:, j]) for j, name in enumerate(names))
+            y = np.load(entry / f"{split}_y.npy", mmap_mode="r")
+            rows = np.load(entry / f"{split}_rows.npz", allow_pickle=False)
+            index = pd.MultiIndex.from_arrays(
+                [pd.DatetimeIndex(rows["timestamp"]), rows["ticker"]], names=["timestamp", "ticker"]
+            )
+            data[split] = (
+                pd.DataFrame({f: columns[f] for f in meta["features"]}, index=index, copy=False),
+                pd.Series(y, index=index, name="target", copy=False),
+            )
+        os.utime(meta_path)  # last access, for LRU eviction
+        return data
+
+    def put(self, key: str, data: Dataset) -> Path:
+        """Write a dataset under key (atomically), then evict down to the size cap."""
+        entry = self.cache_dir / key
+        tmp = self.cache_dir / f".tmp-{key}-{uuid.uuid4().hex[:8]}"
+        tmp.mkdir(parents=True)
+        features, blocks = None, None
+        for split, (X, y) in data.items():
+            features = list(X.columns)
+            # One (rows × columns) block per dtype, so a compact float32 frame
+            # with integer columns comes back with the same dtypes
+            blocks = {}
+            for name, dtype in X.dtypes.items():
+                blocks.setdefault(np.dtype(dtype).str, []).append(name)
+            blocks = list(blocks.items())
+            for k, (dtype, names) in enumerate(blocks):
+                np.save(tmp / f"{split}_X{k}.npy", np.ascontiguousarray(X[names].to_numpy(dtype=dtype)))
+            np.save(tmp / f"{split}_y.npy", y.to_numpy())
+            np.savez(
+                tmp / f"{split}_rows.npz",
+                timestamp=X.index.get_level_values("timestamp").as_unit("ns").to_numpy(),
+                ticker=X.index.get_level_values("ticker").to_numpy(dtype=str),
+            )
+        (tmp / "meta.json").write_text(json.dumps({
+            "key": key,
+            "splits": list(data),
+            "features": features,
+            "blocks": blocks,
+            "rows": {split: len(X) for split, (X, _) in data.items()},
+        }))
+        try:
+            tmp.rename(entry)
+        except OSError:  # written concurrently by another run
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+        return entry
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes
+        (never the `keep` entry). Returns the number of entries removed.
+        """
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            meta_path = entry / "meta.json"
+            if not meta_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((meta_path.stat().st_mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
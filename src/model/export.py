@@ -0,0 +1,207 @@
+# src/model/export.py
+"""
+Export trained tree ensembles to the compiled format read by
+model/compiled.py, under model_dir/model_id/compiled/.
+
+XGBoost models are flattened from the booster's JSON dump (the native
+model.ubj is written alongside); random forests from their sklearn tree_
+arrays. Either way the result scores like the pickled model, without it.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model.compiled import COMPILED_DIR, CompiledForest, write_forest
+from model.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+EXPORT_REGISTRY: Dict[str, Callable] = {}
+
+# XGBoost objectives the compiled predictor reproduces, and their link
+XGB_LINKS = {
+    "binary:logistic": "sigmoid",
+    "reg:logistic": "sigmoid",
+    "reg:squarederror": "identity",
+    "reg:absoluteerror": "identity",
+    "reg:pseudohubererror": "identity",
+}
+
+
+def register_exporter(*names: str):
+    """
+    Decorator to register the exporter of one or more model types.
+    Signature: fn(model, features) -> (node arrays, metadata)
+    """
+    def decorator(fn: Callable):
+        for name in names:
+            if name in EXPORT_REGISTRY:
+                raise ValueError(f"Exporter for '{name}' is already registered.")
+            EXPORT_REGISTRY[name] = fn
+        return fn
+    return decorator
+
+
+def _flatten(trees: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatenate per-tree node arrays (local child indices, -1 at leaves) into
+    the global layout of compiled.py, where leaves point at themselves.
+    """
+    parts = {name: [] for name in ("feature", "threshold", "left", "right", "default_left", "value")}
+    roots, offset, depth = [], 0, 0
+    for tree in trees:
+        n = len(tree["left"])
+        local = np.arange(n)
+        leaf = tree["left"] < 0
+        parts["left"].append(np.where(leaf, local, tree["left"]) + offset)
+        parts["right"].append(np.where(leaf, local, tree["right"]) + offset)
+        parts["feature"].append(np.where(leaf, 0, tree["feature"]))
+        parts["threshold"].append(np.where(leaf, 0.0, tree["threshold"]))
+        parts["default_left"].append(tree["default_left"].astype(bool))
+        parts["value"].append(np.where(leaf, tree["value"], 0.0))
+        roots.append(offset)
+        depth = max(depth, _depth(tree["left"], tree["right"]))
+        offset += n
+    arrays = {
+        "feature": np.concatenate(parts["feature"]).astype(np.int32),
+        "threshold": np.concatenate(parts["threshold"]).astype(np.float64),
+        "left": np.concatenate(parts["left"]).astype(np.int32),
+        "right": np.concatenate(parts["right"]).astype(np.int32),
+        "default_left": np.concatenate(parts["default_left"]),
+        "value": np.concatenate(parts["value"]).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    arrays["depth"] = depth
+    return arrays
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    """Edges on the longest root-to-leaf path of one tree (root = node 0)."""
+    depth, level = 0, np.array([0])
+    while True:
+        inner = level[left[level] >= 0]
+        if len(inner) == 0:
+            return depth
+        level = np.concatenate([left[inner], right[inner]])
+        depth += 1
+
+
+@register_exporter("xgboost", "xgboost_regressor")
+def export_xgboost(model, features):
+    dump = json.loads(model.get_booster().save_raw("json"))["learner"]
+    objective = dump["objective"]["name"]
+    if objective not in XGB_LINKS:
+        raise ValueError(f"Cannot export XGBoost objective '{objective}'. Valid: {list(XGB_LINKS)}")
+    booster = dump["gradient_booster"]
+    if booster.get("name") != "gbtree" or int(dump["learner_model_param"].get("num_class", 0)) > 1:
+        raise ValueError("Only single-output gbtree XGBoost models can be exported")
+
+    # Trees up to the early-stopping best iteration, as predict() uses them
+    trees = booster["model"]["trees"]
+    try:
+        trees = trees[:booster["model"]["iteration_indptr"][model.best_iteration + 1]]
+    except AttributeError:
+        pass
+
+    base_score = float(dump["learner_model_param"]["base_score"].strip("[]"))
+    link = XGB_LINKS[objective]
+    base_margin = np.log(base_score / (1.0 - base_score)) if link == "sigmoid" else base_score
+
+    arrays = _flatten([{
+        "left": np.asarray(t["left_children"]),
+        "right": np.asarray(t["right_children"]),
+        "feature": np.asarray(t["split_indices"]),
+        "threshold": np.asarray(t["split_conditions"], dtype=np.float32),
+        "default_left": np.asarray(t["default_left"]),
+        "value": np.asarray(t["split_conditions"], dtype=np.float32),  # leaf weight at leaves
+    } for t in trees])
+    meta = {
+        "split": "lt",
+        "aggregate": "sum",
+        "base_margin": float(base_margin),
+        "link": link,
+        "objective": objective,
+    }
+    return arrays, meta
+
+
+@register_exporter("random_forest", "random_forest_regressor")
+def export_random_forest(model, features):
+    regression = not hasattr(model, "classes_")
+    if not regression and len(model.classes_) != 2:
+        raise ValueError("Only binary random forest classifiers can be exported")
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if regression:
+            value = tree.value[:, 0, 0]
+        else:
+            counts = tree.value[:, 0, :]
+            value = counts[:, 1] / counts.sum(axis=1)  # P(class 1) at the leaf
+        default_left = getattr(tree, "missing_go_to_left", np.ones(tree.node_count, dtype=bool))
+        trees.append({
+            "left": tree.children_left,
+            "right": tree.children_right,
+            "feature": tree.feature,
+            "threshold": tree.threshold,
+            "default_left": np.asarray(default_left),
+            "value": value,
+        })
+    arrays = _flatten(trees)
+    meta = {"split": "le", "aggregate": "mean", "link": "identity"}
+    return arrays, meta
+
+
+def export_model(model: Any, model_type: str, features: List[str],
+                 regression: bool, out_dir: Path) -> Path:
+    """
+    Export a fitted model of a registered type to out_dir.
+
+    Returns:
+        out_dir, holding forest.npz and export.json (plus model.ubj for XGBoost).
+    """
+    model_type = model_type.lower()
+    if model_type not in EXPORT_REGISTRY:
+        raise ValueError(f"No exporter for model type '{model_type}'. Valid: {sorted(EXPORT_REGISTRY)}")
+    arrays, meta = EXPORT_REGISTRY[model_type](model, features)
+    meta.update({
+        "model_type": model_type,
+        "features": [str(f) for f in features],
+        "regression": bool(regression),
+        "depth": int(arrays.pop("depth")),
+        "n_trees": int(len(arrays["roots"])),
+    })
+    write_forest(out_dir, arrays, meta)
+    if model_type.startswith("xgboost"):
+        model.get_booster().save_model(str(out_dir / "model.ubj"))
+    return out_dir
+
+
+def export_saved_model(model_dir: Path, model_id: str, check_rows: int = 1000) -> Path:
+    """
+    Export model_dir/model_id/model.pkl to model_dir/model_id/compiled and
+    check it against the pickle on `check_rows` random rows.
+    """
+    output_dir = model_dir / model_id
+    config = load_config(output_dir / "config.yaml")
+    model = joblib.load(output_dir / "model.pkl")
+    features = list(model.feature_names_in_)
+    regression = bool(config.get("regression_model", False))
+    out_dir = export_model(model, config["model_type"], features, regression, output_dir / COMPILED_DIR)
+
+    if check_rows:
+        compiled = CompiledForest.load(out_dir)
+        X = np.random.default_rng(0).normal(size=(check_rows, len(features))).astype(np.float32)
+        X_df = pd.DataFrame(X, columns=features)
+        expected = model.predict(X_df) if regression else model.predict_proba(X_df)[:, 1]
+        diff = float(np.abs(compiled.predict(X) - expected).max())
+        if diff > 1e-5:
+            raise ValueError(f"Compiled '{model_id}' differs from the pickle by up to {diff:.3g}")
+        logger.info("Exported '%s' to %s (max abs diff vs pickle %.2g)", model_id, out_dir, diff)
+    return out_dir
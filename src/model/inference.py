@@ -0,0 +1,220 @@
+# src/model/inference.py
+"""
+Low-latency scoring for saved models.
+
+ModelCache keeps recently used models loaded (LRU, keyed by model_id and the
+mtimes of model.pkl / config.yaml, so a retrained model is picked up on its
+next request). A LoadedModel scores NumPy arrays, Arrow tables/record
+batches, column mappings or DataFrames: the batch is laid out as one float
+matrix in the model's feature order and passed straight to the estimator
+(XGBoost via Booster.inplace_predict), without building a pandas frame.
+
+Scores follow sim.scoring.load_scored_data: P(class 1) for classifiers,
+predict() for regression models, and NaN for rows missing a feature. With
+compiled=True, models that have a compiled export (model/export.py) are
+served from it instead of the pickle.
+"""
+
+import logging
+import threading
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import xgboost as xgb
+
+from config import FEATURE_SETS, MODEL_DIR
+from model.compiled import COMPILED_DIR, FOREST_FILE, CompiledForest
+from model.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 8
+
+
+def to_matrix(batch: Any, features: List[str], dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Lay a batch out as a C-ordered (rows × features) matrix.
+
+    Args:
+        batch: 2-D array already in `features` order (a 1-D array is one row),
+            pyarrow Table / RecordBatch, DataFrame, or mapping of column -> values
+        features: Column order of the result
+        dtype: Element type of the result
+    """
+    if isinstance(batch, np.ndarray):
+        X = batch.reshape(1, -1) if batch.ndim == 1 else batch
+        if X.ndim != 2 or X.shape[1] != len(features):
+            raise ValueError(f"Expected an array of shape (rows, {len(features)}), got {batch.shape}")
+        return np.ascontiguousarray(X, dtype=dtype)
+    if isinstance(batch, pd.DataFrame):
+        return np.ascontiguousarray(batch[features].to_numpy(dtype=dtype))
+    if isinstance(batch, (pa.Table, pa.RecordBatch)):
+        missing = [f for f in features if batch.schema.get_field_index(f) < 0]
+        get = lambda f: batch.column(f).to_numpy(zero_copy_only=False)
+        n_rows = batch.num_rows
+    elif isinstance(batch, Mapping):
+        missing = [f for f in features if f not in batch]
+        get = lambda f: np.asarray(batch[f])
+        n_rows = len(next(iter(batch.values()))) if batch else 0
+    else:
+        raise TypeError(f"Cannot score a batch of type {type(batch).__name__}")
+    if missing:
+        raise ValueError(f"Batch is missing features: {missing}")
+
+    X = np.empty((n_rows, len(features)), dtype=dtype)
+    for j, f in enumerate(features):
+        X[:, j] = get(f)
+    return X
+
+
+class LoadedModel:
+    """A saved model plus what is needed to score raw batches with it."""
+
+    def __init__(self, model_id: str, model: Any, config: Dict[str, Any], stamp: Tuple[int, int]):
+        self.model_id = model_id
+        self.model = model
+        self.config = config
+        self.stamp = stamp
+        self.regression = bool(config.get("regression_model", False))
+        if isinstance(model, CompiledForest):
+            self.features = model.features
+        elif hasattr(model, "feature_names_in_"):
+            self.features = [str(f) for f in model.feature_names_in_]
+        else:
+            self.features = list(FEATURE_SETS[config["feature_set"]])
+
+        self._booster = None
+        if isinstance(model, CompiledForest):
+            self.dtype = np.float32
+        elif isinstance(model, xgb.XGBModel):
+            # Skip the sklearn wrapper: inplace_predict on the booster, honouring early stopping
+            self._booster = model.get_booster()
+            try:
+                self._iteration_range = (0, model.best_iteration + 1)
+            except AttributeError:
+                self._iteration_range = (0, 0)
+            self.dtype = np.float32
+        else:
+            if hasattr(model, "n_jobs"):
+                model.set_params(n_jobs=1)  # thread start-up outweighs small batches
+            self.dtype = np.float32 if hasattr(model, "estimators_") else np.float64
+
+    @classmethod
+    def load(cls, model_dir: Path, model_id: str, compiled: bool = False) -> "LoadedModel":
+        """
+        Load model_dir/model_id with its config.yaml: the compiled export if
+        `compiled` and one exists, else the unpickled model.pkl.
+        """
+        model_path = _model_path(model_dir, model_id, compiled)
+        config_path = model_dir / model_id / "config.yaml"
+        stamp = _stamp(model_path, config_path)
+        if model_path.name == FOREST_FILE:
+            model = CompiledForest.load(model_path.parent)
+        else:
+            model = joblib.load(model_path)
+        return cls(model_id, model, load_config(config_path), stamp)
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Raw scores for a complete (NaN-free) matrix in feature order."""
+        if isinstance(self.model, CompiledForest):
+            return self.model.predict(X)
+        if self._booster is not None:
+            out = self._booster.inplace_predict(
+                X, iteration_range=self._iteration_range, validate_features=False
+            )
+            return out[:, 1] if out.ndim == 2 else out
+        with warnings.catch_warnings():
+            # X is a positional matrix already in feature_names_in_ order
+            warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+            if self.regression:
+                return self.model.predict(X)
+            return self.model.predict_proba(X)[:, 1]
+
+    def score(self, batch: Any) -> np.ndarray:
+        """
+        Score a batch (see to_matrix for the accepted types).
+
+        Returns:
+            float64 array with one score per row; NaN where a feature is missing.
+        """
+        X = to_matrix(batch, self.features, self.dtype)
+        out = np.full(len(X), np.nan)
+        complete = ~np.isnan(X).any(axis=1)
+        if complete.all():
+            out[:] = self.predict_matrix(X)
+        elif complete.any():
+            out[complete] = self.predict_matrix(X[complete])
+        return out
+
+
+def _model_path(model_dir: Path, model_id: str, compiled: bool) -> Path:
+    if compiled:
+        forest = model_dir / model_id / COMPILED_DIR / FOREST_FILE
+        if forest.exists():
+            return forest
+    return model_dir / model_id / "model.pkl"
+
+
+def _stamp(model_path: Path, config_path: Path) -> Tuple[int, int]:
+    try:
+        return model_path.stat().st_mtime_ns, config_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Model not found at {model_path.parent}")
+
+
+class ModelCache:
+    """
+    Thread-safe LRU of LoadedModels, reloading any whose files changed on
+    disk. With compiled=True, compiled exports are preferred over pickles.
+    """
+
+    def __init__(self, model_dir: Path = MODEL_DIR, max_models: int = DEFAULT_CACHE_SIZE,
+                 compiled: bool = False):
+        self.model_dir = Path(model_dir)
+        self.max_models = max_models
+        self.compiled = compiled
+        self.hits = 0
+        self.misses = 0
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str) -> LoadedModel:
+        """The loaded model for model_id, unpickling it on a miss or a stale entry."""
+        model_path = _model_path(self.model_dir, model_id, self.compiled)
+        stamp = _stamp(model_path, self.model_dir / model_id / "config.yaml")
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry is not None and entry.stamp == stamp:
+                self._models.move_to_end(model_id)
+                self.hits += 1
+                return entry
+
+        entry = LoadedModel.load(self.model_dir, model_id, self.compiled)
+        logger.info("Loaded model '%s' (%s)", model_id, type(entry.model).__name__)
+        with self._lock:
+            self.misses += 1
+            self._models[model_id] = entry
+            self._models.move_to_end(model_id)
+            while len(self._models) > self.max_models:
+                evicted, _ = self._models.popitem(last=False)
+                logger.info("Evicted model '%s' from the cache", evicted)
+        return entry
+
+    def score(self, model_id: str, batch: Any) -> np.ndarray:
+        """Shorthand for get(model_id).score(batch)."""
+        return self.get(model_id).score(batch)
+
+    def info(self) -> Dict[str, Any]:
+        """Cached model ids (least recently used first) and hit/miss counts."""
+        with self._lock:
+            return {"models": list(self._models), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
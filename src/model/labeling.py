@@ -1,14 +1,26 @@
 # src/model/labeling.py
 
+import numpy as np
 import pandas as pd
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional, Tuple
 
 LABEL_REGISTRY: Dict[str, Callable] = {}
+LABEL_HORIZON: Dict[str, int] = {}
+LABEL_COLUMNS: Dict[str, Tuple[str, ...]] = {}
 
-def register_label(name: str):
-    """Decorator to register a labeling function."""
+def register_label(name: str, horizon: Optional[int] = None, columns: Tuple[str, ...] = ("Close",)):
+    """
+    Decorator to register a labeling function.
+
+    A label with a `horizon` looks that many bars ahead; apply_label then runs
+    it per ticker on multi-ticker frames (see apply_label). `columns` are the
+    frame columns the function reads.
+    """
     def decorator(fn: Callable):
         LABEL_REGISTRY[name] = fn
+        if horizon is not None:
+            LABEL_HORIZON[name] = horizon
+        LABEL_COLUMNS[name] = tuple(columns)
         return fn
     return decorator
 
@@ -19,14 +31,60 @@ def get_label_function(name: str) -> Callable:
     except KeyError:
         raise ValueError(f"Label method '{name}' is not registered.")
 
-@register_label("binary_return_3h")
+def apply_label(name: str, df: pd.DataFrame, group_col: str = "ticker") -> pd.Series:
+    """
+    Label a frame with a registered labeling function.
+
+    Multi-ticker frames (with a `group_col` column) are usually sorted by time,
+    so a plain shift(-horizon) would look ahead into other tickers' rows. For
+    forward-horizon labels the function instead runs once on a (ticker, time)
+    sorted view; the last `horizon` rows of each ticker, which have no future
+    bar of their own, are set to NaN, and the result is put back in the
+    frame's row order.
+
+    Returns:
+        Series aligned with df.
+    """
+    fn = get_label_function(name)
+    horizon = LABEL_HORIZON.get(name)
+    if horizon is None or group_col not in df.columns:
+        return fn(df)
+
+    n = len(df)
+    codes = pd.factorize(df[group_col])[0]
+    if isinstance(df.index, pd.DatetimeIndex):
+        times = df.index.asi8
+    elif "timestamp" in df.columns:
+        times = pd.to_datetime(df["timestamp"]).to_numpy().view(np.int64)
+    else:
+        times = np.arange(n)
+    order = np.lexsort((times, codes))
+
+    # 1) Label the ticker-sorted view in one pass
+    view = df[list(LABEL_COLUMNS[name])].iloc[order]
+    labels = np.asarray(fn(view), dtype=np.float64).copy()
+
+    # 2) Rows whose bar `horizon` ahead belongs to another ticker (or is past the end)
+    sorted_codes = codes[order]
+    no_future = np.ones(n, dtype=bool)
+    if horizon < n:
+        no_future[:n - horizon] = sorted_codes[horizon:] != sorted_codes[:n - horizon]
+    labels[no_future] = np.nan
+
+    # 3) Back to the frame's row order
+    out = np.empty(n)
+    out[order] = labels
+    return pd.Series(out, index=df.index)
+
+@register_label("binary_return_3h", horizon=3)
 def binary_return_3h(df: pd.DataFrame, horizon: int = 3) -> pd.Series:
     """
-    Binary label: 1 if Close_t+horizon > Close_t, else 0.
+    Binary label: 1 if Close_t+horizon > Close_t, else 0 (NaN without a future bar).
     """
-    return (df["Close"].shift(-horizon) > df["Close"]).astype(int)
+    future = df["Close"].shift(-horizon)
+    return (future > df["Close"]).astype(float).where(future.notna())
 
-@register_label("return_3h")
+@register_label("return_3h", horizon=3)
 def return_3h(df: pd.DataFrame, horizon: int = 3) -> pd.Series:
     """
     Continuous label: (Close_t+horizon / Close_t) - 1
@@ -1,46 +1,252 @@
 # src/model/metrics.py
+"""
+Evaluation metrics computed from sufficient statistics.
 
-from typing import Callable, Dict
-from sklearn.metrics import (
-    accuracy_score, f1_score, recall_score, precision_score,
-    mean_squared_error, mean_absolute_error, r2_score
-)
+Predictions are reduced once to additive statistics: confusion counts for
+classification, error sums for regression. Every registered metric is a
+vectorized function of those statistics, so the same function scores one
+evaluation, a stack of bootstrap resamples, or one row per group
+(ticker, hour, ...).
+
+Bootstrap resamples of a classifier need only the four confusion cells:
+resampling n rows with replacement draws the cell counts from a multinomial,
+so thousands of resamples cost no more than the cells. Regression
+resamples are drawn as index matrices over (at most) `max_rows` rows,
+reduced to per-row counts and multiplied into the stat columns; when
+the data is larger, the resampled spread is rescaled by sqrt(max_rows / n)
+(m-out-of-n bootstrap).
+"""
+
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+TASKS = ("classification", "regression")
+BOOTSTRAP_MAX_ROWS = 20_000
 
 METRIC_REGISTRY: Dict[str, Callable] = {}
+METRIC_TASKS: Dict[str, str] = {}
+
+Stats = Dict[str, np.ndarray]
+
+
+def register_metric(name: str, task: str):
+    """
+    Decorator to register an evaluation metric of a task's statistics.
+    Signature: fn(stats) -> np.ndarray, elementwise over the statistics' shape.
+    """
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'. Valid: {list(TASKS)}")
 
-def register_metric(name: str):
-    """Decorator to register an evaluation metric."""
     def decorator(fn: Callable):
+        if name in METRIC_REGISTRY:
+            raise ValueError(f"Metric '{name}' is already registered.")
         METRIC_REGISTRY[name] = fn
+        METRIC_TASKS[name] = task
         return fn
     return decorator
 
-# ——— Classification metrics ———
-@register_metric("accuracy")
-def accuracy(y_true, y_pred):
-    return accuracy_score(y_true, y_pred)
 
-@register_metric("f1")
-def f1(y_true, y_pred):
-    return f1_score(y_true, y_pred)
+def task_metrics(task: str) -> list[str]:
+    """Names of the metrics registered for a task."""
+    return [name for name, t in METRIC_TASKS.items() if t == task]
+
+
+def _ratio(num, den, empty: float = 0.0) -> np.ndarray:
+    """num / den, `empty` where den is 0 (sklearn's zero_division default)."""
+    num, den = np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    out = np.full(np.broadcast(num, den).shape, empty)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+# ——— Classification metrics (stats: tp, fp, fn, tn) ———
+
+@register_metric("accuracy", task="classification")
+def accuracy(s):
+    return _ratio(s["tp"] + s["tn"], s["tp"] + s["tn"] + s["fp"] + s["fn"])
+
+@register_metric("f1", task="classification")
+def f1(s):
+    return _ratio(2 * s["tp"], 2 * s["tp"] + s["fp"] + s["fn"])
+
+@register_metric("recall", task="classification")
+def recall(s):
+    return _ratio(s["tp"], s["tp"] + s["fn"])
+
+@register_metric("precision", task="classification")
+def precision(s):
+    return _ratio(s["tp"], s["tp"] + s["fp"])
+
+# ——— Regression metrics (stats: n, sse, sae, sy, syy) ———
+
+@register_metric("mse", task="regression")
+def mse(s):
+    return _ratio(s["sse"], s["n"])
+
+@register_metric("mae", task="regression")
+def mae(s):
+    return _ratio(s["sae"], s["n"])
+
+@register_metric("r2", task="regression")
+def r2(s):
+    sst = s["syy"] - _ratio(s["sy"] ** 2, s["n"])
+    # sklearn: a constant target scores 1.0 if predicted exactly, else 0.0
+    constant = np.where(s["sse"] == 0, 1.0, 0.0)
+    return np.where(sst > 0, 1.0 - _ratio(s["sse"], sst), constant)
+
+
+# ——— Statistics ———
+
+def infer_task(y_true, y_pred) -> str:
+    """'classification' when targets and predictions are all 0/1, else 'regression'."""
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    binary = lambda a: a.size == 0 or bool(np.isin(a, (0, 1)).all())
+    return "classification" if binary(y_true) and binary(y_pred) else "regression"
+
+
+def _row_stats(task: str, y_true: np.ndarray, y_pred: np.ndarray):
+    """Per-row contributions: a confusion cell index, or regression stat columns."""
+    if task == "classification":
+        # 0 = tn, 1 = fp, 2 = fn, 3 = tp
+        return 2 * (y_true == 1).astype(np.int64) + (y_pred == 1)
+    err = y_pred - y_true
+    return {"n": np.ones_like(y_true), "sse": err * err, "sae": np.abs(err), "sy": y_true, "syy": y_true * y_true}
+
+
+def _cells_to_stats(cells: np.ndarray) -> Stats:
+    """(..., 4) confusion counts in tn, fp, fn, tp order → stats dict."""
+    cells = cells.astype(np.float64)
+    return {"tn": cells[..., 0], "fp": cells[..., 1], "fn": cells[..., 2], "tp": cells[..., 3]}
+
+
+def compute_stats(
+    task: str,
+    y_true,
+    y_pred,
+    groups: Optional[np.ndarray] = None,
+    n_groups: int = 1
+) -> Stats:
+    """
+    Sufficient statistics of (y_true, y_pred); with integer `groups` codes,
+    one entry per group (shape (n_groups,)), else scalars.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    rows = _row_stats(task, y_true, y_pred)
+    if task == "classification":
+        keys = rows if groups is None else np.asarray(groups) * 4 + rows
+        cells = np.bincount(keys, minlength=4 * n_groups).reshape(n_groups, 4)
+        stats = _cells_to_stats(cells)
+    else:
+        stats = {
+            name: (np.array([col.sum()]) if groups is None
+                   else np.bincount(groups, weights=col, minlength=n_groups))
+            for name, col in rows.items()
+        }
+    return stats if groups is not None else {name: value[0] for name, value in stats.items()}
+
+
+def compute_metrics(task: str, stats: Stats, names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Every metric registered for `task` (or just `names`) over the statistics."""
+    names = task_metrics(task) if names is None else names
+    return {name: METRIC_REGISTRY[name](stats) for name in names}
+
+
+def bootstrap_stats(
+    task: str,
+    y_true,
+    y_pred,
+    n_resamples: int,
+    rng: np.random.Generator,
+    max_rows: int = BOOTSTRAP_MAX_ROWS,
+    block_indices: int = 1 << 22
+) -> Stats:
+    """
+    Statistics of `n_resamples` bootstrap resamples, each of shape (n_resamples,).
+    Regression resamples are drawn from a max_rows subsample when there are
+    more rows (see evaluate for the rescaling).
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    n = len(y_true)
+    if task == "classification":
+        cells = np.bincount(_row_stats(task, y_true, y_pred), minlength=4)
+        return _cells_to_stats(rng.multinomial(n, cells / n, size=n_resamples))
+
+    if n > max_rows:
+        keep = rng.choice(n, size=max_rows, replace=False)
+        y_true, y_pred, n = y_true[keep], y_pred[keep], max_rows
+    columns = np.column_stack(list(_row_stats(task, y_true, y_pred).values()))
+    sums = np.empty((n_resamples, columns.shape[1]))
+    step = max(1, block_indices // n)
+    for start in range(0, n_resamples, step):
+        stop = min(n_resamples, start + step)
+        # Index matrix → per-resample row counts (one bincount) → stats by matmul
+        idx = rng.integers(0, n, size=(stop - start, n), dtype=np.int32)
+        idx += (np.arange(stop - start, dtype=np.int32) * n)[:, None]
+        counts = np.bincount(idx.ravel(), minlength=(stop - start) * n).reshape(stop - start, n)
+        sums[start:stop] = counts @ columns
+    return {name: sums[:, j] for j, name in enumerate(("n", "sse", "sae", "sy", "syy"))}
+
 
-@register_metric("recall")
-def recall(y_true, y_pred):
-    return recall_score(y_true, y_pred)
+def evaluate(
+    y_true,
+    y_pred,
+    task: Optional[str] = None,
+    n_bootstrap: int = 0,
+    confidence: float = 0.95,
+    seed: int = 0,
+    groups: Optional[Dict[str, Sequence]] = None
+) -> Dict[str, object]:
+    """
+    Evaluate predictions in one pass over the rows.
 
-@register_metric("precision")
-def precision(y_true, y_pred):
-    return precision_score(y_true, y_pred)
+    Args:
+        task: 'classification' or 'regression' (inferred from the values if None)
+        n_bootstrap: bootstrap resamples for confidence intervals (0 = none)
+        confidence: two-sided interval coverage
+        groups: optional {name: per-row keys} (e.g. ticker, hour) to break the
+            metrics down by
 
-# ——— Regression metrics ———
-@register_metric("mse")
-def mse(y_true, y_pred):
-    return mean_squared_error(y_true, y_pred)
+    Returns:
+        {"task", "n", "metrics": {name: value}, "confidence_intervals":
+        {name: [low, high]} (with n_bootstrap), "breakdowns": {name: DataFrame
+        indexed by key, with n and every metric} (with groups)}
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    task = task or infer_task(y_true, y_pred)
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'. Valid: {list(TASKS)}")
+    n = len(y_true)
+    metrics = {name: float(value) for name, value in compute_metrics(task, compute_stats(task, y_true, y_pred)).items()}
+    result: Dict[str, object] = {"task": task, "n": n, "metrics": metrics}
 
-@register_metric("mae")
-def mae(y_true, y_pred):
-    return mean_absolute_error(y_true, y_pred)
+    if n_bootstrap and n:
+        rng = np.random.default_rng(seed)
+        boot = compute_metrics(task, bootstrap_stats(task, y_true, y_pred, n_bootstrap, rng))
+        alpha = (1.0 - confidence) / 2
+        m = min(n, BOOTSTRAP_MAX_ROWS) if task == "regression" else n
+        scale = np.sqrt(m / n)
+        intervals = {}
+        for name, values in boot.items():
+            lo, hi = np.quantile(values, [alpha, 1.0 - alpha])
+            if scale != 1.0:
+                # m-out-of-n: shrink the subsample's spread around its centre to n rows
+                centre = float(np.median(values))
+                lo, hi = metrics[name] + (lo - centre) * scale, metrics[name] + (hi - centre) * scale
+            intervals[name] = [float(lo), float(hi)]
+        result["confidence_intervals"] = intervals
 
-@register_metric("r2")
-def r2(y_true, y_pred):
-    return r2_score(y_true, y_pred)
+    if groups:
+        breakdowns = {}
+        for name, keys in groups.items():
+            codes, uniques = pd.factorize(np.asarray(keys), sort=True)
+            stats = compute_stats(task, y_true, y_pred, codes, len(uniques))
+            frame = pd.DataFrame(compute_metrics(task, stats), index=pd.Index(uniques, name=name))
+            frame.insert(0, "n", np.bincount(codes, minlength=len(uniques)))
+            breakdowns[name] = frame
+        result["breakdowns"] = breakdowns
+    return result
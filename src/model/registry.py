@@ -7,8 +7,10 @@ import inspect
 # Existing imports...
 from xgboost import XGBClassifier, XGBRegressor
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.linear_model import LogisticRegression, LinearRegression
+from sklearn.linear_model import LogisticRegression, LinearRegression, SGDClassifier, SGDRegressor
 from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 
 MODEL_REGISTRY: Dict[str, Callable] = {}
 
@@ -55,6 +57,14 @@ def train_logistic_regression(X_train, y_train, X_val, y_val, params):
     model.fit(Xi, yc)
     return model
 
+@register_model("sgd_classifier")
+def train_sgd_classifier(X_train, y_train, X_val, y_val, params):
+    params = {k: v for k, v in params.items() if k != "epochs"}  # streaming-only
+    params.setdefault("loss", "log_loss")
+    model = Pipeline([("scaler", StandardScaler()), ("model", SGDClassifier(**params))])
+    model.fit(X_train, y_train)
+    return model
+
 # ——— Regression trainers ———
 
 @register_model("xgboost_regressor")
@@ -76,3 +86,10 @@ def train_linear_regression(X_train, y_train, X_val, y_val, params):
     model = LinearRegression(**params)
     model.fit(X_train, y_train)
     return model
+
+@register_model("sgd_regressor")
+def train_sgd_regressor(X_train, y_train, X_val, y_val, params):
+    params = {k: v for k, v in params.items() if k != "epochs"}  # streaming-only
+    model = Pipeline([("scaler", StandardScaler()), ("model", SGDRegressor(**params))])
+    model.fit(X_train, y_train)
+    return model
@@ -10,7 +10,8 @@ def save_results(
     metrics: dict,
     y_eval: pd.Series,
     feature_names: list[str],
-    data_type: str = "test"
+    data_type: str = "test",
+    confidence_intervals: dict = None
 ) -> None:
     """
     Save a summary of model evaluation to a JSON file.
@@ -23,6 +24,7 @@ def save_results(
       - num_features
       - feature_names
       - metrics (registered performance metrics)
+      - confidence_intervals (bootstrap [low, high] per metric, if given)
 
     Prints a human-readable summary to stdout as well.
     """
@@ -38,6 +40,8 @@ def save_results(
         "feature_names": feature_names,
         "metrics": metrics,
     }
+    if confidence_intervals:
+        summary["confidence_intervals"] = confidence_intervals
 
     output_dir.mkdir(parents=True, exist_ok=True)
     metrics_path = output_dir / "metrics.json"
@@ -51,4 +55,8 @@ def save_results(
           f"1s: {summary['label_distribution']['1']}")
     print(f"  Features used ({summary['num_features']}): {', '.join(feature_names)}")
     for name, value in metrics.items():
-        print(f"  {name}: {value}")
+        if confidence_intervals and name in confidence_intervals:
+            low, high = confidence_intervals[name]
+            print(f"  {name}: {value} [{low:.4f}, {high:.4f}]")
+        else:
+            print(f"  {name}: {value}")
@@ -0,0 +1,240 @@
+# src/model/search.py
+"""
+Hyperparameter search over the registered trainers.
+
+A model config gains a `search` section, e.g.
+
+    search:
+      method: successive_halving      # or "random"
+      n_trials: 27
+      metric: accuracy                # any metric registered for the task
+      min_resource: 50                # successive halving budget range of
+      max_resource: 800               #   the model's resource parameter
+      eta: 3                          # keep the best 1/eta at every rung
+      early_stopping_rounds: 20       # XGBoost, on the validate eval_set
+      seed: 42
+      space:
+        max_depth: {type: int, low: 3, high: 10}
+        learning_rate: {type: float, low: 0.01, high: 0.3, log: true}
+        subsample: [0.6, 0.8, 1.0]
+
+`model_params` stay fixed for every trial. Trials run in a forked process
+pool over one loaded (and cached) copy of the data; the best trial is refit
+and saved like a normal training run, with a leaderboard.csv next to its
+metrics.json.
+"""
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DATASET_CACHE_DIR, FEATURE_SETS, FEATURE_STORE_DIR, MODEL_DIR
+from model.train import fit_model, load_training_data, save_model
+from model.metrics import task_metrics
+from model.utils import config_task, evaluate_predictions
+from preprocessing.shared_panel import FramesHandle, attach_frames, share_frames
+
+logger = logging.getLogger(__name__)
+
+# The parameter successive halving scales per model type (its "budget")
+RESOURCE_PARAMS = {
+    "xgboost": "n_estimators",
+    "xgboost_regressor": "n_estimators",
+    "random_forest": "n_estimators",
+    "random_forest_regressor": "n_estimators",
+    "logistic_regression": "max_iter",
+    "sgd_classifier": "max_iter",
+    "sgd_regressor": "max_iter",
+}
+THREAD_PARAMS = {"xgboost", "xgboost_regressor", "random_forest", "random_forest_regressor"}
+EARLY_STOPPING_MODELS = {"xgboost", "xgboost_regressor"}
+MINIMIZE_METRICS = {"mse", "mae"}
+
+LEADERBOARD_COLUMNS = ["trial", "rung", "resource", "score", "status", "best_iteration", "wall_s", "params"]
+
+_SEARCH_DATA: Optional[Dict[str, Any]] = None
+
+
+def sample_params(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """
+    Draw one parameter set. A spec is a list (uniform choice), a dict
+    {type: int|float, low, high, log: bool}, or a fixed value.
+    """
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            value = spec[int(rng.integers(len(spec)))]
+        elif isinstance(spec, dict):
+            kind, low, high = spec.get("type", "float"), spec["low"], spec["high"]
+            if spec.get("log", False):
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            if kind == "int":
+                value = int(min(high, max(low, round(value))))
+            elif kind != "float":
+                raise ValueError(f"Unknown type '{kind}' for search parameter '{name}'")
+        else:
+            value = spec
+        params[name] = value
+    return params
+
+
+def rung_resources(min_resource: int, max_resource: int, eta: int) -> List[int]:
+    """Budgets of the successive-halving rungs, min_resource * eta**k up to max_resource."""
+    resources = []
+    r = min_resource
+    while r < max_resource:
+        resources.append(int(r))
+        r *= eta
+    resources.append(int(max_resource))
+    return resources
+
+
+def _init_worker(handle: FramesHandle) -> None:
+    global _SEARCH_DATA
+    _SEARCH_DATA = attach_frames(handle).data()
+
+
+def _run_trial(config: Dict[str, Any], params: Dict[str, Any], metric: str) -> Dict[str, Any]:
+    """Fit one parameter set on the shared data and score it on validate."""
+    start = time.perf_counter()
+    try:
+        model, y_val, y_pred = fit_model(config, _SEARCH_DATA, params)
+        score = evaluate_predictions(y_val, y_pred, config_task(config))[metric]
+        best_iteration = getattr(model, "best_iteration", None) if "early_stopping_rounds" in params else None
+        status = "ok"
+    except (Exception, SystemExit) as e:
+        score, best_iteration, status = None, None, f"failed: {type(e).__name__}: {e}"
+    return {
+        "score": score,
+        "best_iteration": best_iteration,
+        "status": status,
+        "wall_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def run_search(
+    config: Dict[str, Any],
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR,
+    cache_dir: Optional[Path] = DATASET_CACHE_DIR,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Run the config's `search`, then refit and save the best trial under
+    model_dir/model_id (model.pkl, config.yaml with the chosen params,
+    metrics.json and leaderboard.csv).
+
+    Returns:
+        The leaderboard: one row per trial evaluation (trial, rung, resource,
+        score, status, best_iteration, wall_s, params), best first.
+    """
+    search = config["search"]
+    model_type = config["model_type"].lower()
+    method = search.get("method", "successive_halving")
+    metric = search.get("metric", "accuracy")
+    n_trials = search.get("n_trials", 20)
+    valid = task_metrics(config_task(config))
+    if metric not in valid:
+        raise ValueError(f"Unknown metric '{metric}' for {config_task(config)}. Valid: {valid}")
+    sign = 1 if metric in MINIMIZE_METRICS else -1  # sort key: lower is better
+
+    fixed = dict(config.get("model_params", {}))
+    if model_type in EARLY_STOPPING_MODELS and search.get("early_stopping_rounds"):
+        fixed.setdefault("early_stopping_rounds", search["early_stopping_rounds"])
+
+    # 1) Budgets per rung
+    resource_param = search.get("resource", RESOURCE_PARAMS.get(model_type))
+    if method == "successive_halving":
+        if resource_param is None:
+            raise ValueError(f"Successive halving needs a resource parameter for '{model_type}'")
+        eta = search.get("eta", 3)
+        resources = rung_resources(search.get("min_resource", 50), search.get("max_resource", 800), eta)
+    elif method == "random":
+        eta = 1
+        resources = [search.get("max_resource")] if resource_param and search.get("max_resource") else [None]
+    else:
+        raise ValueError(f"Unknown search method '{method}'. Valid: ['random', 'successive_halving']")
+
+    # 2) Trials and the shared data
+    rng = np.random.default_rng(search.get("seed", 42))
+    trials = [sample_params(search.get("space", {}), rng) for _ in range(n_trials)]
+
+    tickers_file = Path(config["tickers_file"])
+    tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+    feature_list = FEATURE_SETS[config["feature_set"]]
+    data = load_training_data(config, tickers, feature_list, feature_dir, cache_dir)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // max_workers)
+    ctx = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+
+    def trial_params(trial: int, resource: Optional[int]) -> Dict[str, Any]:
+        params = dict(fixed, **trials[trial])
+        if resource is not None:
+            params[resource_param] = resource
+        if model_type in THREAD_PARAMS:
+            params.setdefault("n_jobs", threads)
+        return params
+
+    # 3) Rungs: evaluate the survivors, keep the best 1/eta
+    rows = []
+    alive = list(range(n_trials))
+    with share_frames(data) as shared, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                initializer=_init_worker, initargs=(shared.handle,)) as pool:
+        for rung, resource in enumerate(resources):
+            logger.info("Rung %d: %d trials at %s=%s", rung, len(alive), resource_param, resource)
+            futures = {t: pool.submit(_run_trial, config, trial_params(t, resource), metric) for t in alive}
+            results = {t: f.result() for t, f in futures.items()}
+
+            scored = sorted((t for t in alive if results[t]["status"] == "ok"),
+                            key=lambda t: sign * results[t]["score"])
+            last = rung == len(resources) - 1
+            keep = set(scored if last else scored[:max(1, math.ceil(len(scored) / eta))])
+            for t in alive:
+                r = results[t]
+                status = r["status"] if r["status"] != "ok" else ("completed" if last else
+                                                                  "promoted" if t in keep else "pruned")
+                rows.append({
+                    "trial": t, "rung": rung, "resource": resource, "score": r["score"],
+                    "status": status, "best_iteration": r["best_iteration"], "wall_s": r["wall_s"],
+                    "params": json.dumps(trials[t], sort_keys=True),
+                })
+            alive = [t for t in scored if t in keep]
+            if not alive:
+                break
+
+    leaderboard = pd.DataFrame(rows, columns=LEADERBOARD_COLUMNS)
+    final = leaderboard[leaderboard["status"] == "completed"]
+    if final.empty:
+        raise RuntimeError(f"All {n_trials} search trials failed")
+    leaderboard["_key"] = sign * leaderboard["score"].astype(float)
+    leaderboard = leaderboard.sort_values(["rung", "_key"], ascending=[False, True], na_position="last")
+    leaderboard = leaderboard.drop(columns="_key").reset_index(drop=True)
+
+    # 4) Refit the best trial and save it like a normal training run
+    best = int(leaderboard.iloc[0]["trial"])
+    best_params = trial_params(best, resources[-1])
+    if model_type in THREAD_PARAMS and "n_jobs" not in fixed:
+        best_params.pop("n_jobs")  # the saved model keeps the trainer's default threading
+    logger.info("Best trial %d (%s=%s): %s", best, metric, leaderboard.iloc[0]["score"], trials[best])
+    model, y_val, y_pred = fit_model(config, data, best_params)
+
+    saved_config = {k: v for k, v in config.items() if k != "search"}
+    saved_config["model_params"] = best_params
+    save_model(saved_config, model_dir, model, y_val, y_pred, feature_list)
+    leaderboard.to_csv(model_dir / config["model_id"] / "leaderboard.csv", index=False)
+    logger.info("Leaderboard saved to %s", model_dir / config["model_id"] / "leaderboard.csv")
+    return leaderboard
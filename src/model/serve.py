@@ -0,0 +1,161 @@
+# src/model/serve.py
+"""
+Local scoring endpoint over a warm ModelCache (HTTP on TCP or a Unix socket).
+
+    GET  /health                     cached models and hit/miss counts
+    POST /score/<model_id>           score a batch of feature rows
+    GET  /latest/<model_id>[?tickers=A,B]
+                                     score each ticker's latest bar in the
+                                     feature store (default: the model's tickers_file);
+                                     bars are re-read only when a file changes
+
+/score takes either an Arrow IPC stream (Content-Type
+application/vnd.apache.arrow.stream) with one column per feature, or JSON:
+{"rows": [[...], ...]} in the model's feature order, or
+{"columns": {"feature": [...], ...}}. Responses are JSON; missing scores
+are null. Connections are kept alive (HTTP/1.1), so a client pays the
+connection set-up once, not per request.
+"""
+
+import json
+import logging
+import os
+import socketserver
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pyarrow as pa
+
+from config import FEATURE_STORE_DIR
+from model.inference import ModelCache
+from preprocessing.filter_feature_data import read_latest_bars
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def _scores_json(scores: np.ndarray) -> list:
+    return [None if np.isnan(s) else s for s in scores.tolist()]
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    # Set on the subclass built by make_server
+    cache: ModelCache
+    feature_dir: Path
+    latest_bars: Dict[str, tuple]
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            self._reply(200, dict(self.cache.info(), status="ok"))
+        elif len(parts) == 2 and parts[0] == "latest":
+            self._handle(self._latest, parts[1], parse_qs(url.query))
+        else:
+            self._reply(404, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "score":
+            self._handle(self._score, parts[1])
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def _handle(self, fn, *args) -> None:
+        start = time.perf_counter()
+        try:
+            body = fn(*args)
+        except FileNotFoundError as e:
+            self._reply(404, {"error": str(e)})
+            return
+        except (KeyError, ValueError, TypeError, pa.ArrowInvalid) as e:
+            self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            logger.exception("Scoring request failed")
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        body["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._reply(200, body)
+
+    def _score(self, model_id: str) -> Dict[str, Any]:
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        model = self.cache.get(model_id)
+        if self.headers.get("Content-Type", "").startswith(ARROW_STREAM):
+            batch = pa.ipc.open_stream(raw).read_all()
+        else:
+            payload = json.loads(raw)
+            if "rows" in payload:
+                batch = np.asarray(payload["rows"], dtype=float)
+            elif "columns" in payload:
+                batch = payload["columns"]
+            else:
+                raise ValueError("JSON body needs 'rows' or 'columns'")
+        return {"model_id": model_id, "scores": _scores_json(model.score(batch))}
+
+    def _latest(self, model_id: str, query: Dict[str, list]) -> Dict[str, Any]:
+        model = self.cache.get(model_id)
+        if "tickers" in query:
+            tickers = [t for t in ",".join(query["tickers"]).split(",") if t]
+        else:
+            tickers_file = Path(model.config["tickers_file"])
+            tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+        bars = read_latest_bars(self.feature_dir, tickers, model.features, self.latest_bars)
+        scores = _scores_json(model.score(bars))
+        timestamps = [str(t) for t in bars.column("timestamp").to_pylist()]
+        return {
+            "model_id": model_id,
+            "rows": [
+                {"ticker": ticker, "timestamp": ts, "score": score}
+                for ticker, ts, score in zip(bars.column("ticker").to_pylist(), timestamps, scores)
+            ],
+        }
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    cache: ModelCache,
+    feature_dir: Path = FEATURE_STORE_DIR,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[Path] = None
+) -> socketserver.BaseServer:
+    """
+    Build (but do not start) a scoring server on host:port, or on a Unix
+    socket at socket_path (replacing a stale socket file).
+    """
+    handler = type("Handler", (ScoringHandler,), {
+        "cache": cache, "feature_dir": Path(feature_dir), "latest_bars": {},
+    })
+    if socket_path is not None:
+        handler.disable_nagle_algorithm = False  # TCP_NODELAY is TCP-only
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return UnixHTTPServer(str(socket_path), handler)
+    return ThreadingHTTPServer((host, port), handler)
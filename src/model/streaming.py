@@ -0,0 +1,172 @@
+# src/model/streaming.py
+"""
+Out-of-core training: the splits are read a few tickers at a time and never
+held in memory whole.
+
+XGBoost models are trained from an external-memory ExtMemQuantileDMatrix fed
+by a DataIter (the quantised pages are cached on disk); models with
+partial_fit are updated chunk by chunk. Either way the result is the same
+kind of estimator the in-memory trainers in registry.py return.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from model.labeling import apply_label
+from preprocessing.filter_feature_data import iter_feature_chunks
+
+# A chunk source is a zero-argument callable returning a fresh iterator of (X, y)
+ChunkSource = Callable[[], Iterator[Tuple[pd.DataFrame, pd.Series]]]
+
+STREAMING_REGISTRY: Dict[str, Callable] = {}
+
+
+def register_streaming_model(name: str):
+    """
+    Decorator to register a streaming (out-of-core) trainer.
+    Signature: fn(train_chunks, val_chunks, params, cache_dir) -> fitted_model
+    """
+    def decorator(fn: Callable):
+        if name in STREAMING_REGISTRY:
+            raise ValueError(f"Streaming model '{name}' is already registered.")
+        STREAMING_REGISTRY[name] = fn
+        return fn
+    return decorator
+
+
+def labeled_chunks(
+    feature_dir: Path,
+    tickers: Sequence[str],
+    feature_list: list[str],
+    split: str,
+    label_method: str,
+    chunk_tickers: int,
+    float_dtype: str = None
+) -> ChunkSource:
+    """
+    Chunk source over one split: each chunk is `chunk_tickers` tickers' rows,
+    labelled per ticker, without incomplete rows.
+    """
+    columns = list(dict.fromkeys(feature_list + ["Close"]))
+
+    def chunks():
+        for df in iter_feature_chunks(
+            feature_dir, tickers, chunk_tickers,
+            features=columns, split=split, float_dtype=float_dtype
+        ):
+            target = apply_label(label_method, df)
+            keep = target.notna().to_numpy() & df[feature_list].notna().all(axis=1).to_numpy()
+            if keep.any():
+                yield df.loc[keep, feature_list], target[keep].rename("target")
+    return chunks
+
+
+def predict_chunks(model, chunks: ChunkSource) -> Tuple[pd.Series, np.ndarray]:
+    """Targets and model.predict over a chunk source, concatenated."""
+    ys, preds = [], []
+    for X, y in chunks():
+        ys.append(y.to_numpy())
+        preds.append(model.predict(X))
+    if not ys:
+        return pd.Series(dtype=float, name="target"), np.empty(0)
+    return pd.Series(np.concatenate(ys), name="target"), np.concatenate(preds)
+
+
+# ——— XGBoost (external memory) ———
+
+class ChunkIter(xgb.DataIter):
+    """Feeds a chunk source to XGBoost; pages are cached under cache_prefix."""
+
+    def __init__(self, chunks: ChunkSource, cache_prefix: Path):
+        self._chunks = chunks
+        self._it = None
+        super().__init__(cache_prefix=str(cache_prefix), release_data=True)
+
+    def next(self, input_data: Callable) -> bool:
+        if self._it is None:
+            self._it = self._chunks()
+        batch = next(self._it, None)
+        if batch is None:
+            return False
+        X, y = batch
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self) -> None:
+        self._it = None
+
+
+def _train_booster(train_chunks, val_chunks, params, cache_dir, objective) -> xgb.Booster:
+    """Fit a Booster from sklearn-style XGB params over chunk sources."""
+    params = dict(params)
+    num_boost_round = params.pop("n_estimators", 100)
+    early_stopping_rounds = params.pop("early_stopping_rounds", None)
+    max_bin = params.pop("max_bin", 256)
+    if "n_jobs" in params:
+        params["nthread"] = params.pop("n_jobs")
+    if "random_state" in params:
+        params["seed"] = params.pop("random_state")
+    params.setdefault("objective", objective)
+    params["tree_method"] = "hist"  # external memory requires hist
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    dtrain = xgb.ExtMemQuantileDMatrix(ChunkIter(train_chunks, cache_dir / "train"), max_bin=max_bin)
+    dval = xgb.ExtMemQuantileDMatrix(ChunkIter(val_chunks, cache_dir / "validate"), ref=dtrain)
+    return xgb.train(
+        params, dtrain,
+        num_boost_round=num_boost_round,
+        evals=[(dval, "validate")],
+        early_stopping_rounds=early_stopping_rounds,
+        verbose_eval=False
+    )
+
+
+@register_streaming_model("xgboost")
+def stream_xgboost_classifier(train_chunks, val_chunks, params, cache_dir):
+    booster = _train_booster(train_chunks, val_chunks, params, cache_dir, "binary:logistic")
+    model = xgb.XGBClassifier(**params)
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    return model
+
+@register_streaming_model("xgboost_regressor")
+def stream_xgboost_regressor(train_chunks, val_chunks, params, cache_dir):
+    booster = _train_booster(train_chunks, val_chunks, params, cache_dir, "reg:squarederror")
+    model = xgb.XGBRegressor(**params)
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    return model
+
+
+# ——— partial_fit models ———
+
+def _partial_fit(model, train_chunks, epochs: int, **fit_kwargs) -> Pipeline:
+    """
+    Standardise and fit `model` incrementally: one pass over the chunks for
+    the scaler, then `epochs` passes of partial_fit.
+    """
+    scaler = StandardScaler()
+    for X, _ in train_chunks():
+        scaler.partial_fit(X)
+    for _ in range(epochs):
+        for X, y in train_chunks():
+            model.partial_fit(scaler.transform(X), y.to_numpy(), **fit_kwargs)
+    return Pipeline([("scaler", scaler), ("model", model)])
+
+@register_streaming_model("sgd_classifier")
+def stream_sgd_classifier(train_chunks, val_chunks, params, cache_dir):
+    params = dict(params)
+    epochs = params.pop("epochs", 1)
+    params.setdefault("loss", "log_loss")
+    return _partial_fit(SGDClassifier(**params), train_chunks, epochs, classes=np.array([0.0, 1.0]))
+
+@register_streaming_model("sgd_regressor")
+def stream_sgd_regressor(train_chunks, val_chunks, params, cache_dir):
+    params = dict(params)
+    epochs = params.pop("epochs", 1)
+    return _partial_fit(SGDRegressor(**params), train_chunks, epochs)
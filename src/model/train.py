@@ -2,17 +2,26 @@
 # src/model/train.py
 
 import logging
+import shutil
 import sys
 from pathlib import Path
+from typing import Optional
 import joblib
+import pandas as pd
+import pyarrow as pa
 import yaml
 
-from config import FEATURE_SETS, FEATURE_DIR, MODEL_DIR
+from config import DATASET_CACHE_DIR, FEATURE_SETS, FEATURE_STORE_DIR, MODEL_DIR
 from preprocessing.filter_feature_data import filter_feature_data
-from model.labeling import get_label_function
+from model.dataset_cache import DatasetCache, dataset_key
+from model.compiled import COMPILED_DIR
+from model.export import export_model
+from model.labeling import apply_label
 from model.save_results import save_results
 from model.registry import MODEL_REGISTRY
-from model.utils import parse_args, load_config, evaluate_model
+from model.streaming import STREAMING_REGISTRY, labeled_chunks, predict_chunks
+from model.metrics import evaluate
+from model.utils import parse_args, load_config, config_task
 
 # Configure root logger
 logging.basicConfig(
@@ -23,38 +32,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def train_from_config(config: dict) -> None:
+def load_training_data(config, tickers, feature_list, feature_dir, cache_dir=DATASET_CACHE_DIR):
     """
-    Core training logic:
-      1. Load feature DataFrames for train/validate/test splits
-      2. Label each split
-      3. Invoke the registered trainer for model_type
-      4. Persist model, config, and evaluation metrics
-    """
-    model_id = config["model_id"]
-    output_dir = MODEL_DIR / model_id
-    output_dir.mkdir(parents=True, exist_ok=True)
-    logger.info("Starting training for model '%s'", model_id)
+    Load and label the train and validate splits for a config.
 
-    # Load ticker list
-    tickers_file = Path(config["tickers_file"])
-    tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
-    logger.info("Loaded %d tickers from %s", len(tickers), tickers_file)
+    The result is cached under cache_dir (see model/dataset_cache.py) unless
+    cache_dir is None or the config sets `dataset_cache: false`; a repeat
+    run with the same inputs memory-maps the cached matrices instead.
 
-    # Determine feature list
-    feature_list = FEATURE_SETS[config["feature_set"]]
-    logger.info("Feature set '%s' → %d features", config["feature_set"], len(feature_list))
+    Returns:
+        Dict of split -> (X, y) holding only complete, labelled rows.
+    """
+    compact = config.get("compact", False)
+
+    cache, key = None, None
+    if cache_dir is not None and config.get("dataset_cache", True):
+        cache = DatasetCache(cache_dir)
+        key = dataset_key(feature_dir, tickers, feature_list, config["label_method"], compact)
+        data = cache.get(key)
+        if data is not None:
+            logger.info("Loaded labelled dataset %s from cache (%s)", key,
+                        ", ".join(f"{split}: {len(X)} rows" for split, (X, _) in data.items()))
+            return data
 
     # Load each split's data
     dfs = {}
     for split in ("train", "validate"):
         df = filter_feature_data(
-            feature_dir=FEATURE_DIR / split,
+            feature_dir=feature_dir,
             tickers=tickers,
             features=feature_list + ["Close"],
             start_time=None,
             end_time=None,
-            debug=False
+            debug=False,
+            split=split,
+            float_dtype="float32" if compact else None
         )
         if df.empty:
             logger.error("No data for split '%s'", split)
@@ -62,17 +74,44 @@ def train_from_config(config: dict) -> None:
         dfs[split] = df
         logger.info("Loaded %d rows for split '%s'", len(df), split)
 
-    # Label and clean each split
-    label_fn = get_label_function(config["label_method"])
-    for split, df in dfs.items():
-        df["target"] = label_fn(df)
-        df.dropna(subset=["target"] + feature_list, inplace=True)
-        dfs[split] = df
-        logger.info("After labeling, '%s' has %d rows", split, len(df))
+    # Label and clean each split, keeping one copy of the complete rows
+    data = {}
+    for split in list(dfs):
+        df = dfs.pop(split)
+        target = apply_label(config["label_method"], df)
+        keep = target.notna().to_numpy() & df[feature_list].notna().all(axis=1).to_numpy()
+        X = df.loc[keep, feature_list]
+        y = target[keep].astype("float32" if compact else "float64").rename("target")
+        # Rows keep their identity for per-ticker / per-hour evaluation
+        X.index = y.index = pd.MultiIndex.from_arrays(
+            [X.index, df["ticker"].to_numpy()[keep]], names=["timestamp", "ticker"]
+        )
+        del df
+        # The loaded frame's buffers belong to Arrow's allocator, which keeps
+        # freed pages cached; hand them back before the next split and the fit
+        pa.default_memory_pool().release_unused()
+        data[split] = (X, y)
+        logger.info("After labeling, '%s' has %d rows", split, len(X))
+
+    if cache is not None:
+        cache.put(key, data)
+        logger.info("Cached labelled dataset %s", key)
+    return data
 
+
+def fit_model(config, data, params=None):
+    """
+    Fit the config's registered model on loaded data.
+
+    Args:
+        params: Optional model params overriding config["model_params"]
+
+    Returns:
+        (model, y_val, y_pred) with predictions on the validate split.
+    """
     # Prepare train/validate/test arrays
-    X_train, y_train = dfs["train"][feature_list], dfs["train"]["target"]
-    X_val,   y_val   = dfs["validate"][feature_list], dfs["validate"]["target"]
+    X_train, y_train = data["train"]
+    X_val,   y_val   = data["validate"]
     #X_test,  y_test  = dfs["test"][feature_list], dfs["test"]["target"]
 
     # Train via registry
@@ -83,7 +122,50 @@ def train_from_config(config: dict) -> None:
         sys.exit(1)
 
     logger.info("Training model '%s'...", model_type)
-    model = trainer(X_train, y_train, X_val, y_val, config.get("model_params", {}))
+    if params is None:
+        params = config.get("model_params", {})
+    model = trainer(X_train, y_train, X_val, y_val, params)
+    return model, y_val, model.predict(X_val)
+
+
+def _train_streaming(config, tickers, feature_list, feature_dir, output_dir):
+    """Out-of-core counterpart of load_training_data + fit_model, reading a few tickers at a time."""
+    options = config["streaming"] if isinstance(config["streaming"], dict) else {}
+    chunk_tickers = options.get("chunk_tickers", 100)
+    float_dtype = "float32" if config.get("compact", False) else None
+
+    model_type = config["model_type"].lower()
+    trainer = STREAMING_REGISTRY.get(model_type)
+    if not trainer:
+        logger.error("Model type '%s' does not support streaming training. Valid: %s",
+                     model_type, list(STREAMING_REGISTRY))
+        sys.exit(1)
+
+    train_chunks, val_chunks = (
+        labeled_chunks(feature_dir, tickers, feature_list, split,
+                       config["label_method"], chunk_tickers, float_dtype)
+        for split in ("train", "validate")
+    )
+    logger.info("Streaming training of '%s' over chunks of %d tickers...", model_type, chunk_tickers)
+    cache_dir = output_dir / "stream_cache"
+    try:
+        model = trainer(train_chunks, val_chunks, config.get("model_params", {}), cache_dir)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    y_val, y_pred = predict_chunks(model, val_chunks)
+    if y_val.empty:
+        logger.error("No data for split 'validate'")
+        sys.exit(1)
+    logger.info("Validated on %d rows", len(y_val))
+    return model, y_val, y_pred
+
+
+def save_model(config, model_dir, model, y_val, y_pred, feature_list) -> None:
+    """Persist model and config, then evaluate and write metrics, under model_dir/model_id."""
+    model_id = config["model_id"]
+    output_dir = model_dir / model_id
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     # Persist model and config
     model_path = output_dir / "model.pkl"
@@ -91,19 +173,91 @@ def train_from_config(config: dict) -> None:
     (output_dir / "config.yaml").write_text(yaml.safe_dump(config))
     logger.info("Model saved to %s", model_path)
 
-    # Evaluate on test set
-    metrics = evaluate_model(model, X_val, y_val)
+    # Optional compiled export for low-latency scoring (model/compiled.py)
+    if config.get("export", False):
+        out_dir = export_model(model, config["model_type"], list(model.feature_names_in_),
+                               config.get("regression_model", False), output_dir / COMPILED_DIR)
+        logger.info("Compiled model exported to %s", out_dir)
+
+    # Evaluate on the validate split: metrics with bootstrap intervals, plus
+    # per-ticker / per-hour breakdowns when the rows carry their identity
+    options = config.get("evaluation", {})
+    groups = {}
+    if options.get("breakdowns", True) and isinstance(y_val.index, pd.MultiIndex):
+        groups = {
+            "ticker": y_val.index.get_level_values("ticker"),
+            "hour": pd.DatetimeIndex(y_val.index.get_level_values("timestamp")).hour,
+        }
+    evaluation = evaluate(
+        y_val, y_pred, config_task(config),
+        n_bootstrap=options.get("bootstrap", 1000),
+        confidence=options.get("confidence", 0.95),
+        groups=groups
+    )
     save_results(
         output_dir=output_dir,
         model_id=model_id,
-        metrics=metrics,
+        metrics=evaluation["metrics"],
         y_eval=y_val,
         feature_names=feature_list,
-        data_type="Validate"
+        data_type="Validate",
+        confidence_intervals=evaluation.get("confidence_intervals")
     )
+    for name, frame in evaluation.get("breakdowns", {}).items():
+        frame.to_csv(output_dir / f"metrics_by_{name}.csv")
     logger.info("Training complete for '%s'", model_id)
 
 
+def train_from_config(
+    config: dict,
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR,
+    cache_dir: Optional[Path] = DATASET_CACHE_DIR
+) -> None:
+    """
+    Core training logic:
+      1. Load feature DataFrames for train/validate/test splits
+      2. Label each split
+      3. Invoke the registered trainer for model_type
+      4. Persist model, config, and evaluation metrics
+
+    With `compact: true` in the config, features are read as float32 (the
+    precision XGBoost and scikit-learn's trees work in anyway), roughly
+    halving the training matrices.
+
+    With `streaming: true` (or `streaming: {chunk_tickers: N}`), the splits
+    are never loaded whole: chunks of N tickers (default 100) are read,
+    labelled and fed to the model's streaming trainer (model/streaming.py).
+
+    Otherwise the labelled matrices are cached in cache_dir (None disables it).
+
+    feature_dir, model_dir and cache_dir default to the project's folders
+    (overridden e.g. by the benchmarks).
+    """
+    model_id = config["model_id"]
+    output_dir = model_dir / model_id
+    output_dir.mkdir(parents=True, exist_ok=True)
+    logger.info("Starting training for model '%s'", model_id)
+
+    # Load ticker list
+    tickers_file = Path(config["tickers_file"])
+    tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+    logger.info("Loaded %d tickers from %s", len(tickers), tickers_file)
+
+    # Determine feature list
+    feature_list = FEATURE_SETS[config["feature_set"]]
+    logger.info("Feature set '%s' → %d features", config["feature_set"], len(feature_list))
+
+    if config.get("streaming"):
+        model, y_val, y_pred = _train_streaming(config, tickers, feature_list, feature_dir, output_dir)
+    else:
+        data = load_training_data(config, tickers, feature_list, feature_dir, cache_dir)
+        model, y_val, y_pred = fit_model(config, data)
+        del data
+
+    save_model(config, model_dir, model, y_val, y_pred, feature_list)
+
+
 def main() -> None:
     """CLI entry point."""
     args = parse_args()
@@ -3,12 +3,12 @@
 
 import argparse
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import yaml
 import pandas as pd
 
-from model.metrics import METRIC_REGISTRY
+from model.metrics import evaluate
 
 
 def parse_args() -> argparse.Namespace:
@@ -37,17 +37,25 @@ def load_config(path: Path) -> Dict[str, Any]:
 def evaluate_model(
     model: Any,
     X: pd.DataFrame,
-    y: pd.Series
+    y: pd.Series,
+    task: Optional[str] = None
 ) -> Dict[str, float]:
     """
-    Compute all metrics registered in METRIC_REGISTRY on (X, y).
+    Compute the registered metrics of the task on (X, y).
     Returns a dict of metric_name -> value.
     """
-    y_pred = model.predict(X)
-    results: Dict[str, float] = {}
-    for name, fn in METRIC_REGISTRY.items():
-        try:
-            results[name] = float(fn(y, y_pred))
-        except Exception as e:
-            results[name] = f"Error: {e}"
-    return results
+    return evaluate_predictions(y, model.predict(X), task)
+
+
+def evaluate_predictions(y: Any, y_pred: Any, task: Optional[str] = None) -> Dict[str, float]:
+    """
+    Compute the metrics registered for `task` ('classification' or
+    'regression'; inferred from the values if None) on (y, y_pred).
+    Returns a dict of metric_name -> value.
+    """
+    return evaluate(y, y_pred, task)["metrics"]
+
+
+def config_task(config: Dict[str, Any]) -> str:
+    """The metrics task of a model config."""
+    return "regression" if config.get("regression_model", False) else "classification"
@@ -0,0 +1,239 @@
+# src/model/walk_forward.py
+"""
+Walk-forward (rolling-origin) training.
+
+Instead of the single SPLIT_BOUNDS cut, a config's `walk_forward` section
+generates consecutive folds, e.g.
+
+    walk_forward:
+      start: "2024-07-01"        # default: TRAIN_START
+      end: "2025-07-01"          # default: TEST_END
+      n_folds: 6
+      train_window: 120D         # rolling length (or expanding: true)
+      validate_window: 30D
+      test_window: 20D           # default: the history left after the first
+                                 #   train/validate windows, split n_folds ways
+      gap: 1D                    # purge between windows (longer than the label horizon)
+
+Each fold trains on [train], fits/early-stops on [validate] and scores its
+out-of-sample [test] window; the test windows tile the end of the history,
+so the fold scores stitch into one continuous series for run_backtest
+(sim config `scores_file`). The features are read once, over the whole
+range, with time-range pushdown, and labelled per ticker once; the folds are
+fit in parallel over that shared (forked) frame.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+
+from config import FEATURE_SETS, FEATURE_STORE_DIR, MODEL_DIR, TEST_END, TRAIN_START
+from model.batch import THREADED_MODELS
+from model.labeling import apply_label
+from model.train import fit_model
+from model.utils import config_task, evaluate_predictions
+from preprocessing.filter_feature_data import filter_feature_data
+from preprocessing.shared_panel import FramesHandle, attach_frames, share_frames
+
+logger = logging.getLogger(__name__)
+
+WALK_FORWARD_DIR = "walk_forward"  # under model_dir/model_id
+WINDOWS = ("train", "validate", "test")
+
+Fold = Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]
+
+_WF_DATA: Optional[Dict[str, Any]] = None
+
+
+def walk_forward_folds(spec: Dict[str, Any]) -> List[Fold]:
+    """
+    Fold windows for a `walk_forward` spec, oldest first. Every window is a
+    [start, end) range; fold k's test window ends where fold k+1's begins.
+    """
+    start = pd.Timestamp(spec.get("start", TRAIN_START))
+    end = pd.Timestamp(spec.get("end", TEST_END))
+    n_folds = int(spec.get("n_folds", 4))
+    train_window = pd.Timedelta(spec.get("train_window", "180D"))
+    validate_window = pd.Timedelta(spec.get("validate_window", "30D"))
+    gap = pd.Timedelta(spec.get("gap", "1D"))
+    expanding = spec.get("expanding", False)
+    if n_folds < 1:
+        raise ValueError("walk_forward.n_folds must be at least 1")
+
+    if "test_window" in spec:
+        test_window = pd.Timedelta(spec["test_window"])
+    else:
+        first_test = start + train_window + gap + validate_window + gap
+        test_window = (end - first_test) / n_folds
+    if test_window <= pd.Timedelta(0):
+        raise ValueError(f"No room for {n_folds} test windows between {start} and {end}")
+
+    folds = []
+    for k in range(n_folds):
+        test_end = end - (n_folds - 1 - k) * test_window
+        test_start = test_end - test_window
+        validate_end = test_start - gap
+        validate_start = validate_end - validate_window
+        train_end = validate_start - gap
+        train_start = start if expanding else max(start, train_end - train_window)
+        if train_end <= train_start:
+            raise ValueError(f"Fold {k} has no training window (train would end at {train_end})")
+        folds.append({
+            "train": (train_start, train_end),
+            "validate": (validate_start, validate_end),
+            "test": (test_start, test_end),
+        })
+    return folds
+
+
+def _init_worker(handle: FramesHandle) -> None:
+    global _WF_DATA
+    _WF_DATA = attach_frames(handle).data()
+
+
+def _window_rows(fold: Fold, window: str, labelled: bool) -> np.ndarray:
+    """Positions of the shared frame's complete rows inside one fold window."""
+    start, end = fold[window]
+    times = _WF_DATA["times"]
+    mask = _WF_DATA["complete"] & (times >= start.value) & (times < end.value)
+    if labelled:
+        mask &= _WF_DATA["labelled"]
+    return np.flatnonzero(mask)
+
+
+def _fit_fold(config: Dict[str, Any], k: int, fold: Fold, params: Dict[str, Any],
+              fold_dir: Path) -> Dict[str, Any]:
+    """Fit one fold on the shared frame, save its model and score its test window."""
+    start = time.perf_counter()
+    X, y = _WF_DATA["X"], _WF_DATA["y"]
+    rows = {window: _window_rows(fold, window, labelled=window != "test") for window in WINDOWS}
+    for window in ("train", "validate"):
+        if len(rows[window]) == 0:
+            raise ValueError(f"Fold {k} has no labelled rows in its {window} window {fold[window]}")
+
+    data = {window: (X.iloc[rows[window]], y.iloc[rows[window]]) for window in ("train", "validate")}
+    model, y_val, y_pred = fit_model(config, data, params)
+    fold_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, fold_dir / "model.pkl")
+
+    # Out-of-sample: score every complete test row, evaluate the labelled ones
+    X_test = X.iloc[rows["test"]]
+    if len(X_test) == 0:
+        scores = np.empty(0)
+    elif config.get("regression_model", False):
+        scores = model.predict(X_test)
+    else:
+        scores = model.predict_proba(X_test)[:, 1]
+    labelled = _WF_DATA["labelled"][rows["test"]]
+
+    task = config_task(config)
+    result = {"fold": k}
+    for window in WINDOWS:
+        result[f"{window}_start"], result[f"{window}_end"] = fold[window]
+        result[f"{window}_rows"] = len(rows[window])
+    for name, value in evaluate_predictions(y_val, y_pred, task).items():
+        result[f"validate_{name}"] = value
+    if labelled.any():
+        test_pred = model.predict(X_test[labelled])
+        for name, value in evaluate_predictions(y.iloc[rows["test"][labelled]], test_pred, task).items():
+            result[f"test_{name}"] = value
+    result["wall_s"] = round(time.perf_counter() - start, 3)
+    return {"summary": result, "rows": rows["test"], "scores": np.asarray(scores, dtype=np.float64)}
+
+
+def run_walk_forward(
+    config: Dict[str, Any],
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR,
+    max_workers: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Train the config's model on every walk-forward fold and stitch the
+    out-of-sample scores.
+
+    Writes under model_dir/model_id/walk_forward: config.yaml, folds.csv (fold
+    windows, row counts, validate_* / test_* metrics), fold_<k>/model.pkl and
+    scores.parquet (the test rows of all folds with timestamp, ticker, their
+    feature columns, `score` and `fold`, as load_scored_data returns them).
+
+    Returns:
+        (folds, scores) frames as written to folds.csv and scores.parquet.
+    """
+    if config.get("streaming"):
+        raise ValueError("Walk-forward training does not support streaming configs")
+    folds = walk_forward_folds(config.get("walk_forward") or {})
+    model_type = config["model_type"].lower()
+    feature_list = FEATURE_SETS[config["feature_set"]]
+    tickers_file = Path(config["tickers_file"])
+    tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+    out_dir = model_dir / config["model_id"] / WALK_FORWARD_DIR
+    for k, fold in enumerate(folds):
+        logger.info("Fold %d: %s", k, ", ".join(f"{w} [{s.date()}, {e.date()})" for w, (s, e) in fold.items()))
+
+    # 1) One read over the whole range, labelled per ticker once
+    compact = config.get("compact", False)
+    df = filter_feature_data(
+        feature_dir=feature_dir,
+        tickers=tickers,
+        features=None,
+        start_time=folds[0]["train"][0],
+        end_time=folds[-1]["test"][1],
+        float_dtype="float32" if compact else None
+    )
+    if df.empty:
+        raise ValueError(f"No feature data between {folds[0]['train'][0]} and {folds[-1]['test'][1]}")
+    df = df[df.index < folds[-1]["test"][1]]
+    target = apply_label(config["label_method"], df)
+    logger.info("Loaded %d rows for %d folds", len(df), len(folds))
+
+    X = df[feature_list]
+    data = {
+        "X": X,
+        "y": target.astype("float32" if compact else "float64").rename("target"),
+        "times": df.index.as_unit("ns").asi8,
+        "complete": X.notna().all(axis=1).to_numpy(),
+        "labelled": target.notna().to_numpy(),
+    }
+
+    # 2) Fit the folds in parallel over one shared-memory copy of the frame
+    max_workers = min(max_workers or os.cpu_count() or 1, len(folds))
+    threads = max(1, (os.cpu_count() or 1) // max_workers)
+    params = dict(config.get("model_params", {}))
+    if model_type in THREADED_MODELS:
+        params.setdefault("n_jobs", threads)
+    ctx = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+    with share_frames(data) as shared, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                initializer=_init_worker, initargs=(shared.handle,)) as pool:
+        futures = [
+            pool.submit(_fit_fold, config, k, fold, params, out_dir / f"fold_{k:02d}")
+            for k, fold in enumerate(folds)
+        ]
+        results = [f.result() for f in futures]
+
+    # 3) Stitch the out-of-sample scores into one series
+    rows = np.concatenate([r["rows"] for r in results])
+    scores = df.iloc[rows].copy()
+    scores["score"] = np.concatenate([r["scores"] for r in results])
+    scores["fold"] = np.repeat([r["summary"]["fold"] for r in results], [len(r["rows"]) for r in results])
+    scores["timestamp"] = scores.index
+    scores = scores.reset_index(drop=True)
+    folds_df = pd.DataFrame([r["summary"] for r in results])
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "config.yaml").write_text(yaml.safe_dump(config))
+    folds_df.to_csv(out_dir / "folds.csv", index=False)
+    scores.to_parquet(out_dir / "scores.parquet")
+    logger.info("Walk-forward scores (%d rows, %d folds) saved to %s",
+                len(scores), len(folds), out_dir / "scores.parquet")
+    return folds_df, scores
@@ -1,8 +1,18 @@
 # src/preprocessing/data_fetch.py
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timezone
 
+from config import RAW_DIR
+from preprocessing.raw_cache import RawBarCache, slice_bars
+
 def fetch_stock_data(ticker: str, period: str = "60d", interval: str = "1h") -> pd.DataFrame:
     try:
         df = yf.download(
@@ -21,3 +31,212 @@ def fetch_stock_data(ticker: str, period: str = "60d", interval: str = "1h") ->
     except Exception as e:
         print(f"[ERROR] Could not fetch data for {ticker}: {e}")
         return None
+
+
+# ——— Pluggable bar sources ———
+#
+# A source is any object with
+#     download(tickers, start, end, interval) -> Dict[ticker, DataFrame]
+# returning OHLCV frames indexed by naive UTC timestamps in [start, end).
+# Tickers with no data may be left out of the result.
+
+class YahooSource:
+    """Batched multi-ticker downloads from Yahoo Finance."""
+
+    def download(self, tickers: Sequence[str], start: pd.Timestamp, end: pd.Timestamp,
+                 interval: str = "1h") -> Dict[str, pd.DataFrame]:
+        df = yf.download(
+            list(tickers),
+            start=start,
+            end=end,
+            interval=interval,
+            group_by="ticker",
+            threads=False,
+            progress=False,
+            auto_adjust=True
+        )
+        if df is None or df.empty:
+            return {}
+        if df.index.tz is not None:
+            df.index = df.index.tz_convert("UTC").tz_localize(None)  # force UTC then make naive
+
+        out = {}
+        for ticker in tickers:
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            sub = df[ticker].dropna(how="all")
+            sub.columns.name = None
+            if not sub.empty:
+                out[ticker] = sub
+        return out
+
+
+class ParquetSource:
+    """Serve bars from local {directory}/{ticker}.parquet files (offline runs, tests)."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def download(self, tickers: Sequence[str], start: pd.Timestamp, end: pd.Timestamp,
+                 interval: str = "1h") -> Dict[str, pd.DataFrame]:
+        out = {}
+        for ticker in tickers:
+            path = self.directory / f"{ticker}.parquet"
+            if not path.exists():
+                continue
+            df = pd.read_parquet(path)
+            df = df[(df.index >= start) & (df.index < end)]
+            if not df.empty:
+                out[ticker] = df
+        return out
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1 / calls_per_second apart."""
+
+    def __init__(self, calls_per_second: Optional[float]):
+        self.interval = 1.0 / calls_per_second if calls_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _load_coverage(cache_dir: Optional[Path], interval: str) -> Dict[str, list]:
+    path = cache_dir / interval / "_coverage.json" if cache_dir else None
+    if not path or not path.exists():
+        return {}
+    return {t: [pd.Timestamp(lo), pd.Timestamp(hi)] for t, (lo, hi) in json.loads(path.read_text()).items()}
+
+
+def _save_coverage(cache_dir: Path, interval: str, coverage: Dict[str, list]) -> None:
+    path = cache_dir / interval / "_coverage.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({t: [lo.isoformat(), hi.isoformat()] for t, (lo, hi) in coverage.items()}))
+
+
+def fetch_many(
+    tickers: Sequence[str],
+    period: str = "60d",
+    interval: str = "1h",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cache_dir: Optional[Path] = RAW_DIR,
+    source=None,
+    batch_size: int = 50,
+    max_workers: int = 4,
+    calls_per_second: Optional[float] = 2.0,
+    debug: bool = False
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch OHLCV bars for many tickers, downloading only what the cache lacks.
+
+    Raw bars are cached per ticker in {cache_dir}/{interval}/{ticker}/, as
+    memory-mapped columns (see preprocessing/raw_cache.py), and the time
+    range already requested for each ticker is recorded in
+    {cache_dir}/{interval}/_coverage.json. Only the parts of [start, end)
+    outside that range are downloaded (from the last cached bar onwards, as
+    it may have been incomplete). Tickers needing the same range are
+    downloaded together in batches of `batch_size`, over a thread pool of
+    `max_workers`, with calls spaced by `calls_per_second`.
+
+    Args:
+        tickers: Stock symbols
+        period: Lookback such as "390d", used when start is None
+        interval: Bar size passed to the source
+        start, end: Optional explicit range [start, end); end defaults to now
+        cache_dir: Raw cache root, or None to disable caching
+        source: Bar source (default: YahooSource)
+        batch_size: Tickers per download call
+        max_workers: Concurrent download calls
+        calls_per_second: Download rate limit (None for unlimited)
+        debug: If True, print detailed logs
+
+    Returns:
+        Dict of ticker -> OHLCV DataFrame over [start, end), for tickers with data;
+        frames of cached tickers are views of the mapped cache files.
+    """
+    source = source or YahooSource()
+    end_ts = pd.Timestamp(end) if end else pd.Timestamp(datetime.now(timezone.utc)).tz_localize(None)
+    start_ts = pd.Timestamp(start) if start else end_ts - pd.Timedelta(period)
+
+    # 1) Read the cache and work out each ticker's missing ranges
+    coverage = _load_coverage(cache_dir, interval)
+    cache = RawBarCache(cache_dir, interval) if cache_dir else None
+    cached: Dict[str, pd.DataFrame] = {}
+    wanted: Dict[tuple, list] = {}
+    for ticker in tickers:
+        if cache is not None and ticker in cache:
+            cached[ticker] = cache.read(ticker)
+        if ticker not in coverage:
+            wanted.setdefault((start_ts, end_ts), []).append(ticker)
+            continue
+        lo, hi = coverage[ticker]
+        if start_ts < lo:
+            wanted.setdefault((start_ts, lo), []).append(ticker)
+        if hi < end_ts:
+            if ticker in cached and not cached[ticker].empty:
+                hi = min(hi, cached[ticker].index[-1])
+            wanted.setdefault((hi, end_ts), []).append(ticker)
+
+    # 2) Download the missing ranges in batches
+    jobs = [
+        (names[i:i + batch_size], lo, hi)
+        for (lo, hi), names in wanted.items()
+        for i in range(0, len(names), batch_size)
+    ]
+    limiter = RateLimiter(calls_per_second)
+
+    def run(job):
+        names, lo, hi = job
+        limiter.wait()
+        try:
+            return job, source.download(names, lo, hi, interval)
+        except Exception as e:
+            print(f"[ERROR] Could not fetch {len(names)} tickers ({names[0]}…) for {lo} → {hi}: {e}")
+            return job, None
+
+    if debug:
+        print(f"[INFO] Fetching {sum(len(j[0]) for j in jobs)} ticker ranges in {len(jobs)} batches "
+              f"({len(cached)} tickers cached)")
+    fetched: Dict[str, list] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for (names, lo, hi), result in pool.map(run, jobs):
+            if result is None:
+                continue
+            for ticker, df in result.items():
+                fetched.setdefault(ticker, []).append(df)
+            for ticker in names:
+                old_lo, old_hi = coverage.get(ticker, (lo, hi))
+                coverage[ticker] = [min(old_lo, lo), max(old_hi, hi)]
+
+    # 3) Merge new bars into the cache and return the requested window
+    out = {}
+    for ticker in tickers:
+        parts = ([cached[ticker]] if ticker in cached else []) + fetched.get(ticker, [])
+        if not parts:
+            if debug:
+                print(f"[WARNING] No data for {ticker}")
+            continue
+        if ticker not in fetched:
+            df = parts[0]
+        elif cache is not None:
+            cache.write(ticker, pd.concat(parts))  # sorted, last row of duplicate timestamps kept
+            df = cache.read(ticker)
+        else:
+            df = pd.concat(parts)
+            df = df[~df.index.duplicated(keep="last")].sort_index()
+
+        window = slice_bars(df, start_ts, end_ts)
+        if not window.empty:
+            out[ticker] = window
+
+    if cache_dir and jobs:
+        _save_coverage(cache_dir, interval, coverage)
+    return out
@@ -0,0 +1,68 @@
+# src/preprocessing/feature_store.py
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import SPLIT_BOUNDS
+
+# Rows per Parquet row group. Each row group carries min/max statistics on
+# 'timestamp', so a time-range query skips the groups outside its window
+# (~1000 hourly bars is about 5 months of one ticker).
+ROW_GROUP_SIZE = 1000
+
+
+def ticker_path(store_dir: Path, ticker: str) -> Path:
+    """Location of one ticker's partition in a feature store."""
+    return store_dir / f"ticker={ticker}" / "part-0.parquet"
+
+
+def split_bounds(split: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """The [start, end) time range of a named split in SPLIT_BOUNDS."""
+    try:
+        start, end = SPLIT_BOUNDS[split]
+    except KeyError:
+        raise ValueError(f"Unknown split '{split}'. Valid: {list(SPLIT_BOUNDS)}")
+    return pd.Timestamp(start), pd.Timestamp(end)
+
+
+def write_ticker_features(store_dir: Path, ticker: str, features_df: pd.DataFrame) -> Path:
+    """
+    Write (replace) one ticker's full feature history in the store.
+
+    Rows are sorted by time and the index is stored as a 'timestamp' column.
+    """
+    df = features_df.drop(columns=["ticker"], errors="ignore")
+    df = df.iloc[np.argsort(df.index.to_numpy(), kind="stable")]
+    df.index = pd.DatetimeIndex(df.index, name="timestamp")
+
+    path = ticker_path(store_dir, ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE, write_statistics=True)
+    return path
+
+
+def write_feature_store(features_df: pd.DataFrame, store_dir: Path, debug: bool = False) -> int:
+    """
+    Write a long multi-ticker feature frame (with a 'ticker' column) to the store,
+    one partition per ticker.
+
+    Returns:
+        Number of tickers written.
+    """
+    if features_df.empty:
+        return 0
+    tickers = features_df["ticker"].to_numpy()
+    order = np.argsort(tickers, kind="stable")
+    tickers = tickers[order]
+    bounds = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1], True])
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        write_ticker_features(store_dir, tickers[lo], features_df.iloc[order[lo:hi]])
+    if debug:
+        print(f"[INFO] Wrote features for {len(bounds) - 1} tickers to {store_dir}")
+    return len(bounds) - 1
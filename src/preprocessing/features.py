@@ -1,22 +1,110 @@
 # src/preprocessing/features.py
 import pandas as pd
 import numpy as np
+from graphlib import TopologicalSorter
 
 FEATURE_REGISTRY = {}
+FEATURE_LOOKBACK = {}
+FEATURE_INPUTS = {}
 
-def register_feature(name):
+# Named intermediate results that several features share. Each is computed
+# at most once per ticker and passed to the features (or intermediates) that
+# declare it as an input.
+INTERMEDIATE_REGISTRY = {}
+INTERMEDIATE_INPUTS = {}
+
+# EWM features have unbounded memory; this many bars of warm-up per unit of
+# span brings a restarted EWM within ~1e-9 (relative) of the full-history value.
+EWM_WARMUP_SPANS = 10
+
+def register_feature(name, lookback: int = 0, inputs: tuple = ()):
     """
     Decorator to register a feature-generating function under a given name.
+
+    The function takes the raw bars and returns the feature as a pd.Series
+    aligned with them (it is named after the feature when computed). Features
+    built from column arithmetic and pandas rolling/ewm ops also work when
+    df["Close"] etc. are (bar × ticker) DataFrames, which the panel engine
+    in preprocessing/panel_features.py relies on.
+
+    lookback: number of bars before a row the feature needs to compute that
+    row's value. Used to recompute only the tail of an existing feature file.
+    inputs: names of intermediates the function takes as keyword arguments,
+    i.e. it is called as func(df, **{name: intermediate_result}).
     """
     def decorator(func):
         if name in FEATURE_REGISTRY:
             raise ValueError(f"Feature '{name}' is already registered.")
         FEATURE_REGISTRY[name] = func
+        FEATURE_LOOKBACK[name] = lookback
+        FEATURE_INPUTS[name] = tuple(inputs)
         return func
     return decorator
 
-@register_feature("rsi")
-def rsi(df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+def register_intermediate(name, inputs: tuple = ()):
+    """
+    Decorator to register a shared intermediate: func(df, **inputs) -> pd.Series.
+    """
+    def decorator(func):
+        if name in INTERMEDIATE_REGISTRY:
+            raise ValueError(f"Intermediate '{name}' is already registered.")
+        INTERMEDIATE_REGISTRY[name] = func
+        INTERMEDIATE_INPUTS[name] = tuple(inputs)
+        return func
+    return decorator
+
+def feature_plan(feature_columns) -> list:
+    """
+    Return the intermediates needed by `feature_columns`, in dependency order.
+
+    Raises:
+        ValueError: for unregistered features or intermediates
+        graphlib.CycleError: if intermediates depend on each other cyclically
+    """
+    graph = {}
+    pending = []
+    for feature in feature_columns:
+        if feature not in FEATURE_REGISTRY:
+            raise ValueError(f"Feature '{feature}' not registered.")
+        pending.extend(FEATURE_INPUTS[feature])
+
+    while pending:
+        name = pending.pop()
+        if name in graph:
+            continue
+        if name not in INTERMEDIATE_REGISTRY:
+            raise ValueError(f"Intermediate '{name}' not registered.")
+        graph[name] = INTERMEDIATE_INPUTS[name]
+        pending.extend(INTERMEDIATE_INPUTS[name])
+
+    return list(TopologicalSorter(graph).static_order())
+
+# ——— Shared intermediates ———
+
+@register_intermediate("close_lag_1")
+def close_lag_1(df):
+    return df["Close"].shift(1)
+
+@register_intermediate("close_ratio_1", inputs=("close_lag_1",))
+def close_ratio_1(df, close_lag_1):
+    return df["Close"] / close_lag_1
+
+@register_intermediate("pct_change_1", inputs=("close_ratio_1",))
+def pct_change_1(df, close_ratio_1):
+    return close_ratio_1 - 1
+
+@register_intermediate("rolling_mean_20")
+def rolling_mean_20(df):
+    return df["Close"].rolling(window=20).mean()
+
+@register_intermediate("rolling_std_20")
+def rolling_std_20(df):
+    return df["Close"].rolling(window=20).std()
+
+# ——— Features ———
+
+@register_feature("rsi", lookback=14)
+def rsi(df: pd.DataFrame, window: int = 14) -> pd.Series:
     """
     Compute the Relative Strength Index (RSI) for a given price DataFrame.
     
@@ -25,9 +113,9 @@ def rsi(df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
         window: Rolling window size for RSI computation
 
     Returns:
-        A DataFrame with one column: 'rsi'
+        The RSI series
     """
-    if "Close" not in df.columns:
+    if "Close" not in df:
         raise ValueError("RSI calculation requires a 'Close' column in the input DataFrame.")
 
     delta = df["Close"].diff()
@@ -40,77 +128,64 @@ def rsi(df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
     rs = avg_gain / avg_loss
     rsi = 100 - (100 / (1 + rs))
 
-    return pd.DataFrame({"rsi": rsi})
+    return rsi
 
-@register_feature("macd")
+@register_feature("macd", lookback=26 * EWM_WARMUP_SPANS)
 def macd(df):
     ema12 = df["Close"].ewm(span=12, adjust=False).mean()
     ema26 = df["Close"].ewm(span=26, adjust=False).mean()
-    macd_line = ema12 - ema26
-    return pd.DataFrame({"macd": macd_line})
+    return ema12 - ema26
 
-@register_feature("sma20")
-def sma20(df):
-    sma = df["Close"].rolling(window=20).mean()
-    return pd.DataFrame({"sma20": sma})
+@register_feature("sma20", lookback=19, inputs=("rolling_mean_20",))
+def sma20(df, rolling_mean_20):
+    return rolling_mean_20
 
-@register_feature("return_1h")
-def return_1h(df):
-    ret = df["Close"].pct_change(periods=1)
-    return pd.DataFrame({"return_1h": ret})
+@register_feature("return_1h", lookback=1, inputs=("pct_change_1",))
+def return_1h(df, pct_change_1):
+    return pct_change_1
 
-@register_feature("return_4h")
+@register_feature("return_4h", lookback=4)
 def return_4h(df):
-    ret = df["Close"].pct_change(periods=4)
-    return pd.DataFrame({"return_4h": ret})
+    return df["Close"].pct_change(periods=4)
 
-@register_feature("log_return_1h")
-def log_return_1h(df):
-    ratio = df["Close"] / df["Close"].shift(1)
-    log_ret = np.log(ratio.where(ratio > 0))
-    return pd.DataFrame({"log_return_1h": log_ret})
+@register_feature("log_return_1h", lookback=1, inputs=("close_ratio_1",))
+def log_return_1h(df, close_ratio_1):
+    ratio = close_ratio_1
+    return np.log(ratio.where(ratio > 0))
 
-@register_feature("volatility_5h")
-def volatility_5h(df):
-    vol = df["Close"].pct_change().rolling(window=5).std()
-    return pd.DataFrame({"volatility_5h": vol})
+@register_feature("volatility_5h", lookback=5, inputs=("pct_change_1",))
+def volatility_5h(df, pct_change_1):
+    return pct_change_1.rolling(window=5).std()
 
-@register_feature("momentum")
+@register_feature("momentum", lookback=5)
 def momentum(df):
-    mom = df["Close"] - df["Close"].shift(5)
-    return pd.DataFrame({"momentum": mom})
-
-@register_feature("bollinger_upper")
-def bollinger_upper(df, window: int = 20):
-    sma = df["Close"].rolling(window=window).mean()
-    std = df["Close"].rolling(window=window).std()
-    upper = sma + (2 * std)
-    return pd.DataFrame({"bollinger_upper": upper})
-
-@register_feature("bollinger_lower")
-def bollinger_lower(df, window: int = 20):
-    sma = df["Close"].rolling(window=window).mean()
-    std = df["Close"].rolling(window=window).std()
-    lower = sma - (2 * std)
-    return pd.DataFrame({"bollinger_lower": lower}) 
+    return df["Close"] - df["Close"].shift(5)
+
+@register_feature("bollinger_upper", lookback=19, inputs=("rolling_mean_20", "rolling_std_20"))
+def bollinger_upper(df, rolling_mean_20, rolling_std_20):
+    return rolling_mean_20 + (2 * rolling_std_20)
+
+@register_feature("bollinger_lower", lookback=19, inputs=("rolling_mean_20", "rolling_std_20"))
+def bollinger_lower(df, rolling_mean_20, rolling_std_20):
+    return rolling_mean_20 - (2 * rolling_std_20)
 
 @register_feature("Close")
 def close_(df):
-    return pd.DataFrame(df["Close"], columns=["Close"])
+    return df["Close"]
 
 @register_feature("Open")
 def open_(df):
-    return pd.DataFrame(df["Open"], columns=["Open"])
+    return df["Open"]
 
 @register_feature("High")
 def high_(df):
-    return pd.DataFrame(df["High"], columns=["High"])
+    return df["High"]
 
 @register_feature("Low")
 def low_(df):
-    return pd.DataFrame(df["Low"], columns=["Low"])
+    return df["Low"]
 
 @register_feature("Volume")
 def volume_(df):
-    return pd.DataFrame(df["Volume"], columns=["Volume"])
+    return df["Volume"]
 
@@ -1,6 +1,121 @@
+import os
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Dict, Iterator, Optional, Sequence
+
+from preprocessing.feature_store import ticker_path, split_bounds
+from preprocessing.shared_panel import attach_panel, is_panel
+
+
+def _index_column(schema: pa.Schema) -> Optional[str]:
+    """Name of the column holding the pandas DatetimeIndex in a feature file."""
+    meta = schema.pandas_metadata or {}
+    for col in meta.get("index_columns", []):
+        if isinstance(col, str):
+            return col
+    return None
+
+
+def resolve_feature_files(feature_dir: Path, tickers: Sequence[str]) -> Dict[str, str]:
+    """
+    Map each ticker's feature file (store partition, else legacy <T>.parquet)
+    to its ticker, as {posix path: ticker}. Missing tickers are skipped with a warning.
+    """
+    paths = {}
+    for ticker in tickers:
+        path = ticker_path(feature_dir, ticker)
+        if not path.exists():
+            path = feature_dir / f"{ticker}.parquet"
+        if not path.exists():
+            print(f"[WARNING] Missing file for {ticker}, skipping.")
+            continue
+        paths[path.as_posix()] = ticker
+    return paths
+
+
+def _read_feature_files(
+    feature_dir: Path,
+    tickers: Sequence[str],
+    features: Optional[Sequence[str]],
+    start_time: Optional[pd.Timestamp],
+    end_time: Optional[pd.Timestamp],
+    split: Optional[str],
+    float_dtype: Optional[str]
+) -> pd.DataFrame:
+    """filter_feature_data's scan of the ticker Parquet files, before the timestamp/save/debug options."""
+    paths = resolve_feature_files(feature_dir, tickers)
+    if not paths:
+        return pd.DataFrame()
+
+    dataset = ds.dataset(list(paths), format="parquet")
+    index_col = _index_column(dataset.schema)
+
+    # Column projection: requested features only, never stray ticker-named columns
+    columns = [
+        col for col in dataset.schema.names
+        if col != index_col and col not in paths.values()
+        and (not features or col in features)
+    ]
+
+    # Time filter (inclusive at both ends), plus the split's [start, end)
+    bounds = []
+    if index_col:
+        ts = ds.field(index_col)
+        ts_type = dataset.schema.field(index_col).type
+        if start_time:
+            bounds.append(ts >= pa.scalar(pd.Timestamp(start_time), type=ts_type))
+        if end_time:
+            bounds.append(ts <= pa.scalar(pd.Timestamp(end_time), type=ts_type))
+        if split:
+            split_start, split_end = split_bounds(split)
+            bounds.append(ts >= pa.scalar(split_start, type=ts_type))
+            bounds.append(ts < pa.scalar(split_end, type=ts_type))
+    expr = None
+    for bound in bounds:
+        expr = bound if expr is None else expr & bound
+
+    projection = columns + ([index_col] if index_col else [])
+    schema = pa.schema([dataset.schema.field(col) for col in projection])
+    if float_dtype:
+        target = pa.from_numpy_dtype(np.dtype(float_dtype))
+        schema = pa.schema([
+            field.with_type(target) if field.name in columns and pa.types.is_floating(field.type) else field
+            for field in schema
+        ])
+
+    # Stream the record batches, casting each one as it is decoded; the
+    # fragment (file) each batch came from gives its rows' ticker code
+    file_codes = {path: code for code, path in enumerate(paths)}
+    batches, batch_codes = [], []
+    for tagged in dataset.scanner(columns=projection, filter=expr).scan_batches():
+        batch = tagged.record_batch
+        if batch.num_rows == 0:
+            continue
+        batches.append(batch.cast(schema) if float_dtype else batch)
+        batch_codes.append(np.full(batch.num_rows, file_codes[tagged.fragment.path], dtype=np.int32))
+    table = pa.Table.from_batches(batches, schema=schema)
+    del batches
+    codes = np.concatenate(batch_codes) if batch_codes else np.empty(0, dtype=np.int32)
+    categories = list(paths.values())
+
+    # Sort by time on the Arrow side, then convert while releasing the Arrow
+    # buffers column by column, so the rows exist in at most ~1.x copies
+    if index_col:
+        order = np.argsort(table.column(index_col).to_numpy(), kind="stable")
+        table = table.take(order)
+        codes = codes[order]
+    result = table.to_pandas(self_destruct=True, split_blocks=True)
+    del table
+    if index_col:
+        result = result.set_index(index_col)
+        result.index.name = None if index_col.startswith("__index_level_") else index_col
+    result["ticker"] = pd.Categorical.from_codes(codes, categories=categories).remove_unused_categories()
+    return result
 
 
 def filter_feature_data(
@@ -11,13 +126,26 @@ def filter_feature_data(
     end_time: Optional[pd.Timestamp] = None,
     save_path: Optional[Path] = None,
     debug: bool = False,
-    retain_timestamp: bool = False
+    retain_timestamp: bool = False,
+    split: Optional[str] = None,
+    float_dtype: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Load and filter feature data from individual ticker Parquet files.
 
+    feature_dir is either a feature store (one ticker=<T>/ partition per
+    ticker, see preprocessing/feature_store.py), a legacy split folder of
+    <T>.parquet files, or a shared panel directory (see
+    preprocessing/shared_panel.py), whose memory-mapped arrays are sliced
+    instead of decoding Parquet; its values keep the panel's dtype unless
+    float_dtype is given.
+
+    The files are opened as one pyarrow dataset, so the column selection and
+    the time range are pushed down into the Parquet reader: only the requested
+    columns are decoded, and row groups outside the range are skipped.
+
     Parameters:
-        feature_dir: Path to folder containing individual .parquet files
+        feature_dir: Path to folder containing individual .parquet files, or a panel directory
         tickers: list of tickers to include
         features: list of features to retain (if None, keep all)
         start_time: optional datetime lower bound
@@ -25,39 +153,20 @@ def filter_feature_data(
         save_path: optional path to save the concatenated filtered DataFrame
         debug: print summary of result
         retain_timestamp: if True, reset the datetime index into a column "timestamp"
+        split: optional SPLIT_BOUNDS name; further restricts rows to its [start, end)
+        float_dtype: optional dtype (e.g. "float32") for the floating-point feature
+            columns, applied to the Arrow table before conversion to pandas
 
     Returns:
-        Concatenated and filtered DataFrame with a 'ticker' column.
-        If retain_timestamp=True, includes a "timestamp" column.
+        Concatenated and filtered DataFrame with a categorical 'ticker' column,
+        sorted by time. If retain_timestamp=True, includes a "timestamp" column.
     """
-    all_dfs = []
-
-    for ticker in tickers:
-        path = feature_dir / f"{ticker}.parquet"
-        if not path.exists():
-            print(f"[WARNING] Missing file for {ticker}, skipping.")
-            continue
-
-        df = pd.read_parquet(path)
-        df = df.drop(columns=[ticker], errors="ignore")
-
-        # Time filter
-        if start_time or end_time:
-            df = df.loc[
-                (df.index >= (start_time or df.index.min())) &
-                (df.index <= (end_time or df.index.max()))
-            ]
-
-        # Feature filter
-        if features:
-            keep = [col for col in df.columns if col in features]
-            df = df[keep]
-
-        df = df.copy()
-        df["ticker"] = ticker
-        all_dfs.append(df)
-
-    result = pd.concat(all_dfs).sort_index()
+    if is_panel(feature_dir):
+        result = attach_panel(feature_dir).frame(tickers, features, start_time, end_time, split, float_dtype)
+    else:
+        result = _read_feature_files(feature_dir, tickers, features, start_time, end_time, split, float_dtype)
+    if result.columns.empty:
+        return result
 
     # Optionally reset index to a timestamp column
     if retain_timestamp:
@@ -69,8 +178,74 @@ def filter_feature_data(
         print(f"[INFO] Saved filtered feature data to {save_path}")
 
     if debug:
-        print(f"[SUMMARY] {len(result)} rows across {len(all_dfs)} tickers")
+        print(f"[SUMMARY] {len(result)} rows across {result['ticker'].nunique()} tickers")
         print(f" - Time range: {result.index.min()} → {result.index.max()}")
         print(f" - Columns: {result.columns.tolist()}")
 
     return result
+
+
+def iter_feature_chunks(
+    feature_dir: Path,
+    tickers: Sequence[str],
+    chunk_tickers: int,
+    **kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    Read feature data `chunk_tickers` tickers at a time, for data too large to
+    load at once. Each chunk holds complete ticker histories, so per-ticker
+    operations (e.g. labeling) work on it as on the full frame.
+
+    Keyword arguments are passed to filter_feature_data; empty chunks are skipped.
+    """
+    for i in range(0, len(tickers), chunk_tickers):
+        df = filter_feature_data(feature_dir=feature_dir, tickers=tickers[i:i + chunk_tickers], **kwargs)
+        if not df.empty:
+            yield df
+
+
+def read_latest_bars(
+    feature_dir: Path,
+    tickers: Sequence[str],
+    features: Sequence[str],
+    cache: Optional[Dict[str, tuple]] = None
+) -> pa.Table:
+    """
+    Read the most recent feature row of each ticker, for live scoring.
+
+    Only the last row group of each (time-sorted) file is decoded, and only
+    the requested columns. With a `cache` dict, rows are kept per file and
+    re-read only once the file's mtime changes, so repeated calls cost a
+    stat per ticker.
+
+    Returns:
+        Arrow table with 'ticker', 'timestamp' and the feature columns,
+        one row per ticker that has data.
+    """
+    tables = []
+    key = tuple(features)
+    for path, ticker in resolve_feature_files(feature_dir, tickers).items():
+        mtime = os.stat(path).st_mtime_ns
+        if cache is not None and cache.get(path, (None,))[0] == (mtime, key):
+            table = cache[path][1]
+        else:
+            pf = pq.ParquetFile(path)
+            if pf.metadata.num_rows == 0:
+                continue
+            index_col = _index_column(pf.schema_arrow) or "timestamp"
+            group = pf.read_row_group(pf.num_row_groups - 1, columns=list(features) + [index_col])
+            row = group.slice(group.num_rows - 1)
+            table = pa.table(
+                [pa.array([ticker]), row.column(index_col)] + [row.column(f) for f in features],
+                names=["ticker", "timestamp"] + list(features)
+            )
+            if cache is not None:
+                cache[path] = ((mtime, key), table)
+        tables.append(table)
+    if not tables:
+        return pa.table(
+            [pa.array([], pa.string()), pa.array([], pa.timestamp("ns"))]
+            + [pa.array([], pa.float64()) for _ in features],
+            names=["ticker", "timestamp"] + list(features)
+        )
+    return pa.concat_tables(tables, promote_options="default")
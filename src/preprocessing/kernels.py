@@ -0,0 +1,247 @@
+# src/preprocessing/kernels.py
+"""
+Array kernels for the registered features, selectable per run as a faster
+alternative to the pandas implementations in features.py.
+
+Backends:
+    "numpy": vectorized NumPy; rolling windows use strided views and EWMs an
+             IIR filter (scipy.signal.lfilter)
+    "numba": single-pass O(n) compiled loops (running sums, add/remove
+             Welford variance, EWM recursion); needs the optional numba package
+
+Kernels take a dict of contiguous float64 arrays ("Close", "Open", ...) and
+return a float64 array of the same length. They match the pandas features to
+floating-point rounding, assuming finite inputs (compute_features falls back
+to pandas when they are not).
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
+
+KERNEL_REGISTRY = {}
+BACKENDS = ("pandas", "numpy", "numba")
+
+
+def register_kernel(name):
+    """
+    Decorator to register the array kernel of a registered feature.
+    Signature: fn(bars: Dict[str, np.ndarray], ops) -> np.ndarray
+    """
+    def decorator(func):
+        if name in KERNEL_REGISTRY:
+            raise ValueError(f"Kernel '{name}' is already registered.")
+        KERNEL_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[periods:] = x[:-periods]
+    return out
+
+
+# ——— NumPy primitives ———
+
+class NumpyOps:
+    @staticmethod
+    def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+        out = np.full_like(x, np.nan)
+        if len(x) >= window:
+            out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+        return out
+
+    @staticmethod
+    def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+        out = np.full_like(x, np.nan)
+        if len(x) >= window:
+            out[window - 1:] = sliding_window_view(x, window).std(axis=1, ddof=1)
+        return out
+
+    @staticmethod
+    def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+        from scipy.signal import lfilter
+        if len(x) == 0:
+            return x.copy()
+        alpha = 2.0 / (span + 1.0)
+        # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded so that y[0] = x[0]
+        y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])
+        return y
+
+
+# ——— Numba primitives ———
+
+def _rolling_mean_loop(x, window):
+    n = len(x)
+    out = np.full(n, np.nan)
+    total = 0.0
+    nans = 0
+    for i in range(n):
+        if np.isnan(x[i]):
+            nans += 1
+        else:
+            total += x[i]
+        if i >= window:
+            if np.isnan(x[i - window]):
+                nans -= 1
+            else:
+                total -= x[i - window]
+        if i >= window - 1 and nans == 0:
+            out[i] = total / window
+    return out
+
+
+def _rolling_std_loop(x, window):
+    n = len(x)
+    out = np.full(n, np.nan)
+    count = 0
+    nans = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        v = x[i]
+        if np.isnan(v):
+            nans += 1
+        else:
+            count += 1
+            d = v - mean
+            mean += d / count
+            m2 += d * (v - mean)
+        if i >= window:
+            v = x[i - window]
+            if np.isnan(v):
+                nans -= 1
+            else:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    d = v - mean
+                    mean -= d / count
+                    m2 -= d * (v - mean)
+        if i >= window - 1 and nans == 0:
+            out[i] = np.sqrt(max(m2, 0.0) / (window - 1))
+    return out
+
+
+def _ewm_loop(x, span):
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    y = x[0]
+    out[0] = y
+    for i in range(1, n):
+        y = (1.0 - alpha) * y + alpha * x[i]
+        out[i] = y
+    return out
+
+
+class NumbaOps:
+    rolling_mean = staticmethod(njit(cache=True)(_rolling_mean_loop) if njit else _rolling_mean_loop)
+    rolling_std = staticmethod(njit(cache=True)(_rolling_std_loop) if njit else _rolling_std_loop)
+    ewm_mean = staticmethod(njit(cache=True)(_ewm_loop) if njit else _ewm_loop)
+
+
+class _SharedOps:
+    """
+    Per-ticker memo over a backend's primitives, so kernels that need the same
+    window (e.g. both Bollinger bands) compute it once. Inputs are kept alive
+    with the results so their ids stay unique.
+    """
+
+    def __init__(self, ops):
+        self._ops = ops
+        self._memo = {}
+
+    def _call(self, name, x, n):
+        key = (name, id(x), n)
+        if key not in self._memo:
+            self._memo[key] = (x, getattr(self._ops, name)(x, n))
+        return self._memo[key][1]
+
+    def rolling_mean(self, x, window):
+        return self._call("rolling_mean", x, window)
+
+    def rolling_std(self, x, window):
+        return self._call("rolling_std", x, window)
+
+    def ewm_mean(self, x, span):
+        return self._call("ewm_mean", x, span)
+
+
+def get_ops(backend: str):
+    """Fresh (per-ticker) primitive operations for a kernel backend."""
+    if backend == "numpy":
+        return _SharedOps(NumpyOps)
+    if backend == "numba":
+        if njit is None:
+            raise ImportError("The 'numba' feature backend requires the numba package.")
+        return _SharedOps(NumbaOps)
+    raise ValueError(f"Unknown kernel backend '{backend}'. Valid: {list(BACKENDS[1:])}")
+
+
+# ——— Feature kernels ———
+
+@register_kernel("rsi")
+def rsi_kernel(bars, ops, window: int = 14):
+    delta = np.diff(bars["Close"], prepend=np.nan)
+    gain = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    loss = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+    avg_gain = ops.rolling_mean(gain, window)
+    avg_loss = ops.rolling_mean(loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+@register_kernel("macd")
+def macd_kernel(bars, ops):
+    close = bars["Close"]
+    return ops.ewm_mean(close, 12) - ops.ewm_mean(close, 26)
+
+@register_kernel("sma20")
+def sma20_kernel(bars, ops):
+    return ops.rolling_mean(bars["Close"], 20)
+
+@register_kernel("return_1h")
+def return_1h_kernel(bars, ops):
+    close = bars["Close"]
+    return close / _shift(close, 1) - 1
+
+@register_kernel("return_4h")
+def return_4h_kernel(bars, ops):
+    close = bars["Close"]
+    return close / _shift(close, 4) - 1
+
+@register_kernel("log_return_1h")
+def log_return_1h_kernel(bars, ops):
+    ratio = bars["Close"] / _shift(bars["Close"], 1)
+    with np.errstate(invalid="ignore"):
+        return np.log(np.where(ratio > 0, ratio, np.nan))
+
+@register_kernel("volatility_5h")
+def volatility_5h_kernel(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_std(close / _shift(close, 1) - 1, 5)
+
+@register_kernel("momentum")
+def momentum_kernel(bars, ops):
+    close = bars["Close"]
+    return close - _shift(close, 5)
+
+@register_kernel("bollinger_upper")
+def bollinger_upper_kernel(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_mean(close, 20) + 2 * ops.rolling_std(close, 20)
+
+@register_kernel("bollinger_lower")
+def bollinger_lower_kernel(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_mean(close, 20) - 2 * ops.rolling_std(close, 20)
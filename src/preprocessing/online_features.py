@@ -0,0 +1,313 @@
+# src/preprocessing/online_features.py
+"""
+Online (incremental) counterparts of the registered features, for streaming.
+
+An online feature sees one new bar per ticker at a time and returns the
+ticker's feature value at that bar, from a constant amount of state per
+ticker: lag rings, running window sums, add/remove (Welford) variance and
+EWM recursions. Calls are vectorized across tickers: `bars` holds one value
+per ticker id being updated, so a timestamp of thousands of tickers is a
+handful of array operations.
+
+    @register_online("sma20")
+    def sma20_online(bars, ops):
+        return ops.rolling_mean("Close", bars["Close"], 20)
+
+The first argument of every `ops` primitive names its input series; state is
+kept per (primitive, name, window), so features asking for the same one
+(e.g. both Bollinger bands) share it and it is updated once per bar.
+Running sums are rebuilt from the window every `window` bars, which keeps
+rounding drift bounded on endless streams.
+
+Online features match the pandas features to floating-point rounding (EWMs
+once warmed up as in FEATURE_LOOKBACK), assuming finite inputs, as the
+array kernels in preprocessing/kernels.py do.
+"""
+
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+ONLINE_REGISTRY: Dict[str, Callable] = {}
+
+
+def register_online(name):
+    """
+    Decorator to register the online counterpart of a registered feature.
+    Signature: fn(bars: Dict[str, np.ndarray], ops: OnlineOps) -> np.ndarray
+    """
+    def decorator(func):
+        if name in ONLINE_REGISTRY:
+            raise ValueError(f"Online feature '{name}' is already registered.")
+        ONLINE_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def grow_rows(array: np.ndarray, n_rows: int, fill) -> np.ndarray:
+    """`array` with at least n_rows rows (capacity doubles), new rows set to `fill`."""
+    if n_rows <= len(array):
+        return array
+    grown = np.full((max(n_rows, 2 * len(array)),) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+# ——— Per-ticker state ———
+
+class _Window:
+    """The last `n` values of every ticker, plus how many it has seen."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.ring = np.full((0, n), np.nan)
+        self.count = np.zeros(0, dtype=np.int64)
+
+    def _grow(self, ids: np.ndarray) -> None:
+        if len(ids) and ids.max() >= len(self.count):
+            self.ring = grow_rows(self.ring, int(ids.max()) + 1, np.nan)
+            self.count = grow_rows(self.count, int(ids.max()) + 1, 0)
+
+    def push(self, ids: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Store x; return the value it displaces (NaN while the window fills)."""
+        self._grow(ids)
+        slot = self.count[ids] % self.n
+        old = self.ring[ids, slot]
+        self.ring[ids, slot] = x
+        self.count[ids] += 1
+        return old
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in vars(self).values() if isinstance(a, np.ndarray))
+
+
+class _Lag(_Window):
+    def update(self, ids, x):
+        return self.push(ids, x)
+
+
+class _RollingMean(_Window):
+    """Running sum and NaN count of each ticker's window."""
+
+    def __init__(self, n: int):
+        super().__init__(n)
+        self.total = np.zeros(0)
+        self.nans = np.zeros(0, dtype=np.int64)
+
+    def _grow(self, ids):
+        super()._grow(ids)
+        self.total = grow_rows(self.total, len(self.count), 0.0)
+        self.nans = grow_rows(self.nans, len(self.count), 0)
+
+    def update(self, ids, x):
+        self._grow(ids)
+        full = self.count[ids] >= self.n
+        old = self.push(ids, x)
+        removed = full & ~np.isnan(old)
+        self.total[ids] += np.where(np.isnan(x), 0.0, x) - np.where(removed, old, 0.0)
+        self.nans[ids] += np.isnan(x).astype(np.int64) - (full & np.isnan(old))
+
+        # Rebuild the sums of windows that have just turned over
+        fresh = ids[self.count[ids] % self.n == 0]
+        if len(fresh):
+            self.total[fresh] = np.nansum(self.ring[fresh], axis=1)
+
+        ok = (self.count[ids] >= self.n) & (self.nans[ids] == 0)
+        return np.where(ok, self.total[ids] / self.n, np.nan)
+
+
+class _RollingStd(_Window):
+    """Welford mean / M2 of each ticker's window, updated by add and remove (ddof=1)."""
+
+    def __init__(self, n: int):
+        super().__init__(n)
+        self.nobs = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+
+    def _grow(self, ids):
+        super()._grow(ids)
+        self.nobs = grow_rows(self.nobs, len(self.count), 0)
+        self.mean = grow_rows(self.mean, len(self.count), 0.0)
+        self.m2 = grow_rows(self.m2, len(self.count), 0.0)
+
+    def update(self, ids, x):
+        self._grow(ids)
+        full = self.count[ids] >= self.n
+        old = self.push(ids, x)
+        nobs, mean, m2 = self.nobs[ids], self.mean[ids], self.m2[ids]
+
+        # Add x
+        add = ~np.isnan(x)
+        nobs = nobs + add
+        d = np.where(add, x - mean, 0.0)
+        mean = mean + np.divide(d, nobs, out=np.zeros_like(d), where=nobs > 0)
+        m2 = m2 + np.where(add, d * (x - mean), 0.0)
+
+        # Remove the value leaving the window
+        rem = full & ~np.isnan(old)
+        nobs = nobs - rem
+        d = np.where(rem, old - mean, 0.0)
+        mean = np.where(nobs > 0, mean - np.divide(d, nobs, out=np.zeros_like(d), where=nobs > 0), 0.0)
+        m2 = np.where(nobs > 0, m2 - np.where(rem, d * (old - mean), 0.0), 0.0)
+
+        # Rebuild the moments of complete windows that have just turned over
+        fresh = (self.count[ids] % self.n == 0) & (nobs == self.n)
+        if fresh.any():
+            ring = self.ring[ids[fresh]]
+            mean[fresh] = ring.mean(axis=1)
+            m2[fresh] = ((ring - mean[fresh, None]) ** 2).sum(axis=1)
+
+        self.nobs[ids], self.mean[ids], self.m2[ids] = nobs, mean, m2
+        ok = (self.count[ids] >= self.n) & (nobs == self.n)
+        return np.where(ok, np.sqrt(np.maximum(m2, 0.0) / (self.n - 1)), np.nan)
+
+
+class _Ewm:
+    """adjust=False EWM of each ticker, seeded with its first value."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = np.zeros(0)
+        self.started = np.zeros(0, dtype=bool)
+
+    def update(self, ids, x):
+        if len(ids) and ids.max() >= len(self.value):
+            self.value = grow_rows(self.value, int(ids.max()) + 1, 0.0)
+            self.started = grow_rows(self.started, int(ids.max()) + 1, False)
+        y = np.where(self.started[ids], (1.0 - self.alpha) * self.value[ids] + self.alpha * x, x)
+        self.value[ids] = y
+        self.started[ids] = True
+        return y
+
+    def nbytes(self) -> int:
+        return self.value.nbytes + self.started.nbytes
+
+
+class OnlineOps:
+    """
+    Keyed per-ticker state behind the online features' primitives. Each
+    primitive is updated at most once per step (set of new bars); later calls
+    in the same step return the memoized result.
+    """
+
+    def __init__(self):
+        self._state = {}
+        self._memo = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+
+    def begin(self, ids: np.ndarray) -> None:
+        """Start a step: one new bar for each of the ticker `ids`."""
+        self._ids = ids
+        self._memo = {}
+
+    def _call(self, kind, cls, name, x, n):
+        key = (kind, name, n)
+        if key not in self._memo:
+            if key not in self._state:
+                self._state[key] = cls(n)
+            self._memo[key] = self._state[key].update(self._ids, np.asarray(x, dtype=np.float64))
+        return self._memo[key]
+
+    def lag(self, name: str, x: np.ndarray, periods: int) -> np.ndarray:
+        """x as of `periods` bars ago (NaN before that)."""
+        return self._call("lag", _Lag, name, x, periods)
+
+    def rolling_mean(self, name: str, x: np.ndarray, window: int) -> np.ndarray:
+        return self._call("rolling_mean", _RollingMean, name, x, window)
+
+    def rolling_std(self, name: str, x: np.ndarray, window: int) -> np.ndarray:
+        return self._call("rolling_std", _RollingStd, name, x, window)
+
+    def ewm_mean(self, name: str, x: np.ndarray, span: int) -> np.ndarray:
+        return self._call("ewm_mean", _Ewm, name, x, span)
+
+    def nbytes(self) -> int:
+        """Bytes of state held, for all tickers."""
+        return sum(state.nbytes() for state in self._state.values())
+
+
+def missing_online(features: Sequence[str]) -> list:
+    """The features in `features` without an online counterpart."""
+    return [f for f in features if f not in ONLINE_REGISTRY]
+
+
+# ——— Online features ———
+
+@register_online("rsi")
+def rsi_online(bars, ops, window: int = 14):
+    close = bars["Close"]
+    delta = close - ops.lag("Close", close, 1)
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    avg_gain = ops.rolling_mean("gain", gain, window)
+    avg_loss = ops.rolling_mean("loss", loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+@register_online("macd")
+def macd_online(bars, ops):
+    close = bars["Close"]
+    return ops.ewm_mean("Close", close, 12) - ops.ewm_mean("Close", close, 26)
+
+@register_online("sma20")
+def sma20_online(bars, ops):
+    return ops.rolling_mean("Close", bars["Close"], 20)
+
+@register_online("return_1h")
+def return_1h_online(bars, ops):
+    close = bars["Close"]
+    return close / ops.lag("Close", close, 1) - 1
+
+@register_online("return_4h")
+def return_4h_online(bars, ops):
+    close = bars["Close"]
+    return close / ops.lag("Close", close, 4) - 1
+
+@register_online("log_return_1h")
+def log_return_1h_online(bars, ops):
+    close = bars["Close"]
+    ratio = close / ops.lag("Close", close, 1)
+    with np.errstate(invalid="ignore"):
+        return np.log(np.where(ratio > 0, ratio, np.nan))
+
+@register_online("volatility_5h")
+def volatility_5h_online(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_std("return_1h", close / ops.lag("Close", close, 1) - 1, 5)
+
+@register_online("momentum")
+def momentum_online(bars, ops):
+    close = bars["Close"]
+    return close - ops.lag("Close", close, 5)
+
+@register_online("bollinger_upper")
+def bollinger_upper_online(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_mean("Close", close, 20) + 2 * ops.rolling_std("Close", close, 20)
+
+@register_online("bollinger_lower")
+def bollinger_lower_online(bars, ops):
+    close = bars["Close"]
+    return ops.rolling_mean("Close", close, 20) - 2 * ops.rolling_std("Close", close, 20)
+
+@register_online("Close")
+def close_online(bars, ops):
+    return bars["Close"]
+
+@register_online("Open")
+def open_online(bars, ops):
+    return bars["Open"]
+
+@register_online("High")
+def high_online(bars, ops):
+    return bars["High"]
+
+@register_online("Low")
+def low_online(bars, ops):
+    return bars["Low"]
+
+@register_online("Volume")
+def volume_online(bars, ops):
+    return bars["Volume"]
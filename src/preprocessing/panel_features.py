@@ -0,0 +1,126 @@
+# src/preprocessing/panel_features.py
+
+from typing import Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.features import (
+    FEATURE_REGISTRY, FEATURE_INPUTS,
+    INTERMEDIATE_REGISTRY, INTERMEDIATE_INPUTS, feature_plan
+)
+
+RAW_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def stack_raw(raw_by_ticker: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Stack per-ticker raw OHLCV frames into one long frame with a 'ticker' column.
+    Tickers whose frame is None or empty are skipped; with none left, the
+    result is an empty frame with the raw fields and 'ticker'.
+    """
+    frames = []
+    for ticker, raw_df in raw_by_ticker.items():
+        if raw_df is None or raw_df.empty:
+            continue
+        frames.append(raw_df.assign(ticker=ticker))
+    if not frames:
+        return pd.DataFrame(columns=[*RAW_FIELDS, "ticker"], index=pd.DatetimeIndex([]))
+    return pd.concat(frames)
+
+
+class BarPanel:
+    """
+    A long-format multi-ticker frame laid out as (bar × ticker) arrays.
+
+    Each ticker's bars are left-aligned in its own column: row i holds the
+    ticker's i-th bar, and shorter histories are padded with NaN at the end.
+    Any causal per-series operation (rolling, ewm, shift, diff) applied down
+    the columns therefore gives exactly what it gives on each ticker's own
+    Series, so a registered feature runs once for the whole universe.
+    """
+
+    def __init__(self, long_df: pd.DataFrame, fields: Tuple[str, ...] = RAW_FIELDS):
+        index = pd.to_datetime(long_df.index)
+        codes, tickers = pd.factorize(long_df["ticker"], sort=True)
+
+        # (ticker, timestamp) order; each ticker's rows become one contiguous run
+        order = np.lexsort((index.asi8, codes))
+        codes = codes[order]
+        counts = np.bincount(codes, minlength=len(tickers))
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.index = index[order]
+        self.codes = codes
+        self.pos = np.arange(len(codes)) - starts[codes]
+        self.starts = starts
+        self.counts = counts
+        self.shape = (int(counts.max()) if len(counts) else 0, len(tickers))
+        self.dtypes = {f: long_df[f].dtype for f in fields}
+        self.fields = {
+            f: self.to_wide(long_df[f].to_numpy(dtype=np.float64)[order])
+            for f in fields
+        }
+
+    def to_wide(self, values: np.ndarray) -> pd.DataFrame:
+        """Lay long-order values out as a (bar × ticker) DataFrame."""
+        wide = np.full(self.shape, np.nan)
+        wide[self.pos, self.codes] = values
+        return pd.DataFrame(wide, columns=self.tickers)
+
+    def to_long(self, wide: pd.DataFrame) -> np.ndarray:
+        """Inverse of to_wide: the values in (ticker, timestamp) long order."""
+        return np.asarray(wide)[self.pos, self.codes]
+
+
+def compute_panel_features(
+    long_df: pd.DataFrame,
+    feature_columns: list[str],
+    debug: bool = False
+) -> pd.DataFrame:
+    """
+    Compute registered features for every ticker of a long-format frame at once.
+
+    Args:
+        long_df: Raw OHLCV bars for many tickers, indexed by datetime, with a 'ticker' column
+        feature_columns: List of feature names to compute (must be in FEATURE_REGISTRY)
+        debug: If True, print detailed logs
+
+    Returns:
+        Long DataFrame sorted by (ticker, timestamp) with one column per
+        feature plus 'ticker'; per ticker it equals compute_features' output.
+    """
+    panel = BarPanel(long_df)
+
+    # 1) Evaluate each needed intermediate exactly once, for all tickers
+    intermediates = {}
+    for name in feature_plan(feature_columns):
+        if debug:
+            print(f"[panel] Computing intermediate: {name}")
+        func = INTERMEDIATE_REGISTRY[name]
+        intermediates[name] = func(panel.fields, **{i: intermediates[i] for i in INTERMEDIATE_INPUTS[name]})
+
+    # 2) Compute each feature as a (bar × ticker) frame and flatten it back to long
+    columns = {}
+    for feature in feature_columns:
+        if debug:
+            print(f"[panel] Computing feature: {feature}")
+        func = FEATURE_REGISTRY[feature]
+        result = func(panel.fields, **{i: intermediates[i] for i in FEATURE_INPUTS[feature]})
+
+        if not isinstance(result, pd.DataFrame) or result.shape != panel.shape:
+            raise ValueError(
+                f"Feature '{feature}' does not support panel computation "
+                f"(expected a {panel.shape} frame)."
+            )
+        values = panel.to_long(result)
+        # Raw passthrough features keep their source dtype (e.g. integer Volume)
+        if feature in panel.dtypes:
+            values = values.astype(panel.dtypes[feature])
+        columns[feature] = values
+
+    out = pd.DataFrame(columns, index=panel.index)
+    out.index.name = long_df.index.name
+    out["ticker"] = panel.tickers[panel.codes]
+    return out
@@ -1,88 +1,196 @@
 # src/preprocessing/process_features.py
 
 from pathlib import Path
+from typing import Optional
+import numpy as np
 import pandas as pd
-from preprocessing.features import FEATURE_REGISTRY
+from preprocessing.feature_store import ticker_path, write_ticker_features
+from preprocessing.kernels import KERNEL_REGISTRY, get_ops
+from preprocessing.raw_cache import slice_bars
+from preprocessing.features import (
+    FEATURE_REGISTRY, FEATURE_LOOKBACK, FEATURE_INPUTS,
+    INTERMEDIATE_REGISTRY, INTERMEDIATE_INPUTS, feature_plan
+)
+
+# Raw columns handed to the array kernels
+KERNEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+def compute_features(
+    window_df: pd.DataFrame,
+    feature_columns: list[str],
+    label: str = "",
+    debug: bool = False,
+    backend: str = "pandas"
+) -> pd.DataFrame:
+    """
+    Compute and validate the registered features for one ticker's raw bars.
+
+    Args:
+        window_df: Raw OHLCV DataFrame (indexed by datetime)
+        feature_columns: List of feature names to compute (must be in FEATURE_REGISTRY)
+        label: Log prefix, e.g. "[train][AAPL]"
+        debug: If True, print detailed logs
+        backend: "pandas" (default), or "numpy"/"numba" to use the array kernels
+            in preprocessing/kernels.py for features that have one
+
+    Shared intermediates declared by the features (see register_intermediate)
+    are evaluated once each, in dependency order, before the features.
+
+    Returns:
+        DataFrame of computed features aligned with window_df's index.
+    """
+    # 0) Array kernels, when requested and the inputs are finite
+    kernel_results = {}
+    if backend != "pandas":
+        ops = get_ops(backend)
+        bars = {
+            col: np.ascontiguousarray(window_df[col].to_numpy(dtype=np.float64))
+            for col in window_df.columns if col in KERNEL_FIELDS
+        }
+        if all(np.isfinite(values).all() for values in bars.values()):
+            for feature in feature_columns:
+                if feature in KERNEL_REGISTRY:
+                    if debug:
+                        print(f"{label} Computing feature: {feature} ({backend} kernel)")
+                    kernel_results[feature] = pd.Series(
+                        KERNEL_REGISTRY[feature](bars, ops), index=window_df.index, name=feature
+                    )
+        elif debug:
+            print(f"{label} Non-finite bars, using the pandas features")
+    pandas_features = [f for f in feature_columns if f not in kernel_results]
+
+    # 1) Evaluate each needed intermediate exactly once
+    intermediates = {}
+    for name in feature_plan(pandas_features):
+        if debug:
+            print(f"{label} Computing intermediate: {name}")
+        func = INTERMEDIATE_REGISTRY[name]
+        intermediates[name] = func(window_df, **{i: intermediates[i] for i in INTERMEDIATE_INPUTS[name]})
+
+    # 2) Compute each feature from the raw bars and its declared inputs
+    computed = []
+    for feature in feature_columns:
+        if feature in kernel_results:
+            computed.append(kernel_results[feature].to_frame())
+            continue
+        if debug:
+            print(f"{label} Computing feature: {feature}")
+
+        func = FEATURE_REGISTRY[feature]
+        result = func(window_df, **{i: intermediates[i] for i in FEATURE_INPUTS[feature]})
+
+        # Validate return type
+        if isinstance(result, pd.Series):
+            result = result.to_frame(feature)
+        elif not isinstance(result, pd.DataFrame):
+            raise TypeError(f"Feature function '{feature}' must return a pd.Series or pd.DataFrame.")
+
+        # Validate row count
+        if result.shape[0] != window_df.shape[0]:
+            raise ValueError(
+                f"Feature '{feature}' returned {result.shape[0]} rows, expected {window_df.shape[0]}"
+            )
+
+        # Validate index alignment
+        if not result.index.equals(window_df.index):
+            raise ValueError(f"Feature '{feature}' index does not align with raw data index.")
+
+        computed.append(result)
+
+    return pd.concat(computed, axis=1)
 
 def process_features(
     ticker: str,
     raw_df: pd.DataFrame,
     feature_columns: list[str],
-    start_time: str,
-    end_time: str,
-    split_name: str,
+    start_time: Optional[str],
+    end_time: Optional[str],
+    split_name: Optional[str],
     feature_dir: Path,
     save: bool = True,
-    debug: bool = False
+    debug: bool = False,
+    incremental: bool = False,
+    backend: str = "pandas"
 ) -> pd.DataFrame | None:
     """
     Compute and optionally save selected features for a given ticker over a specific time window.
 
     Args:
         ticker: Stock symbol
-        raw_df: Full raw OHLCV DataFrame (indexed by datetime)
+        raw_df: Full raw OHLCV DataFrame (indexed by datetime), e.g. from fetch_many
+            or RawBarCache.read
         feature_columns: List of feature names to compute (must be in FEATURE_REGISTRY)
-        start_time: Inclusive start of window (ISO string or any parsable date)
-        end_time:   Exclusive end of window
-        split_name: Name of the data split (e.g. 'train', 'validate', 'test')
+        start_time: Inclusive start of window (ISO string or any parsable date), or None
+        end_time:   Exclusive end of window, or None
+        split_name: Name of the data split (e.g. 'train', 'validate', 'test'), or
+            None to write the ticker's partition of the feature store in feature_dir
         feature_dir: Base directory where features are saved
         save: Whether to write out a parquet file
         debug: If True, print detailed logs
+        incremental: If True and a feature file already exists with the same
+            columns, only compute bars newer than its last timestamp (plus the
+            features' lookback history) and append them
+        backend: Feature implementation, "pandas", "numpy" or "numba" (see compute_features)
 
     Returns:
         DataFrame of computed features (index = timestamps in [start_time, end_time)),
         or None if processing failed or no data in window.
     """
     try:
-        # 1) Slice the raw data for this split
-        df = raw_df.copy()
-        df.index = pd.to_datetime(df.index)
-        start = pd.to_datetime(start_time)
-        end   = pd.to_datetime(end_time)
-        window_df = df[(df.index >= start) & (df.index < end)]
-        
+        # 1) Slice the raw data for this split: a binary search on the sorted
+        # index and a view of the rows, not a copy and a mask over all of them
+        if not isinstance(raw_df.index, pd.DatetimeIndex):
+            raw_df = raw_df.set_axis(pd.to_datetime(raw_df.index))
+        window_df = slice_bars(raw_df, start_time, end_time)
+
+        store = split_name is None
+        if store:
+            split_name = "store"
+            path = ticker_path(feature_dir, ticker)
+        else:
+            path = feature_dir / split_name / f"{ticker}.parquet"
+
         if window_df.empty:
             if debug:
                 print(f"[WARNING][{split_name}] No data for {ticker} in window {start_time} → {end_time}")
             return None
 
-        # 2) Compute each feature with validation
-        computed = []
-        for feature in feature_columns:
-            if debug:
-                print(f"[{split_name}][{ticker}] Computing feature: {feature}")
-
-            if feature not in FEATURE_REGISTRY:
-                raise ValueError(f"Feature '{feature}' not registered.")
-
-            func = FEATURE_REGISTRY[feature]
-            result = func(window_df)
-
-            # Validate return type
-            if not isinstance(result, pd.DataFrame):
-                raise TypeError(f"Feature function '{feature}' must return a pd.DataFrame.")
+        existing = None
+        if incremental and path.exists():
+            existing = pd.read_parquet(path)
+            if existing.columns.tolist() != list(feature_columns) or existing.empty:
+                if debug:
+                    print(f"[{split_name}][{ticker}] Existing features differ, recomputing in full")
+                existing = None
 
-            # Validate row count
-            if result.shape[0] != window_df.shape[0]:
-                raise ValueError(
-                    f"Feature '{feature}' returned {result.shape[0]} rows, expected {window_df.shape[0]}"
-                )
-
-            # Validate index alignment
-            if not result.index.equals(window_df.index):
-                raise ValueError(f"Feature '{feature}' index does not align with raw data index.")
+        # 2) Compute each feature with validation
+        if existing is None:
+            features_df = compute_features(window_df, feature_columns, f"[{split_name}][{ticker}]", debug, backend)
+        else:
+            n_new = len(window_df) - int(window_df.index.searchsorted(existing.index.max(), side="right"))
+            if n_new == 0:
+                if debug:
+                    print(f"[{split_name}][{ticker}] Features already up to date")
+                return existing
 
-            computed.append(result)
+            # Recompute only the new tail, plus enough history to warm up every window
+            lookback = max(FEATURE_LOOKBACK.get(f, 0) for f in feature_columns)
+            tail_df = window_df.iloc[max(0, len(window_df) - n_new - lookback):]
+            tail = compute_features(tail_df, feature_columns, f"[{split_name}][{ticker}]", debug, backend)
 
-        # 3) Concatenate all features into one DataFrame
-        features_df = pd.concat(computed, axis=1)
+            # 3) Append the new rows to the existing features
+            features_df = pd.concat([existing, tail.iloc[-n_new:]])
+            if debug:
+                print(f"[{split_name}][{ticker}] Appended {n_new} new rows "
+                      f"(recomputed {len(tail_df)} bars)")
 
-        # 4) Save to split-specific folder if requested
+        # 4) Save to split-specific folder (or store partition) if requested
         if save:
-            out_dir = feature_dir / split_name
-            out_dir.mkdir(parents=True, exist_ok=True)
-            path = out_dir / f"{ticker}.parquet"
-            features_df.to_parquet(path)
+            if store:
+                write_ticker_features(feature_dir, ticker, features_df)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                features_df.to_parquet(path)
             if debug:
                 print(f"[{split_name}][{ticker}] Saved features to {path}")
 
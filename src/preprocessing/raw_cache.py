@@ -0,0 +1,238 @@
+# src/preprocessing/raw_cache.py
+"""
+Memory-mapped columnar cache of raw OHLCV bars.
+
+Each ticker's bars live in a version directory {cache_dir}/{interval}/{ticker}/v-<id>/
+as one .npy file per column (the timestamps as int64 ticks of the source
+index's unit, every bar field in its own dtype); {ticker}/columns.json names
+the current version and its columns. Bars are sorted by time, so a time range
+is two binary searches on the timestamps, and frames are built over views of
+the mapped files: reading a window copies nothing and only touches its pages.
+
+A rewrite writes a new version and then atomically replaces columns.json, so
+readers always see a complete version and processes that still have the old
+files mapped keep a consistent view. Legacy {ticker}.parquet entries are read
+as they are; RawBarCache.migrate (scripts/migrate_raw_cache.py) converts them.
+"""
+
+import json
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import RAW_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+TIMESTAMP_FILE = "timestamp.npy"
+COLUMNS_FILE = "columns.json"
+LOCK_FILE = ".lock"
+
+
+def _ticks(ts, unit: str) -> int:
+    return int(pd.Timestamp(ts).as_unit(unit).asm8.view("i8"))
+
+
+def time_bounds(timestamps: np.ndarray, start=None, end=None, unit: str = "ns") -> slice:
+    """Positions of [start, end) in sorted int64 timestamps (in `unit` ticks), by binary search."""
+    lo = int(np.searchsorted(timestamps, _ticks(start, unit), side="left")) if start is not None else 0
+    hi = int(np.searchsorted(timestamps, _ticks(end, unit), side="left")) if end is not None else len(timestamps)
+    return slice(lo, max(lo, hi))
+
+
+def slice_bars(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """
+    Rows of a bar frame in [start, end), as a view. The index must be
+    time-sorted (as fetch_many and RawBarCache return it); otherwise the frame
+    is sorted first.
+    """
+    index = pd.DatetimeIndex(df.index)
+    if not index.is_monotonic_increasing:
+        df = df.sort_index()
+        index = pd.DatetimeIndex(df.index)
+    if start is None and end is None:
+        return df
+    return df.iloc[time_bounds(index.asi8, start, end, index.unit)]
+
+
+class RawBars:
+    """One ticker's cached bars: mapped timestamp and column arrays."""
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray],
+                 unit: str = "ns", index_name: Optional[str] = None):
+        self.timestamps = timestamps
+        self.columns = columns
+        self.unit = unit
+        self.index_name = index_name
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def span(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last bar time, or None when empty."""
+        if not len(self.timestamps):
+            return None
+        return (pd.Timestamp(int(self.timestamps[0]), unit=self.unit),
+                pd.Timestamp(int(self.timestamps[-1]), unit=self.unit))
+
+    def count(self, start=None, end=None) -> int:
+        """Number of bars in [start, end), without reading them."""
+        rows = time_bounds(self.timestamps, start, end, self.unit)
+        return rows.stop - rows.start
+
+    def frame(self, start=None, end=None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Bars in [start, end) as a DataFrame over views of the mapped arrays."""
+        rows = time_bounds(self.timestamps, start, end, self.unit)
+        times = self.timestamps[rows].view(f"datetime64[{self.unit}]")
+        index = pd.DatetimeIndex(times, name=self.index_name, copy=False)
+        names = list(columns) if columns is not None else list(self.columns)
+        return pd.DataFrame({name: self.columns[name][rows] for name in names}, index=index, copy=False)
+
+
+class RawBarCache:
+    """The raw bar cache of one interval, {cache_dir}/{interval}/<ticker>/."""
+
+    def __init__(self, cache_dir: Path = RAW_DIR, interval: str = "1h"):
+        self.root = Path(cache_dir) / interval
+        self._mapped: Dict[str, Tuple[Tuple[int, int], RawBars]] = {}  # ticker -> (file identity, bars)
+
+    def ticker_dir(self, ticker: str) -> Path:
+        return self.root / ticker
+
+    def legacy_path(self, ticker: str) -> Path:
+        return self.root / f"{ticker}.parquet"
+
+    def __contains__(self, ticker: str) -> bool:
+        return (self.ticker_dir(ticker) / COLUMNS_FILE).exists() or self.legacy_path(ticker).exists()
+
+    def tickers(self) -> List[str]:
+        """Tickers with cached bars, in either format."""
+        if not self.root.exists():
+            return []
+        names = {p.parent.name for p in self.root.glob(f"*/{COLUMNS_FILE}")}
+        names.update(p.stem for p in self.root.glob("*.parquet"))
+        return sorted(names)
+
+    def open(self, ticker: str) -> Optional[RawBars]:
+        """
+        Map a ticker's bars read-only, or None if it has no columnar entry.
+        Maps are reused until the ticker is rewritten.
+        """
+        pointer = self.ticker_dir(ticker) / COLUMNS_FILE
+        if not pointer.exists():
+            return None
+        # A shared lock keeps writers from removing the version being mapped;
+        # once mapped, its files stay readable after removal
+        with _locked(pointer.parent / LOCK_FILE, shared=True):
+            stat = os.stat(pointer)
+            identity = (stat.st_ino, stat.st_mtime_ns)
+            if ticker in self._mapped and self._mapped[ticker][0] == identity:
+                return self._mapped[ticker][1]
+            meta = json.loads(pointer.read_text())
+            version = pointer.parent / meta.get("version", "")  # unversioned entries hold their files directly
+            # Plain ndarray views of the maps, so pandas never sees np.memmap
+            bars = RawBars(
+                np.asarray(np.load(version / TIMESTAMP_FILE, mmap_mode="r")),
+                {name: np.asarray(np.load(version / f"{name}.npy", mmap_mode="r")) for name in meta["columns"]},
+                meta["unit"],
+                meta.get("index_name"),
+            )
+        self._mapped[ticker] = (identity, bars)
+        return bars
+
+    def read(self, ticker: str, start=None, end=None,
+             columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        A ticker's bars in [start, end) as a zero-copy frame, or None if not
+        cached. A legacy parquet entry is read into memory as it is (see migrate).
+        """
+        bars = self.open(ticker)
+        if bars is not None:
+            return bars.frame(start, end, columns)
+        legacy = self.legacy_path(ticker)
+        if not legacy.exists():
+            return None
+        try:
+            df = pd.read_parquet(legacy, columns=list(columns) if columns is not None else None)
+        except FileNotFoundError:  # migrated meanwhile
+            return self.read(ticker, start, end, columns)
+        return slice_bars(df, start, end)
+
+    def write(self, ticker: str, df: pd.DataFrame) -> Path:
+        """
+        Replace a ticker's cached bars with df (indexed by naive UTC timestamps;
+        rows are sorted by time and duplicate timestamps keep the last row).
+        Writers of the same ticker are serialized by a lock file; readers hold
+        it shared just while mapping.
+        """
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        times = index.asi8
+        order = np.argsort(times, kind="stable")
+        keep = np.r_[times[order][1:] != times[order][:-1], True]  # last of each timestamp
+        order = order[keep]
+
+        entry = self.ticker_dir(ticker)
+        entry.mkdir(parents=True, exist_ok=True)
+        with _locked(entry / LOCK_FILE):
+            name = f"v-{uuid.uuid4().hex}"
+            version = entry / name
+            version.mkdir()
+            np.save(version / TIMESTAMP_FILE, times[order])
+            for column in df.columns:
+                np.save(version / f"{column}.npy", np.ascontiguousarray(df[column].to_numpy()[order]))
+
+            # Publish by atomically replacing the pointer; the old version's
+            # files stay valid for whoever has them mapped
+            tmp = entry / f".{COLUMNS_FILE}.{name}"
+            tmp.write_text(json.dumps({
+                "version": name,
+                "columns": [str(c) for c in df.columns],
+                "unit": index.unit,
+                "index_name": index.name,
+                "rows": int(len(order)),
+            }))
+            os.replace(tmp, entry / COLUMNS_FILE)
+            for old in entry.glob("v-*"):
+                if old.name != name:
+                    shutil.rmtree(old, ignore_errors=True)
+            self.legacy_path(ticker).unlink(missing_ok=True)
+        return entry
+
+    def migrate(self) -> int:
+        """
+        Convert every legacy {ticker}.parquet entry to the columnar format (a
+        one-off step; readers never convert). Returns the number converted.
+        """
+        converted = 0
+        for legacy in sorted(self.root.glob("*.parquet")):
+            try:
+                df = pd.read_parquet(legacy)
+            except FileNotFoundError:  # converted by a concurrent migrate
+                continue
+            self.write(legacy.stem, df)
+            converted += 1
+        return converted
+
+
+@contextmanager
+def _locked(path: Path, shared: bool = False):
+    """Advisory lock on path, exclusive unless shared (a no-op where fcntl is unavailable)."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,548 @@
+# src/preprocessing/shared_panel.py
+"""
+Arrays and feature panels shared between processes without copies.
+
+SharedArrays are named NumPy arrays in multiprocessing.shared_memory blocks.
+The creating process passes `shared.handle` (a small picklable description)
+to its workers, e.g. as a pool initarg; they attach_arrays it and map the
+same memory. The creator unlinks the blocks when every process is done.
+
+A panel holds a long feature frame (as filter_feature_data returns it) as
+arrays:
+
+    present     (times × tickers) bool, True where the ticker has a row
+    timestamps  (times,) int64 nanoseconds, sorted
+    tickers     (tickers,) fixed-width unicode
+    one (times × tickers) array per feature: float features in the panel
+    dtype (NaN where absent), other numeric features in their own dtype
+    (0 where absent), so integer columns round-trip exactly
+
+Two backings:
+
+- a directory of .npy files plus panel.json (build_panel(df, path=...)).
+  Processes open it with np.load(mmap_mode="r"), so the pages live once in
+  the OS page cache however many processes read them; under /dev/shm it never
+  touches a disk. filter_feature_data and load_scored_data's scores_file read
+  such a directory like a feature store.
+- SharedArrays (build_panel(df) without a path), passed to workers as
+  `panel.handle` and opened with attach_panel.
+"""
+
+import json
+import os
+import shutil
+import sys
+import uuid
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.feature_store import split_bounds
+
+PANEL_META = "panel.json"
+PANEL_VERSION = 2
+PANEL_INDEX_ARRAYS = ("present", "timestamps", "tickers")
+
+# Every block mapped by this process. NumPy arrays over a block keep no buffer
+# export on its mapping, so a SharedMemory garbage-collected (and closed) under
+# a live view would leave it dangling; blocks stay here until closed explicitly.
+_OPEN_BLOCKS: List[shared_memory.SharedMemory] = []
+
+
+class ArraysHandle(NamedTuple):
+    """Picklable description of SharedArrays: array -> (block name, shape, dtype)."""
+    arrays: Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+class SharedArrays:
+    """
+    Named arrays in shared-memory blocks. Use as a context manager, or close()
+    them (and unlink() them, if this process created the blocks).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], blocks: Sequence[shared_memory.SharedMemory],
+                 owner: bool = False):
+        self.arrays = arrays
+        self.handle = ArraysHandle({
+            name: (block.name, array.shape, array.dtype.str)
+            for (name, array), block in zip(arrays.items(), blocks)
+        })
+        self._blocks = list(blocks)
+        self._owner = owner
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def close(self) -> None:
+        """
+        Release this process's mapping of the blocks. A block still viewed by
+        arrays taken from it stays mapped until the process exits.
+        """
+        self.arrays = {}
+        for block in self._blocks:
+            if sys.getrefcount(block.buf) > 2:  # the attribute and the call's argument
+                continue
+            block.close()
+            _OPEN_BLOCKS.remove(block)
+
+    def unlink(self) -> None:
+        """Free the blocks (creator only, once every process is done)."""
+        for block in self._blocks:
+            block.unlink()
+        self._blocks = []
+
+
+def allocate_arrays(shapes: Dict[str, Tuple[Tuple[int, ...], np.dtype]]) -> SharedArrays:
+    """Create uninitialized shared arrays of the given shapes and dtypes, owned by this process."""
+    arrays, blocks = {}, []
+    try:
+        for name, (shape, dtype) in shapes.items():
+            dtype = np.dtype(dtype)
+            block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+            blocks.append(block)
+            _OPEN_BLOCKS.append(block)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    except BaseException:
+        arrays.clear()
+        for block in blocks:
+            _OPEN_BLOCKS.remove(block)
+            block.close()
+            block.unlink()
+        raise
+    return SharedArrays(arrays, blocks, owner=True)
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> SharedArrays:
+    """Copy arrays into new shared-memory blocks owned by this process."""
+    arrays = {name: np.asarray(array) for name, array in arrays.items()}
+    shared = allocate_arrays({name: (array.shape, array.dtype) for name, array in arrays.items()})
+    for name, array in arrays.items():
+        shared[name][...] = array
+    return shared
+
+
+def attach_arrays(handle: ArraysHandle) -> SharedArrays:
+    """Map the blocks of another process's SharedArrays in place."""
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in handle.arrays.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        _OPEN_BLOCKS.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return SharedArrays(arrays, blocks)
+
+
+class PanelHandle(NamedTuple):
+    """Picklable description of a shared-memory panel."""
+    features: Tuple[str, ...]
+    time_unit: str
+    arrays: ArraysHandle
+
+
+def is_panel(path: Union[Path, str]) -> bool:
+    """Whether path is a panel directory written by build_panel."""
+    return (Path(path) / PANEL_META).is_file()
+
+
+def _column_name(j: int) -> str:
+    return f"feature_{j}"
+
+
+class SharedPanel:
+    """
+    A (times × tickers) panel of feature columns over shared arrays; see the
+    module docstring. Use as a context manager, or close() it (and unlink()
+    it, if this process created its shared-memory blocks).
+    """
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        features: Sequence[str],
+        time_unit: str = "ns",
+        shared: Optional[SharedArrays] = None,
+        owner: bool = False
+    ):
+        self.present = arrays["present"]
+        self.timestamps = arrays["timestamps"]
+        self.tickers = arrays["tickers"]
+        self.features = list(features)
+        self.columns = {f: arrays[_column_name(j)] for j, f in enumerate(self.features)}
+        self.time_unit = time_unit  # the source frame's timestamp resolution
+        self.handle = PanelHandle(tuple(self.features), time_unit, shared.handle) if shared is not None else None
+        self._shared = shared
+        self._owner = owner
+        self._ticker_pos = {str(t): n for n, t in enumerate(self.tickers)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in [self.present, self.timestamps, self.tickers, *self.columns.values()])
+
+    def column(self, feature: str) -> np.ndarray:
+        """A feature's (times × tickers) array, as a view; check `present` for which cells hold rows."""
+        return self.columns[feature]
+
+    def close(self) -> None:
+        """Release this process's view of the shared-memory blocks."""
+        self.present = self.timestamps = self.tickers = None
+        self.columns = {}
+        if self._shared is not None:
+            self._shared.close()
+
+    def unlink(self) -> None:
+        """Free the shared-memory blocks (creator only, once every process is done)."""
+        if self._shared is not None:
+            self._shared.unlink()
+
+    def ticker_positions(self, tickers: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Panel columns of the given tickers (all by default), skipping unknown ones with a warning."""
+        if tickers is None:
+            return np.arange(len(self.tickers))
+        for ticker in tickers:
+            if ticker not in self._ticker_pos:
+                print(f"[WARNING] Missing panel column for {ticker}, skipping.")
+        return np.array([self._ticker_pos[t] for t in tickers if t in self._ticker_pos], dtype=np.int64)
+
+    def time_slice(
+        self,
+        start_time: Optional[pd.Timestamp] = None,
+        end_time: Optional[pd.Timestamp] = None,
+        split: Optional[str] = None
+    ) -> slice:
+        """Rows between start_time and end_time (inclusive), within the split's [start, end)."""
+        lo, hi = 0, len(self.timestamps)
+        if start_time is not None:
+            lo = max(lo, int(np.searchsorted(self.timestamps, _ns(start_time), side="left")))
+        if end_time is not None:
+            hi = min(hi, int(np.searchsorted(self.timestamps, _ns(end_time), side="right")))
+        if split:
+            split_start, split_end = split_bounds(split)
+            lo = max(lo, int(np.searchsorted(self.timestamps, _ns(split_start), side="left")))
+            hi = min(hi, int(np.searchsorted(self.timestamps, _ns(split_end), side="left")))
+        return slice(lo, max(lo, hi))
+
+    def frame(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        features: Optional[Sequence[str]] = None,
+        start_time: Optional[pd.Timestamp] = None,
+        end_time: Optional[pd.Timestamp] = None,
+        split: Optional[str] = None,
+        float_dtype: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        The selected rows as a long frame, laid out as filter_feature_data
+        returns it: time-sorted DatetimeIndex, feature columns in panel
+        order and a categorical 'ticker' column. Every column keeps its
+        panel dtype, except float columns when float_dtype is given. Only the
+        selected cells are copied; to read without copying, slice column()
+        and present directly.
+        """
+        columns = self.ticker_positions(tickers)
+        if not len(columns):
+            return pd.DataFrame()
+        selected = [f for f in self.features if not features or f in features]
+
+        rows = self.time_slice(start_time, end_time, split)
+        t_idx, codes = np.nonzero(self.present[rows][:, columns])
+        t_idx += rows.start
+        n_idx = columns[codes]
+
+        data = {}
+        for feature in selected:
+            col = self.columns[feature][t_idx, n_idx]
+            if float_dtype and col.dtype.kind == "f":
+                col = col.astype(float_dtype, copy=False)
+            data[feature] = col
+        index = pd.DatetimeIndex(self.timestamps[t_idx].view("datetime64[ns]"), name="timestamp")
+        index = index.as_unit(self.time_unit)
+        result = pd.DataFrame(data, index=index, copy=False)
+        categories = [str(t) for t in self.tickers[columns]]
+        result["ticker"] = pd.Categorical.from_codes(codes, categories=categories).remove_unused_categories()
+        return result
+
+
+def _ns(ts) -> int:
+    return pd.Timestamp(ts).as_unit("ns").value
+
+
+def _panel_layout(df: pd.DataFrame, features: Optional[Sequence[str]]):
+    """Time unit, timestamps, tickers and feature columns of a long frame, and each row's (time, ticker) position."""
+    times = pd.DatetimeIndex(df["timestamp"] if "timestamp" in df.columns else df.index)
+    if features is None:
+        features = [c for c in df.columns if c not in ("ticker", "timestamp") and pd.api.types.is_numeric_dtype(df[c])]
+    else:
+        others = [f for f in features if not pd.api.types.is_numeric_dtype(df[f])]
+        if others:
+            raise ValueError(f"Panel features must be numeric, got {others}")
+    tickers = df["ticker"]
+    if isinstance(tickers.dtype, pd.CategoricalDtype):
+        names = [str(t) for t in tickers.cat.categories]
+        codes = tickers.cat.codes.to_numpy()
+    else:
+        uniques, codes = np.unique(tickers.to_numpy(dtype=str), return_inverse=True)
+        names = list(uniques)
+    timestamps = np.unique(times.as_unit("ns").asi8)
+    positions = np.searchsorted(timestamps, times.as_unit("ns").asi8)
+    return times.unit, timestamps, np.array(names), list(features), positions, codes
+
+
+def _column_dtype(source: np.dtype, dtype: np.dtype) -> np.dtype:
+    """Storage dtype of a feature: the panel dtype for floats, the source dtype otherwise."""
+    return dtype if source.kind == "f" else source
+
+
+def build_panel(
+    df: pd.DataFrame,
+    features: Optional[Sequence[str]] = None,
+    path: Optional[Path] = None,
+    dtype: str = "float32"
+) -> SharedPanel:
+    """
+    Materialize a long feature frame (filter_feature_data's, or load_scored_data's
+    with a 'timestamp' column) as a shared panel.
+
+    Args:
+        df: Frame with a 'ticker' column and a DatetimeIndex or 'timestamp' column
+        features: Numeric columns to keep (default: every numeric column)
+        path: Directory to write a file-backed panel to (replaced if it exists);
+            None allocates shared-memory blocks owned by this process
+        dtype: Dtype of the float features; other features keep their own
+
+    Returns:
+        The panel, open in this process.
+    """
+    time_unit, timestamps, tickers, features, t_pos, n_pos = _panel_layout(df, features)
+    grid = (len(timestamps), len(tickers))
+    shapes = {
+        "present": (grid, np.dtype(bool)),
+        "timestamps": (timestamps.shape, timestamps.dtype),
+        "tickers": (tickers.shape, tickers.dtype),
+    }
+    for j, feature in enumerate(features):
+        shapes[_column_name(j)] = (grid, _column_dtype(np.dtype(df[feature].dtype), np.dtype(dtype)))
+
+    # 1) Allocate the arrays in their final, shared location
+    shared, tmp = None, None
+    if path is None:
+        shared = allocate_arrays(shapes)
+        arrays = shared.arrays
+    else:
+        path = Path(path)
+        tmp = path.parent / f".tmp-{path.name}-{uuid.uuid4().hex[:8]}"
+        tmp.mkdir(parents=True)
+        arrays = {
+            name: np.lib.format.open_memmap(tmp / f"{name}.npy", mode="w+", dtype=dt, shape=shape)
+            for name, (shape, dt) in shapes.items()
+        }
+
+    # 2) Scatter the rows into the panel, one feature at a time
+    arrays["timestamps"][:] = timestamps
+    arrays["tickers"][:] = tickers
+    arrays["present"][:] = False
+    arrays["present"][t_pos, n_pos] = True
+    for j, feature in enumerate(features):
+        column = arrays[_column_name(j)]
+        column[:] = np.nan if column.dtype.kind == "f" else 0
+        column[t_pos, n_pos] = df[feature].to_numpy(dtype=column.dtype)
+
+    if path is None:
+        return SharedPanel(arrays, features, time_unit, shared=shared, owner=True)
+
+    # 3) Publish the directory atomically
+    for array in arrays.values():
+        array.flush()
+    del arrays
+    (tmp / PANEL_META).write_text(json.dumps({
+        "version": PANEL_VERSION,
+        "features": features,
+        "dtypes": [shapes[_column_name(j)][1].str for j in range(len(features))],
+        "time_unit": time_unit,
+        "dtype": np.dtype(dtype).name,
+        "shape": list(grid),
+    }))
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return attach_panel(path)
+
+
+def attach_panel(handle: Union[PanelHandle, Path, str]) -> SharedPanel:
+    """
+    Open a panel without copying it: a panel directory is memory-mapped
+    read-only, a PanelHandle's shared-memory blocks are mapped in place.
+    """
+    if isinstance(handle, PanelHandle):
+        shared = attach_arrays(handle.arrays)
+        return SharedPanel(shared.arrays, handle.features, handle.time_unit, shared=shared)
+
+    path = Path(handle)
+    if not is_panel(path):
+        raise ValueError(f"No panel at {path}")
+    meta = json.loads((path / PANEL_META).read_text())
+    if meta.get("version") != PANEL_VERSION:
+        raise ValueError(f"Panel at {path} has version {meta.get('version')}, expected {PANEL_VERSION}; rebuild it")
+    names: List[str] = list(PANEL_INDEX_ARRAYS) + [_column_name(j) for j in range(len(meta["features"]))]
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in names}
+    return SharedPanel(arrays, meta["features"], meta["time_unit"])
+
+
+# ——— Frames over shared arrays ———
+
+class FramesHandle(NamedTuple):
+    """Picklable description of SharedFrames: each object's layout, and the arrays behind them."""
+    layouts: Dict[str, Dict[str, Any]]
+    arrays: ArraysHandle
+
+
+class SharedFrames:
+    """
+    DataFrames, Series and arrays (or tuples of them, such as a split's
+    (X, y)) whose columns and index levels live in SharedArrays. data()
+    rebuilds them over views of the shared memory; only categorical and
+    object columns, stored as codes, and MultiIndexes are rebuilt in
+    process memory. The parallel runners share their data with pool
+    workers this way: the parent calls share_frames and passes `handle` as
+    the pool initarg, each worker calls attach_frames(handle).data().
+    """
+
+    def __init__(self, shared: SharedArrays, layouts: Dict[str, Dict[str, Any]]):
+        self.shared = shared
+        self.layouts = layouts
+        self.handle = FramesHandle(layouts, shared.handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shared.__exit__(*exc)
+
+    @property
+    def nbytes(self) -> int:
+        return self.shared.nbytes
+
+    def data(self) -> Dict[str, Any]:
+        """Every shared object, keyed as it was given to share_frames."""
+        return {name: _decode_object(layout, self.shared.arrays) for name, layout in self.layouts.items()}
+
+    def close(self) -> None:
+        self.shared.close()
+
+    def unlink(self) -> None:
+        self.shared.unlink()
+
+
+def share_frames(objects: Dict[str, Any]) -> SharedFrames:
+    """
+    Copy DataFrames, Series, arrays and tuples of them into shared memory
+    owned by this process (one copy, however many workers attach it).
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    layouts = {name: _encode_object(obj, name, arrays) for name, obj in objects.items()}
+    return SharedFrames(share_arrays(arrays), layouts)
+
+
+def attach_frames(handle: FramesHandle) -> SharedFrames:
+    """Map another process's SharedFrames in place."""
+    return SharedFrames(attach_arrays(handle.arrays), handle.layouts)
+
+
+def _encode_values(values, key: str, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Store one column or index level: NumPy dtypes as they are, anything else as codes."""
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        arrays[key] = np.asarray(values)
+        return {"key": key}
+    if isinstance(dtype, pd.CategoricalDtype):
+        arrays[key] = np.asarray(pd.Categorical(values).codes)
+        return {"key": key, "dtype": dtype}
+    codes, uniques = pd.factorize(values)
+    arrays[key] = codes
+    return {"key": key, "dtype": dtype, "uniques": uniques}
+
+
+def _decode_values(layout: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+    values = arrays[layout["key"]]
+    if "dtype" not in layout:
+        return values
+    if "uniques" not in layout:
+        return pd.Categorical.from_codes(values, dtype=layout["dtype"])
+    return pd.Categorical.from_codes(values, categories=layout["uniques"]).astype(layout["dtype"])
+
+
+def _encode_index(index: pd.Index, key: str, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    if isinstance(index, pd.RangeIndex):
+        return {"range": (index.start, index.stop, index.step), "names": [index.name]}
+    levels = [_encode_values(index.get_level_values(i), f"{key}/index/{i}", arrays) for i in range(index.nlevels)]
+    return {"levels": levels, "names": list(index.names)}
+
+
+def _decode_index(layout: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> pd.Index:
+    names = layout["names"]
+    if "range" in layout:
+        return pd.RangeIndex(*layout["range"], name=names[0])
+    levels = [_decode_values(level, arrays) for level in layout["levels"]]
+    if len(levels) == 1:
+        return pd.Index(levels[0], name=names[0], copy=False)
+    return pd.MultiIndex.from_arrays(levels, names=names)
+
+
+def _encode_object(obj, key: str, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    if isinstance(obj, tuple):
+        return {"type": "tuple", "items": [_encode_object(o, f"{key}/{i}", arrays) for i, o in enumerate(obj)]}
+    if isinstance(obj, pd.DataFrame):
+        return {
+            "type": "frame",
+            "columns": list(obj.columns),
+            "values": [_encode_values(obj.iloc[:, j], f"{key}/{j}", arrays) for j in range(obj.shape[1])],
+            "index": _encode_index(obj.index, key, arrays),
+        }
+    if isinstance(obj, pd.Series):
+        return {
+            "type": "series",
+            "name": obj.name,
+            "values": _encode_values(obj, key, arrays),
+            "index": _encode_index(obj.index, key, arrays),
+        }
+    if isinstance(obj, np.ndarray):
+        arrays[key] = obj
+        return {"type": "array", "key": key}
+    raise TypeError(f"Cannot share {type(obj).__name__} '{key}'")
+
+
+def _decode_object(layout: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+    kind = layout["type"]
+    if kind == "tuple":
+        return tuple(_decode_object(item, arrays) for item in layout["items"])
+    if kind == "array":
+        return arrays[layout["key"]]
+    index = _decode_index(layout["index"], arrays)
+    if kind == "series":
+        return pd.Series(_decode_values(layout["values"], arrays), index=index, name=layout["name"], copy=False)
+    columns = {j: _decode_values(values, arrays) for j, values in enumerate(layout["values"])}
+    frame = pd.DataFrame(columns, index=index, copy=False)
+    frame.columns = layout["columns"]
+    return frame
@@ -0,0 +1,115 @@
+# src/sim/scoring.py
+
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from config import FEATURE_STORE_DIR, MODEL_DIR
+from model.compiled import COMPILED_DIR, FOREST_FILE, load_compiled
+from model.utils import load_config
+from preprocessing.filter_feature_data import filter_feature_data
+from preprocessing.shared_panel import attach_panel, is_panel
+
+
+def load_scored_data(
+    sim_cfg: dict,
+    feature_dir: Path = FEATURE_STORE_DIR,
+    model_dir: Path = MODEL_DIR
+) -> pd.DataFrame:
+    """
+    Load the feature rows a sim config selects and score them with its model.
+
+    Args:
+        sim_cfg: Simulation config (model_id, tickers_file, feature_split, start_date, end_date,
+            optional compiled_model: score with the model's compiled export,
+            optional scores_file: read precomputed scores, e.g. walk-forward's scores.parquet
+            or a shared panel directory)
+        feature_dir: Feature store to read
+        model_dir: Root of the trained models
+
+    Returns:
+        The selected rows with a 'timestamp' column and the model's 'score'.
+
+    Raises:
+        FileNotFoundError: If the model (or its compiled export) is missing
+        ValueError: If no rows match the config
+    """
+    model_id      = sim_cfg["model_id"]
+    tickers_file  = Path(sim_cfg["tickers_file"])
+    feature_split = sim_cfg.get("feature_split", "test")
+
+    # New: date-range fields
+    start_date = sim_cfg.get("start_date")
+    end_date   = sim_cfg.get("end_date")
+
+    print(f"[INFO] Backtest window: {start_date} → {end_date}")
+
+    # 1) Load tickers
+    tickers = [t.strip() for t in tickers_file.read_text().splitlines() if t.strip()]
+    print(f"[INFO] Loaded {len(tickers)} tickers from {tickers_file}")
+
+    # Precomputed scores (e.g. a walk-forward out-of-sample series) replace steps 2-5
+    scores_file = sim_cfg.get("scores_file")
+    if scores_file:
+        if is_panel(scores_file):
+            # A shared panel of scored rows (scripts/build_shared_panel.py --sim-config)
+            df = attach_panel(scores_file).frame(tickers, start_time=start_date, end_time=end_date)
+            df["timestamp"] = df.index
+        else:
+            df = pd.read_parquet(scores_file)
+            df = df[df["ticker"].isin(tickers)]
+            if start_date:
+                df = df[df["timestamp"] >= pd.Timestamp(start_date)]
+            if end_date:
+                df = df[df["timestamp"] <= pd.Timestamp(end_date)]
+        if df.empty:
+            raise ValueError(f"No scored rows in {scores_file} for dates {start_date} → {end_date}")
+        print(f"[INFO] Loaded {len(df)} scored rows from {scores_file}")
+        return df.reset_index(drop=True)
+
+    # 2) Load model (its compiled export when the config asks for it)
+    compiled = None
+    if sim_cfg.get("compiled_model", False):
+        compiled_dir = model_dir / model_id / COMPILED_DIR
+        if not (compiled_dir / FOREST_FILE).exists():
+            raise FileNotFoundError(f"No compiled export at {compiled_dir} (see scripts/export_model.py)")
+        compiled = load_compiled(compiled_dir)
+        print(f"[INFO] Loaded compiled model '{model_id}' ({compiled.n_trees} trees)")
+    else:
+        model_path = model_dir / model_id / "model.pkl"
+        if not model_path.exists():
+            raise FileNotFoundError(f"Model not found at {model_path}")
+        model = joblib.load(model_path)
+        print(f"[INFO] Loaded model '{model_id}'")
+
+    # 3) Load feature data for the specified split & date window
+    df = filter_feature_data(
+        feature_dir=feature_dir,
+        tickers=tickers,
+        features=None,
+        start_time=start_date,
+        end_time=end_date,
+        debug=False,
+        retain_timestamp=True,
+        split=feature_split
+    )
+    if df.empty:
+        raise ValueError(f"No data in feature split '{feature_split}' "
+                         f"for dates {start_date} → {end_date}")
+
+    # 4) Prepare for prediction
+    required_feats = compiled.features if compiled else list(model.feature_names_in_)
+    df = df.dropna(subset=required_feats)
+    X = df[required_feats]
+
+    model_cfg = load_config(model_dir / model_id / "config.yaml")
+    regression_model = model_cfg["regression_model"]
+    # 5) Score
+    if compiled:
+        df["score"] = compiled.predict(X.to_numpy(dtype="float32"))
+    elif regression_model:
+        df["score"] = model.predict(X)
+    else:
+        df["score"] = model.predict_proba(X)[:, 1]
+    return df
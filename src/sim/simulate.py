@@ -0,0 +1,299 @@
+# src/sim/simulate.py
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Any, Callable, Dict, Tuple
+
+from sim.strategies import get_batch_strategy
+
+TRADE_LOG_COLUMNS = ["timestamp", "ticker", "action", "quantity", "price", "value", "pnl", "cash"]
+
+
+class HourlyPanel:
+    """
+    A scored backtest frame grouped once by timestamp into flat NumPy arrays.
+
+    Rows are ordered by timestamp (stable, so rows within an hour keep their
+    input order). Tickers and timestamps are integer-coded so portfolio state
+    can live in arrays indexed by ticker id.
+
+    Attributes:
+        frame:        the sorted input frame (used by per-hour strategies)
+        timestamps:   sorted unique timestamps, datetime64[ns]
+        hours:        hour of day for each unique timestamp
+        tcode:        per-row index into `timestamps`
+        ticker_names: unique tickers; `ticker_id` indexes into it
+        ticker_id:    per-row ticker id
+        price, score: per-row float64 arrays
+        starts, ends: row bounds of each timestamp group
+    """
+
+    def __init__(self, df: pd.DataFrame, price_col: str = "Close", score_col: str = "score"):
+        if df[[price_col, score_col]].isna().any(axis=None):
+            df = df.dropna(subset=[price_col, score_col])
+        ts = df["timestamp"].to_numpy().astype("datetime64[ns]", copy=False)
+
+        # Scored frames usually arrive time-sorted (and may be views of shared
+        # memory, see sim/sweep.py); only reorder, and so copy, when they are not
+        if (ts[1:] >= ts[:-1]).all():
+            self.frame = df.reset_index(drop=True)
+        else:
+            order = np.argsort(ts, kind="stable")
+            self.frame = df.iloc[order].reset_index(drop=True)
+            ts = ts[order]
+        self.timestamps, self.tcode = np.unique(ts, return_inverse=True)
+        self.hours = pd.DatetimeIndex(self.timestamps).hour.to_numpy()
+
+        ticker_id, self.ticker_names = pd.factorize(self.frame["ticker"], sort=True)
+        self.ticker_id = np.asarray(ticker_id)
+        self.ticker_names = np.asarray(self.ticker_names, dtype=object)
+        self.price = self.frame[price_col].to_numpy(dtype=np.float64)
+        self.score = self.frame[score_col].to_numpy(dtype=np.float64)
+
+        codes = np.arange(len(self.timestamps))
+        self.starts = np.searchsorted(self.tcode, codes, side="left")
+        self.ends = np.searchsorted(self.tcode, codes, side="right")
+
+        # (ticker, timestamp)-ordered view for "next bar of this ticker" lookups
+        self._by_ticker = np.lexsort((self.tcode, self.ticker_id))
+        self._keys = self.ticker_id[self._by_ticker] * len(self.timestamps) + self.tcode[self._by_ticker]
+
+    @property
+    def n_tickers(self) -> int:
+        return len(self.ticker_names)
+
+    def next_row(self, ticker_ids: np.ndarray, tcodes: np.ndarray) -> np.ndarray:
+        """
+        For each (ticker_id, tcode) pair, the row of that ticker's first bar at
+        or after tcode, or -1 if the ticker has no such bar.
+        """
+        keys = ticker_ids * len(self.timestamps) + tcodes
+        pos = np.searchsorted(self._keys, keys, side="left")
+        rows = self._by_ticker[np.minimum(pos, len(self._keys) - 1)]
+        found = (pos < len(self._keys)) & (self.ticker_id[rows] == ticker_ids)
+        return np.where(found, rows, -1)
+
+    def last_prices(self) -> np.ndarray:
+        """Last observed price of every ticker, indexed by ticker id."""
+        last = np.full(self.n_tickers, np.nan)
+        last[self.ticker_id] = self.price  # rows are time-ordered, so the last write wins
+        return last
+
+
+class _Book:
+    """Cash, open positions and trade log, all kept in arrays indexed by ticker id."""
+
+    def __init__(self, panel: HourlyPanel, initial_budget: float):
+        n = panel.n_tickers
+        self.panel = panel
+        self.cash = float(initial_budget)
+        self.held = np.zeros(n, dtype=bool)
+        self.quantity = np.zeros(n, dtype=np.int64)
+        self.buy_price = np.zeros(n)
+        self.buy_code = np.zeros(n, dtype=np.int64)
+        self.buy_seq = np.zeros(n, dtype=np.int64)
+        self.exit_row = np.full(n, -1, dtype=np.int64)
+        self._seq = 0
+        self._log = []
+
+    def sell(self, rows: np.ndarray) -> None:
+        """Close the positions of the tickers at `rows`, in the order given."""
+        if len(rows) == 0:
+            return
+        p = self.panel
+        tid = p.ticker_id[rows]
+        qty = self.quantity[tid]
+        price = p.price[rows]
+        value = qty * price
+        cash_after = self.cash + np.cumsum(value)
+
+        self._record(rows, "sell", qty, price, value, (price - self.buy_price[tid]) * qty, cash_after)
+        self.cash = float(cash_after[-1])
+        self.held[tid] = False
+        self.quantity[tid] = 0
+        self.exit_row[tid] = -1
+
+    def buy(self, rows: np.ndarray, qty: np.ndarray, exit_rows: np.ndarray = None) -> None:
+        """
+        Open positions at `rows`. Orders for tickers already held or with zero
+        quantity are dropped; the rest fill in order until one is unaffordable.
+        """
+        p = self.panel
+        tid = p.ticker_id[rows]
+        ok = ~self.held[tid] & (qty > 0)
+        rows, tid, qty = rows[ok], tid[ok], qty[ok]
+        if exit_rows is not None:
+            exit_rows = exit_rows[ok]
+        if len(rows) == 0:
+            return
+
+        price = p.price[rows]
+        value = qty * price
+        spent = np.cumsum(value)
+        n = int(np.searchsorted(spent, self.cash, side="right"))
+        if n == 0:
+            return
+        rows, tid, qty, price, value, spent = rows[:n], tid[:n], qty[:n], price[:n], value[:n], spent[:n]
+
+        self._record(rows, "buy", qty, price, value, np.full(n, np.nan), self.cash - spent)
+        self.cash -= float(spent[-1])
+        self.held[tid] = True
+        self.quantity[tid] = qty
+        self.buy_price[tid] = price
+        self.buy_code[tid] = p.tcode[rows]
+        self.buy_seq[tid] = np.arange(self._seq, self._seq + n)
+        self._seq += n
+        if exit_rows is not None:
+            self.exit_row[tid] = exit_rows[:n]
+
+    def _record(self, rows, action, qty, price, value, pnl, cash_after) -> None:
+        self._log.append((rows, action, qty, price, value, pnl, cash_after))
+
+    def trade_log(self) -> pd.DataFrame:
+        if not self._log:
+            return pd.DataFrame(columns=TRADE_LOG_COLUMNS)
+        p = self.panel
+        rows = np.concatenate([entry[0] for entry in self._log])
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(p.timestamps[p.tcode[rows]]),
+            "ticker": p.ticker_names[p.ticker_id[rows]],
+            "action": np.concatenate([np.full(len(e[0]), e[1], dtype=object) for e in self._log]),
+            "quantity": np.concatenate([e[2] for e in self._log]),
+            "price": np.concatenate([e[3] for e in self._log]),
+            "value": np.concatenate([e[4] for e in self._log]),
+            "pnl": np.concatenate([e[5] for e in self._log]),
+            "cash": np.concatenate([e[6] for e in self._log]),
+        }, columns=TRADE_LOG_COLUMNS)
+
+
+class BacktestSimulator:
+    """
+    Backtest a buy/sell strategy pair over a scored, multi-ticker frame.
+
+    The frame needs 'timestamp', 'ticker', a price column and a score column.
+    Each hour, positions flagged by the sell strategy are closed first, then
+    the buy strategy's orders are filled while cash lasts. A position can only
+    be sold on a bar where its ticker has a price.
+
+    When both strategies have a batched counterpart in BATCH_STRATEGY_REGISTRY
+    the decisions are made once for the whole panel and only the timestamps
+    with trades are visited; otherwise the registered per-hour functions are
+    called on every hourly slice. Both paths produce the same trade log.
+    """
+
+    def __init__(
+        self,
+        initial_budget: float = 1000.0,
+        cooldown_hours: float = 3,
+        price_col: str = "Close",
+        score_col: str = "score",
+        vectorized: bool = True
+    ):
+        self.initial_budget = initial_budget
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.price_col = price_col
+        self.score_col = score_col
+        self.vectorized = vectorized
+
+    def run(
+        self,
+        df: pd.DataFrame,
+        buy_fn: Callable,
+        buy_params: Dict[str, Any],
+        sell_fn: Callable,
+        sell_params: Dict[str, Any]
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Run the backtest.
+
+        Returns:
+            (trade_log, summary): one row per executed trade, and a dict of
+            portfolio statistics.
+        """
+        panel = HourlyPanel(df, price_col=self.price_col, score_col=self.score_col)
+        book = _Book(panel, self.initial_budget)
+        if len(panel.timestamps):
+            buy_batch, sell_batch = get_batch_strategy(buy_fn), get_batch_strategy(sell_fn)
+            if self.vectorized and buy_batch and sell_batch:
+                self._run_batched(panel, book, buy_batch, buy_params, sell_batch, sell_params)
+            else:
+                self._run_hourly(panel, book, buy_fn, buy_params, sell_fn, sell_params)
+        trade_log = book.trade_log()
+        return trade_log, self._summarize(panel, book, trade_log)
+
+    def _run_batched(self, panel, book, buy_batch, buy_params, sell_batch, sell_params) -> None:
+        entries, alloc = buy_batch(panel, buy_params)
+        exits = sell_batch(panel, entries, sell_params, self.cooldown)
+        entry_codes = panel.tcode[entries]
+        exit_codes = np.where(exits >= 0, panel.tcode[exits], -1)
+
+        # Only timestamps where an order or a scheduled exit can happen matter
+        for code in np.union1d(entry_codes, exit_codes[exit_codes >= 0]):
+            due = book.held & (book.exit_row >= 0)
+            due[due] = panel.tcode[book.exit_row[due]] == code
+            tid = np.flatnonzero(due)
+            book.sell(book.exit_row[tid[np.argsort(book.buy_seq[tid])]])
+
+            lo, hi = np.searchsorted(entry_codes, [code, code + 1])
+            if lo < hi:
+                rows = entries[lo:hi]
+                qty = np.floor_divide(min(alloc, book.cash), panel.price[rows]).astype(np.int64)
+                book.buy(rows, qty, exits[lo:hi])
+
+    def _run_hourly(self, panel, book, buy_fn, buy_params, sell_fn, sell_params) -> None:
+        frame = panel.frame
+        for code in range(len(panel.timestamps)):
+            lo, hi = panel.starts[code], panel.ends[code]
+            hour_df = frame.iloc[lo:hi]
+            row_of = dict(zip(panel.ticker_id[lo:hi], range(lo, hi)))
+
+            held = np.flatnonzero(book.held)
+            held = held[np.argsort(book.buy_seq[held])]
+            holdings = {
+                panel.ticker_names[t]: {
+                    "buy_time": pd.Timestamp(panel.timestamps[book.buy_code[t]]),
+                    "quantity": int(book.quantity[t]),
+                    "buy_price": float(book.buy_price[t]),
+                }
+                for t in held
+            }
+            to_sell = set(sell_fn(hour_df, holdings, sell_params, self.cooldown))
+            book.sell(np.array(
+                [row_of[t] for t in held if panel.ticker_names[t] in to_sell and t in row_of],
+                dtype=np.int64
+            ))
+
+            orders = buy_fn(hour_df, book.cash, buy_params)
+            buys = np.flatnonzero((orders["action"] == "buy").to_numpy())
+            if len(buys):
+                book.buy(lo + buys, orders["quantity"].to_numpy(dtype=np.int64)[buys])
+
+    def _summarize(self, panel, book, trade_log) -> Dict[str, Any]:
+        last = panel.last_prices()
+        holdings_value = float((book.quantity * np.nan_to_num(last)).sum())
+        return summarize_trades(trade_log, self.initial_budget, book.cash, holdings_value, int(book.held.sum()))
+
+
+def summarize_trades(
+    trade_log: pd.DataFrame,
+    initial_budget: float,
+    cash: float,
+    holdings_value: float,
+    open_positions: int
+) -> Dict[str, Any]:
+    """Portfolio statistics of a trade log and the book it left behind."""
+    sells = trade_log[trade_log["action"] == "sell"]
+    final_value = cash + holdings_value
+    return {
+        "initial_budget": initial_budget,
+        "final_cash": round(cash, 2),
+        "holdings_value": round(holdings_value, 2),
+        "final_value": round(final_value, 2),
+        "total_return": round(final_value / initial_budget - 1, 6) if initial_budget else None,
+        "num_buys": int((trade_log["action"] == "buy").sum()),
+        "num_sells": len(sells),
+        "open_positions": open_positions,
+        "realized_pnl": round(float(sells["pnl"].sum()), 2),
+        "win_rate": round(float((sells["pnl"] > 0).mean()), 4) if len(sells) else None,
+    }
@@ -1,8 +1,9 @@
 # src/sim/strategies.py
 
+import numpy as np
 import pandas as pd
 from datetime import timedelta
-from typing import Callable, Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 
 # --- Strategy Registry ---
 
@@ -20,6 +21,41 @@ def register_strategy(name: str):
         return fn
     return decorator
 
+# --- Batched Strategy Registry ---
+#
+# A batched strategy is the array counterpart of a registered per-hour strategy.
+# It is called once per backtest on a sim.simulate.HourlyPanel and must make the
+# same decisions the per-hour function would make, so the simulator can skip the
+# hour-by-hour pandas loop.
+#
+#   buy:  fn(panel, params) -> (rows, alloc)
+#         rows: panel row indices of buy candidates, in ascending row order
+#         alloc: cash per order; each order buys int(min(alloc, cash) // price)
+#   sell: fn(panel, entry_rows, params, cooldown) -> exit_rows
+#         exit_rows: for every entry row, the panel row it is sold at (-1 = never)
+
+BATCH_STRATEGY_REGISTRY: Dict[str, Callable] = {}
+
+def register_batch_strategy(name: str):
+    """
+    Decorator to register the batched counterpart of a registered strategy.
+    """
+    def decorator(fn: Callable):
+        if name in BATCH_STRATEGY_REGISTRY:
+            raise ValueError(f"Batched strategy '{name}' is already registered.")
+        BATCH_STRATEGY_REGISTRY[name] = fn
+        return fn
+    return decorator
+
+def get_batch_strategy(fn: Callable) -> Optional[Callable]:
+    """
+    Return the batched counterpart of a registered strategy function, or None.
+    """
+    for name, registered in STRATEGY_REGISTRY.items():
+        if registered is fn:
+            return BATCH_STRATEGY_REGISTRY.get(name)
+    return None
+
 @register_strategy("cooldown_sell")
 def cooldown_sell_strategy(
     hour_df: pd.DataFrame,
@@ -54,9 +90,10 @@ def first_hour_equal_allocation_strategy(
     Args:
       df: hour‐slice DataFrame with columns ['timestamp','ticker',price_col,score_col]
       budget: current available cash
-      top_k: how many names to buy
+      params: must contain 'top_k' (how many names to buy); may override 'target_hour'
       price_col: price column name
       score_col: model score column
+      target_hour: UTC hour of the first trading bar
     Returns:
       DataFrame with added 'action' and 'quantity'
     """
@@ -64,6 +101,8 @@ def first_hour_equal_allocation_strategy(
     df["action"]   = None
     df["quantity"] = 0
 
+    target_hour = params.get("target_hour", target_hour)
+
     # Detect the first hour of the day: on Yahoo data this is hour==10 (10:30 bar)
     if df["timestamp"].dt.hour.iloc[0] == target_hour:
         # pick top_k by score
@@ -71,13 +110,49 @@ def first_hour_equal_allocation_strategy(
         if not top.empty:
             alloc = min([1000 / params["top_k"], budget])
             for idx, row in top.iterrows():
-                print(row)
-                print(alloc)
                 price = row[price_col]
                 qty   = int(alloc // price)
-                print(qty)
                 if qty > 0:
                     df.at[idx, "action"]   = "buy"
                     df.at[idx, "quantity"] = qty
 
     return df
+
+
+# --- Batched counterparts ---
+
+@register_batch_strategy("cooldown_sell")
+def cooldown_sell_batch(
+    panel,
+    entry_rows: np.ndarray,
+    params: Dict[str, Any],
+    cooldown: timedelta
+) -> np.ndarray:
+    """
+    Batched cooldown_sell: each position is sold on the first later bar of its
+    ticker at or after buy_time + cooldown.
+    """
+    buy_codes = panel.tcode[entry_rows]
+    due = panel.timestamps[buy_codes] + np.timedelta64(cooldown)
+    due_codes = np.maximum(np.searchsorted(panel.timestamps, due, side="left"), buy_codes + 1)
+    return panel.next_row(panel.ticker_id[entry_rows], due_codes)
+
+@register_batch_strategy("first_hour_equal_allocation")
+def first_hour_equal_allocation_batch(
+    panel,
+    params: Dict[str, Any],
+    target_hour: int = 13
+):
+    """
+    Batched first_hour_equal_allocation: the top_k rows by score at every
+    target-hour timestamp, ties resolved by row order as in DataFrame.nlargest.
+    """
+    target_hour = params.get("target_hour", target_hour)
+    top_k = params["top_k"]
+
+    rows = np.flatnonzero(panel.hours[panel.tcode] == target_hour)
+    ranked = rows[np.lexsort((rows, -panel.score[rows], panel.tcode[rows]))]
+    codes = panel.tcode[ranked]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    rank = np.arange(len(ranked)) - np.repeat(starts, np.diff(np.r_[starts, len(ranked)]))
+    return np.sort(ranked[rank < top_k]), 1000 / top_k
@@ -0,0 +1,118 @@
+# src/sim/sweep.py
+
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from preprocessing.shared_panel import FramesHandle, attach_frames, share_frames
+from sim.simulate import BacktestSimulator
+from sim.strategies import STRATEGY_REGISTRY
+
+# Keys that change which rows get loaded or how they are scored; a sweep
+# reuses one scored frame, so these cannot vary across grid points.
+DATA_KEYS = {"model_id", "tickers_file", "feature_split", "start_date", "end_date"}
+
+# Only these columns of the scored frame are needed to simulate
+SIM_COLUMNS = ["timestamp", "ticker", "Close", "score"]
+
+_SWEEP_DF: Optional[pd.DataFrame] = None
+
+
+def expand_grid(sim_cfg: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into one sim config per combination.
+
+    Grid keys are dotted paths into the sim config, e.g.
+    {"buy_params.top_k": [3, 5], "cooldown_hours": [2, 3]}.
+    """
+    bad = {key.split(".")[0] for key in grid} & DATA_KEYS
+    if bad:
+        raise ValueError(f"Cannot sweep data-selection keys: {sorted(bad)}")
+
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        cfg = copy.deepcopy(sim_cfg)
+        cfg.pop("sweep", None)
+        for key, value in zip(keys, values):
+            *parents, leaf = key.split(".")
+            node = cfg
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = value
+        configs.append(cfg)
+    return configs
+
+
+def run_config(df: pd.DataFrame, sim_cfg: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Simulate one sim config over an already scored frame.
+
+    Returns:
+        (trade_log, summary) from BacktestSimulator.run
+    """
+    buy_strategy = sim_cfg["buy_strategy"]
+    sell_strategy = sim_cfg["sell_strategy"]
+    for name in (buy_strategy, sell_strategy):
+        if name not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy '{name}'")
+
+    buy_params = sim_cfg.get("buy_params", {})
+    sell_params = sim_cfg.get("sell_params", {})
+    sim = BacktestSimulator(
+        initial_budget=sim_cfg.get("initial_budget", 1000.0),
+        cooldown_hours=sim_cfg.get("cooldown_hours", sell_params.get("hold_hours", 3))
+    )
+    return sim.run(df,
+                   STRATEGY_REGISTRY[buy_strategy], buy_params,
+                   STRATEGY_REGISTRY[sell_strategy], sell_params)
+
+
+def _init_worker(handle: FramesHandle) -> None:
+    global _SWEEP_DF
+    _SWEEP_DF = attach_frames(handle).data()["df"]
+
+
+def _run_point(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    _, summary = run_config(_SWEEP_DF, cfg)
+    return summary
+
+
+def run_sweep(
+    df: pd.DataFrame,
+    sim_cfg: Dict[str, Any],
+    grid: Dict[str, List[Any]],
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Simulate every combination in `grid` over one scored frame.
+
+    The frame is copied once into shared memory, which every worker process
+    maps (preprocessing/shared_panel.py); grid points are then fanned out
+    over the pool.
+
+    Returns:
+        DataFrame with one row per parameter combination: the swept values
+        (one column per grid key) followed by the backtest summary.
+    """
+    configs = expand_grid(sim_cfg, grid)
+    df = df[SIM_COLUMNS]
+
+    if max_workers == 1:
+        summaries = [run_config(df, cfg)[1] for cfg in configs]
+    else:
+        with share_frames({"df": df}) as shared, \
+                ProcessPoolExecutor(max_workers=max_workers,
+                                    initializer=_init_worker,
+                                    initargs=(shared.handle,)) as pool:
+            summaries = list(pool.map(_run_point, configs))
+
+    combos = list(itertools.product(*grid.values()))
+    rows = [
+        {**dict(zip(grid, combo)), **summary}
+        for combo, summary in zip(combos, summaries)
+    ]
+    return pd.DataFrame(rows)